@@ -2,9 +2,98 @@
 # y despues le pide que introduzca los valores de las matrices
 
 
+import argparse
+import csv
+import os
+import sys
+from collections import OrderedDict
+from fractions import Fraction
+from functools import lru_cache, wraps
 from itertools import chain
+from operator import mul
 
+try:
+    import backend_numpy  # Operaciones vectorizadas, solo si NumPy está instalado
+except ImportError:
+    backend_numpy = None
 
+from matriz import Matriz
+from matriz_dispersa import MatrizDispersa
+
+
+FACTORIZACIONES_EN_CACHE = 32  # Factorizaciones LU que recuerda resolver_sistema
+TAMANO_BLOQUE = 64  # Tamaño del bloque (filas x columnas) para recorrer matrices grandes
+UMBRAL_DISPERSA = 0.25  # Producto máximo de densidades para multiplicar por la vía dispersa
+MINIMO_DISPERSA = 32 ** 3  # Por debajo de m·n·p productos no compensa convertir a dispersa
+
+
+BACKENDS = {"python": None, "numpy": backend_numpy}
+_backend = backend_numpy  # Backend activo: NumPy si está disponible, si no Python puro (None)
+
+# Operaciones que cada representación resuelve sin pasar por listas de listas
+OPERACIONES_NATIVAS = {
+    Matriz: {"sumar_matrices", "restar_matrices", "matriz_traspuesta"},
+    MatrizDispersa: {"sumar_matrices", "restar_matrices", "multiplicar_matrices", "matriz_traspuesta"},
+}
+
+
+def usar_backend(nombre):
+    """
+    Selecciona el backend con el que se ejecutan las operaciones.
+
+    Args:
+        nombre : "numpy" o "python".
+
+    Raises:
+        ValueError: Si el backend no existe o NumPy no está instalado.
+    """
+    global _backend
+    if nombre not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {nombre}")
+    if nombre == "numpy" and backend_numpy is None:
+        raise ValueError("NumPy no está instalado.")
+    _backend = BACKENDS[nombre]
+
+def con_backend(funcion):
+    """
+    Decorador que envía la operación al backend activo y, si no está
+    disponible o devuelve NotImplemented, ejecuta la versión en Python puro.
+
+    Acepta listas de listas, objetos Matriz y MatrizDispersa: si algún argumento
+    es una Matriz o MatrizDispersa, el resultado también lo es (la dispersa tiene prioridad).
+
+    La versión en Python puro sigue accesible en funcion.__wrapped__.
+    """
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        tipos = {type(arg) for arg in args if type(arg) in OPERACIONES_NATIVAS}
+        if tipos:
+            if all(funcion.__name__ in OPERACIONES_NATIVAS[tipo] for tipo in tipos):
+                return funcion(*args, **kwargs)
+            # El resto de operaciones trabaja con listas: convertimos a la entrada y a la salida
+            tipo = MatrizDispersa if MatrizDispersa in tipos else Matriz
+            args = [arg.tolist() if type(arg) in OPERACIONES_NATIVAS else arg for arg in args]
+            resultado = envoltura(*args, **kwargs)
+            return tipo.desde_lista(resultado) if isinstance(resultado, list) else resultado
+        if _backend is not None:
+            resultado = getattr(_backend, funcion.__name__)(*args, **kwargs)
+            if resultado is not NotImplemented:
+                return resultado
+        return funcion(*args, **kwargs)
+    return envoltura
+
+
+def comprobar_mismo_tamano(matriz1, matriz2):
+    """
+    Comprueba que dos matrices (listas de listas) tienen el mismo número de filas y de columnas.
+
+    Raises:
+        ValueError: Si los tamaños no coinciden.
+    """
+    if len(matriz1) != len(matriz2) or any(len(f1) != len(f2) for f1, f2 in zip(matriz1, matriz2)):
+        raise ValueError("Las matrices deben tener el mismo tamaño.")
+
+@con_backend
 def sumar_matrices (matriz1,matriz2):
     """
     Suma dos matrices del mismo tamaño.
@@ -16,6 +105,12 @@ def sumar_matrices (matriz1,matriz2):
     Returns:
         Matriz resultado de la suma.
     """
+    if isinstance(matriz1, MatrizDispersa) or isinstance(matriz2, MatrizDispersa):
+        return MatrizDispersa.como_dispersa(matriz1).sumar(matriz2)  # Solo recorre los no nulos
+    if isinstance(matriz1, Matriz) or isinstance(matriz2, Matriz):
+        return Matriz.como_matriz(matriz1).sumar(matriz2)  # Recorrido único del buffer plano
+
+    comprobar_mismo_tamano(matriz1, matriz2)
     matriz_suma = []  # Inicializamos la matriz resultado
 
     for i in range(len(matriz1)):  # Recorremos las filas
@@ -25,6 +120,8 @@ def sumar_matrices (matriz1,matriz2):
         matriz_suma.append(fila) # Añadimos la fila ya sumada a la matriz resultante
 
     return matriz_suma
+
+@con_backend
 def restar_matrices (matriz1,matriz2):
     """
     Resta  dos matrices del mismo tamaño.
@@ -36,6 +133,12 @@ def restar_matrices (matriz1,matriz2):
     Returns:
         Matriz resultado de la resta.
     """
+    if isinstance(matriz1, MatrizDispersa) or isinstance(matriz2, MatrizDispersa):
+        return MatrizDispersa.como_dispersa(matriz1).restar(matriz2)  # Solo recorre los no nulos
+    if isinstance(matriz1, Matriz) or isinstance(matriz2, Matriz):
+        return Matriz.como_matriz(matriz1).restar(matriz2)  # Recorrido único del buffer plano
+
+    comprobar_mismo_tamano(matriz1, matriz2)
     matriz_resta = []  # Inicializamos la matriz resultado
 
     for i in range(len(matriz1)):  # Recorremos las filas
@@ -46,6 +149,7 @@ def restar_matrices (matriz1,matriz2):
 
     return matriz_resta
 
+@con_backend
 def multiplicar_matrices (matriz1,matriz2):
     """
     Multiplica dos matrices si sus dimensiones son compatibles.
@@ -62,30 +166,91 @@ def multiplicar_matrices (matriz1,matriz2):
         
     """
 
+    if isinstance(matriz1, MatrizDispersa) or isinstance(matriz2, MatrizDispersa):
+        return MatrizDispersa.como_dispersa(matriz1).multiplicar(matriz2)
+
     # Validamos si las dimensiones permiten la multiplicación
     if len(matriz1[0]) != len(matriz2):
         raise ValueError("Las matrices no se pueden multiplicar: columnas de matriz1 ≠ filas de matriz2")
 
-    matriz_multiplicacion = []  # Inicializamos la matriz resultado
-
-    # Recorremos las filas de la primera matriz
-    for i in range(len(matriz1)):
-        fila = []  # Creamos una nueva fila para la matriz resultado
+    filas = len(matriz1)
+    columnas = len(matriz2[0])
 
-        # Recorremos las columnas de la segunda matriz
-        for j in range(len(matriz2[0])):
-            elemento = 0  # Acumulador para el valor de la posición [i][j]
+    # Si hay muchos ceros, la vía dispersa se salta los productos nulos y compensa la conversión
+    if filas * len(matriz2) * columnas >= MINIMO_DISPERSA and densidad(matriz1) * densidad(matriz2) <= UMBRAL_DISPERSA:
+        return MatrizDispersa.desde_lista(matriz1).multiplicar(matriz2).tolist()
 
-            # Realizamos la multiplicación de la fila i por la columna j
-            for k in range(len(matriz1[0])):
-                elemento += matriz1[i][k] * matriz2[k][j]
+    # Trasponemos la segunda matriz una sola vez: así cada columna es una lista contigua
+    columnas2 = [list(columna) for columna in zip(*matriz2)]
 
-            fila.append(elemento)  # Añadimos el valor calculado a la fila
+    if filas <= TAMANO_BLOQUE and columnas <= TAMANO_BLOQUE:
+        # Matrices pequeñas: cada celda es el producto escalar de una fila por una columna
+        return [[sum(map(mul, fila, columna)) for columna in columnas2] for fila in matriz1]
 
-        matriz_multiplicacion.append(fila)  # Añadimos la fila completa a la matriz resultado
+    # Matrices grandes: recorremos el resultado por bloques para reutilizar
+    # las mismas columnas mientras siguen "calientes" en caché
+    matriz_multiplicacion = [[0] * columnas for _ in range(filas)]
+    for inicio_i in range(0, filas, TAMANO_BLOQUE):
+        filas_bloque = range(inicio_i, min(inicio_i + TAMANO_BLOQUE, filas))
+        for inicio_j in range(0, columnas, TAMANO_BLOQUE):
+            fin_j = min(inicio_j + TAMANO_BLOQUE, columnas)
+            columnas_bloque = columnas2[inicio_j:fin_j]
+            for i in filas_bloque:
+                fila = matriz1[i]
+                matriz_multiplicacion[i][inicio_j:fin_j] = [sum(map(mul, fila, columna)) for columna in columnas_bloque]
 
     return matriz_multiplicacion
 
+def matriz_identidad(n):
+    """
+    Devuelve la matriz identidad de tamaño n x n.
+    """
+    return [[1 if i == j else 0 for j in range(n)] for i in range(n)]
+
+def potencia_matriz(matriz, exponente):
+    """
+    Eleva una matriz cuadrada a un exponente entero por exponenciación binaria
+    (elevando al cuadrado), con O(log exponente) multiplicaciones.
+
+    Args:
+        matriz : Matriz cuadrada.
+        exponente : Entero; si es negativo se eleva la inversa.
+
+    Returns:
+        Matriz resultado (la identidad si el exponente es 0), con la misma
+        representación que 'matriz' (lista de listas, Matriz o MatrizDispersa).
+
+    Raises:
+        ValueError: Si la matriz no es cuadrada o el exponente es negativo y no tiene inversa.
+    """
+    n = len(matriz[0]) if isinstance(matriz, list) else matriz.columnas
+    filas = len(matriz) if isinstance(matriz, list) else matriz.filas
+    if filas != n:
+        raise ValueError("La matriz debe ser cuadrada para poder elevarla a una potencia.")
+    if exponente < 0:
+        matriz = matriz_inversa(matriz)
+        exponente = -exponente
+
+    resultado = None  # Evitamos multiplicar por la identidad en el primer paso
+    base = matriz
+    while exponente:
+        if exponente & 1:  # El bit actual del exponente está a 1: acumulamos la base
+            resultado = base if resultado is None else multiplicar_matrices(resultado, base)
+        exponente >>= 1
+        if exponente:
+            base = multiplicar_matrices(base, base)  # base, base², base⁴, ...
+    if resultado is None:
+        identidad = matriz_identidad(n)
+        return identidad if isinstance(matriz, list) else type(matriz).desde_lista(identidad)
+    return resultado
+
+def densidad(matriz):
+    """
+    Calcula la proporción de valores distintos de cero de una matriz (0 a 1).
+    """
+    total = len(matriz) * len(matriz[0])
+    return sum(1 for valor in chain.from_iterable(matriz) if valor) / total if total else 0.0
+
 def obtener_menor(matriz, fila_a_eliminar,columna_a_eliminar):
     """
     Obtiene la submatriz menor eliminando la primera fila y la columna especificada.
@@ -112,34 +277,189 @@ def obtener_menor(matriz, fila_a_eliminar,columna_a_eliminar):
         submatriz.append(nueva_fila)  # Añadimos la fila a la submatriz
     return submatriz # Devolvemos el menor resultante
 
-def determinante(matriz):
+def es_exacta(matriz):
     """
-    Calcula el determinante de una matriz cuadrada de cualquier tamaño usando recursión.
+    Indica si todos los valores de la matriz son enteros o fracciones.
+
+    Args:
+        matriz : Matriz a comprobar.
+
+    Returns:
+        True si la matriz se puede operar de forma exacta con Fraction.
+    """
+    return all(isinstance(valor, (int, Fraction)) for valor in chain.from_iterable(matriz))
+
+def descomposicion_lu(matriz, exacto=None):
+    """
+    Descompone una matriz cuadrada en la forma P·A = L·U usando pivoteo parcial.
 
     Args:
         matriz : Matriz cuadrada de tamaño n x n.
+        exacto : True para operar con Fraction, False para operar con float.
+                 Si es None se decide según los valores de la matriz.
 
     Returns:
-         Valor del determinante de la matriz.
+        Tupla (lu, permutacion, signo):
+        - lu: matriz con L por debajo de la diagonal (diagonal de unos implícita) y U en el resto.
+        - permutacion: orden de las filas originales tras los intercambios.
+        - signo: 1 o -1 según el número de intercambios, 0 si la matriz es singular.
 
-   
+    Raises:
+        ValueError: Si la matriz no es cuadrada.
     """
-    n = len(matriz[0])
-    if n == 1:
-        return matriz[0][0]  # Caso base: matriz 1x1
-    elif n == 2:
-        # Caso base: matriz 2x2 con fórmula directa
-        return matriz[0][0]*matriz[1][1] - matriz[0][1]*matriz[1][0]
-    else:
-        det = 0
-        for j in range(n):
-            # Calculamos el menor de la matriz para la columna j
-            menor = obtener_menor(matriz,0, j)
-            # Cofactor con signo alternado, elemento de la primera fila y determinante del menor
-            cofactor = (-1) ** j * matriz[0][j] * determinante(menor)
-            det += cofactor  # Sumamos el cofactor al determinante total
-        return det
+    n = len(matriz)
+    if any(len(fila) != n for fila in matriz):
+        raise ValueError("La matriz debe ser cuadrada.")
+
+    if exacto is None:
+        exacto = es_exacta(matriz)
+    convertir = Fraction if exacto else float
+
+    lu = [[convertir(valor) for valor in fila] for fila in matriz]  # Copia de trabajo
+    permutacion = list(range(n))
+    signo = 1
+
+    for k in range(n):
+        # Elegimos como pivote el mayor valor absoluto de la columna k
+        pivote = max(range(k, n), key=lambda i: abs(lu[i][k]))
+        if lu[pivote][k] == 0:
+            return lu, permutacion, 0  # Columna sin pivote: la matriz es singular
+
+        if pivote != k:  # Intercambiamos filas y cambiamos el signo
+            lu[k], lu[pivote] = lu[pivote], lu[k]
+            permutacion[k], permutacion[pivote] = permutacion[pivote], permutacion[k]
+            signo = -signo
+
+        fila_pivote = lu[k]
+        valor_pivote = fila_pivote[k]
+        for i in range(k + 1, n):
+            fila = lu[i]
+            factor = fila[k] / valor_pivote
+            fila[k] = factor  # Guardamos el multiplicador de L en el hueco que queda a cero
+            if factor:
+                for j in range(k + 1, n):
+                    fila[j] -= factor * fila_pivote[j]
+
+    return lu, permutacion, signo
+
+@con_backend
+def determinante(matriz, exacto=None):
+    """
+    Calcula el determinante de una matriz cuadrada mediante descomposición LU, en O(n^3).
+
+    Args:
+        matriz : Matriz cuadrada de tamaño n x n.
+        exacto : True para calcular con Fraction, False con float.
+                 Por defecto es exacto si la matriz solo contiene enteros o fracciones.
+
+    Returns:
+         Valor del determinante de la matriz (int si el resultado exacto es entero).
+    """
+    lu, _, signo = descomposicion_lu(matriz, exacto)
+    if signo == 0:
+        return 0
+
+    det = signo
+    for i in range(len(lu)):
+        det *= lu[i][i]  # El determinante es el producto de la diagonal de U
+
+    if isinstance(det, Fraction) and det.denominator == 1:
+        return int(det)  # Con entrada entera devolvemos un entero, como antes
+    return det
+
+class FactorizacionLU:
+    """
+    Factorización P·A = L·U de una matriz, lista para resolver sistemas A·x = b
+    con distintos términos independientes en O(n^2) cada uno.
+
+    Atributos:
+    - lu, permutacion: resultado de descomposicion_lu
+    - exacto: True si se trabaja con Fraction
+    """
+
+    def __init__(self, matriz, exacto=None):
+        """
+        Raises:
+            ValueError: Si la matriz no es cuadrada o es singular.
+        """
+        if exacto is None:
+            exacto = es_exacta(matriz)
+        self.exacto = exacto
+        self.lu, self.permutacion, signo = descomposicion_lu(matriz, exacto)
+        if signo == 0:
+            raise ValueError("El sistema no tiene solución única porque la matriz es singular.")
+
+    def resolver(self, b):
+        """
+        Resuelve A·x = b por sustitución hacia delante (L) y hacia atrás (U).
+
+        Args:
+            b : Vector (lista de n números).
+
+        Returns:
+            Lista con la solución x.
+        """
+        lu = self.lu
+        n = len(lu)
+        if len(b) != n:
+            raise ValueError(f"El vector b debe tener {n} elementos.")
+        convertir = Fraction if self.exacto else float
+
+        # L·y = P·b (la diagonal de L son unos)
+        y = [convertir(b[p]) for p in self.permutacion]
+        for i in range(1, n):
+            y[i] -= sum(map(mul, lu[i][:i], y[:i]))
+
+        # U·x = y
+        for i in reversed(range(n)):
+            fila = lu[i]
+            y[i] = (y[i] - sum(map(mul, fila[i + 1:], y[i + 1:]))) / fila[i]
+        return y
+
+@lru_cache(maxsize=FACTORIZACIONES_EN_CACHE)
+def _factorizacion_en_cache(filas, exacto):
+    return FactorizacionLU(filas, exacto)
+
+def factorizar(matriz, exacto=None):
+    """
+    Devuelve la FactorizacionLU de la matriz, reutilizando la última calculada
+    para una matriz con los mismos valores.
+    """
+    if isinstance(matriz, (Matriz, MatrizDispersa)):
+        matriz = matriz.tolist()
+    filas = tuple(tuple(fila) for fila in matriz)  # Clave inmutable para la caché
+    if exacto is None:
+        exacto = es_exacta(filas)
+    return _factorizacion_en_cache(filas, exacto)
+
+def resolver_sistema(matriz, b, exacto=None):
+    """
+    Resuelve el sistema de ecuaciones lineales A·x = b mediante factorización LU.
+
+    La factorización se guarda en caché, así que resolver otros términos
+    independientes con la misma matriz solo cuesta O(n^2) por vector.
+
+    Args:
+        matriz : Matriz cuadrada A de los coeficientes.
+        b : Vector de términos independientes, o lista de vectores para resolver un lote.
+        exacto : True para Fraction, False para float; por defecto exacto si A y b son enteros.
 
+    Returns:
+        La solución x (o una lista de soluciones si b es un lote).
+
+    Raises:
+        ValueError: Si la matriz no es cuadrada, es singular o b no tiene el tamaño adecuado.
+    """
+    lote = bool(b) and isinstance(b[0], (list, tuple))
+    vectores = b if lote else [b]
+    if exacto is None:
+        exacto = es_exacta(matriz.tolist() if isinstance(matriz, (Matriz, MatrizDispersa)) else matriz) \
+            and es_exacta(vectores)
+    factorizacion = factorizar(matriz, exacto)
+    soluciones = [factorizacion.resolver(vector) for vector in vectores]
+    return soluciones if lote else soluciones[0]
+
+@con_backend
 def matriz_traspuesta (matriz):
     """
     Calcula la matriz traspuesta de una matriz dada.
@@ -150,7 +470,11 @@ def matriz_traspuesta (matriz):
     Returns:
         Matriz traspuesta de tamaño n x m,
         donde las filas y columnas están intercambiadas respecto a la matriz original.
+        Si la entrada es una Matriz, la traspuesta comparte sus datos (sin copia).
     """
+    if isinstance(matriz, (Matriz, MatrizDispersa)):
+        return matriz.traspuesta()
+
     filas = len (matriz)
     columnas = len(matriz[0])
     resultado = []
@@ -161,33 +485,134 @@ def matriz_traspuesta (matriz):
         resultado.append(fila)
     return resultado
 
-def matriz_cofactores(matriz):
+class CacheMenores:
+    """
+    Caché LRU de determinantes de menores con contador de aciertos y fallos.
+
+    Cada menor se identifica por las filas y columnas que quedan de la matriz
+    original (equivale a indicar las que se han eliminado).
+    """
+
+    def __init__(self, capacidad=100_000):
+        self.capacidad = capacidad  # Número máximo de menores guardados
+        self.valores = OrderedDict()  # Orden de uso: el primero es el menos reciente
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave):
+        """
+        Devuelve el determinante guardado para 'clave', o None si no está.
+        """
+        if clave in self.valores:
+            self.valores.move_to_end(clave)  # Lo marcamos como usado recientemente
+            self.aciertos += 1
+            return self.valores[clave]
+        self.fallos += 1
+        return None
+
+    def guardar(self, clave, valor):
+        """
+        Guarda un determinante, descartando el menos usado si se supera la capacidad.
+        """
+        self.valores[clave] = valor
+        if len(self.valores) > self.capacidad:
+            self.valores.popitem(last=False)
+
+    def limpiar(self):
+        """
+        Vacía los valores guardados (las estadísticas se conservan).
+        """
+        self.valores.clear()
+
+    def tasa_aciertos(self):
+        """
+        Devuelve la proporción de consultas resueltas desde la caché (0 a 1).
+        """
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+def determinante_menor(matriz, filas, columnas, cache):
+    """
+    Calcula por desarrollo de Laplace el determinante del menor formado por
+    las filas y columnas indicadas, reutilizando los submenores ya calculados.
+
+    Solo usa sumas y productos, así que el resultado es exacto con enteros o fracciones.
+
+    Args:
+        matriz : Matriz cuadrada original.
+        filas, columnas : Tuplas con los índices que forman el menor.
+        cache : CacheMenores donde se guardan los resultados intermedios.
+
+    Returns:
+        Determinante del menor.
+    """
+    if len(filas) == 1:
+        return matriz[filas[0]][columnas[0]]
+
+    clave = (filas, columnas)
+    det = cache.obtener(clave)
+    if det is not None:
+        return det
+
+    # Desarrollamos por la primera fila que queda
+    fila = matriz[filas[0]]
+    resto_filas = filas[1:]
+    det = 0
+    for posicion, j in enumerate(columnas):
+        if fila[j]:  # Los ceros no aportan nada: nos ahorramos el submenor
+            resto_columnas = columnas[:posicion] + columnas[posicion + 1:]
+            det += (-1) ** posicion * fila[j] * determinante_menor(matriz, resto_filas, resto_columnas, cache)
+    cache.guardar(clave, det)
+    return det
+
+def matriz_cofactores(matriz, cache=None):
     """
         Calcula la matriz de cofactores de una matriz cuadrada.
 
+        Los menores comparten submenores entre sí, así que se calculan una sola
+        vez con una caché LRU (programación dinámica sobre los menores).
+
         Args:
             matriz : Matriz cuadrada original.
+            cache : CacheMenores opcional, útil para consultar después su tasa de aciertos.
 
         Returns:
              Matriz de cofactores.
         """
+    if isinstance(matriz, (Matriz, MatrizDispersa)):
+        return type(matriz).desde_lista(matriz_cofactores(matriz.tolist(), cache))
+
+    if cache is None:
+        cache = CacheMenores()
+    cache.limpiar()  # Las claves solo son válidas para esta matriz
+
     n = len(matriz)
+    indices = tuple(range(n))
     cofactores = []
     for i in range(n):
         fila_cofactores = []
+        filas = indices[:i] + indices[i + 1:]  # Eliminamos la fila i
         for j in range(n):
-            menor = obtener_menor(matriz, i, j)  # Obtenemos el menor M_ij
-            cofactor = (-1) ** (i + j) * determinante(menor)  # Aplicamos el signo y determinante
+            columnas = indices[:j] + indices[j + 1:]  # Eliminamos la columna j
+            if n == 1:
+                menor = 1  # El menor de una matriz 1x1 es la matriz vacía
+            else:
+                menor = determinante_menor(matriz, filas, columnas, cache)
+            cofactor = (-1) ** (i + j) * menor  # Aplicamos el signo y determinante
             fila_cofactores.append(cofactor)
         cofactores.append(fila_cofactores)
     return cofactores
 
-def matriz_inversa(matriz):
+@con_backend
+def matriz_inversa(matriz, exacto=None):
     """
-    Calcula la matriz inversa de una matriz cuadrada (si existe).
+    Calcula la matriz inversa de una matriz cuadrada (si existe) por Gauss-Jordan, en O(n^3).
 
     Args:
         matriz : Lista de listas que representa una matriz cuadrada.
+        exacto : Si es True se opera con Fraction y el resultado es exacto;
+                 si es False se opera con float y pivoteo parcial.
+                 Por defecto es exacto si la matriz solo contiene enteros o fracciones.
 
     Returns:
         Lista de listas que representa la matriz inversa.
@@ -200,31 +625,47 @@ def matriz_inversa(matriz):
     columnas = len(matriz[0])       # Número de columnas
 
     # Paso 1: Verificamos que sea cuadrada
-    if filas != columnas:
+    if filas != columnas or any(len(fila) != columnas for fila in matriz):
         raise ValueError("La matriz debe ser cuadrada para poder calcular su inversa.")
 
-    # Paso 2: Calculamos el determinante
-    det = determinante(matriz)
-
-    if det == 0:
-        # Si el determinante es 0, la matriz no tiene inversa
-        raise ValueError("La matriz no tiene inversa porque su determinante es cero.")
-
-    # Paso 3: Calculamos la matriz de cofactores
-    cofactores = matriz_cofactores(matriz)
-
-    # Paso 4: Transponemos la matriz de cofactores para obtener la adjunta
-    adjunta = matriz_traspuesta(cofactores)
-
-    # Paso 5: Dividimos cada elemento de la adjunta entre el determinante
-    inversa = []
-    for fila in adjunta:
-        fila_inversa = []
-        for elemento in fila:
-            fila_inversa.append(elemento / det)  # División escalar
-        inversa.append(fila_inversa)
-
-    return inversa
+    n = filas
+    if exacto is None:
+        exacto = es_exacta(matriz)
+    convertir = Fraction if exacto else float
+    # Con float, un pivote tan pequeño como el error de redondeo acumulado cuenta como cero
+    tolerancia = 0 if exacto else n * sys.float_info.epsilon * max(abs(valor) for fila in matriz for valor in fila)
+
+    # Paso 2: Construimos la matriz ampliada [A | I]
+    ampliada = []
+    for i, fila in enumerate(matriz):
+        nueva_fila = [convertir(valor) for valor in fila]
+        nueva_fila.extend(convertir(1 if j == i else 0) for j in range(n))
+        ampliada.append(nueva_fila)
+
+    # Paso 3: Reducimos columna a columna hasta dejar la identidad a la izquierda
+    for k in range(n):
+        pivote = max(range(k, n), key=lambda i: abs(ampliada[i][k]))
+        if abs(ampliada[pivote][k]) <= tolerancia:
+            # Si no hay pivote, el determinante es 0 y la matriz no tiene inversa
+            raise ValueError("La matriz no tiene inversa porque su determinante es cero.")
+        ampliada[k], ampliada[pivote] = ampliada[pivote], ampliada[k]
+
+        fila_pivote = ampliada[k]
+        valor_pivote = fila_pivote[k]
+        for j in range(k, 2 * n):
+            fila_pivote[j] /= valor_pivote  # Normalizamos la fila del pivote
+
+        for i in range(n):
+            if i == k:
+                continue
+            fila = ampliada[i]
+            factor = fila[k]
+            if factor:  # Anulamos la columna k en el resto de filas
+                for j in range(k, 2 * n):
+                    fila[j] -= factor * fila_pivote[j]
+
+    # Paso 4: La mitad derecha de la matriz ampliada es la inversa
+    return [fila[n:] for fila in ampliada]
 
 
 def leer_matriz(nombre, filas, columnas):
@@ -250,7 +691,7 @@ def leer_matriz(nombre, filas, columnas):
 
 def imprimir_matriz(matriz):#Saca por pantalla la matriz resultado
     for fila in matriz:
-        print(fila)
+        print("[" + ", ".join(map(str, fila)) + "]")  # str: las fracciones se ven como 1/2
 
 def introducir_matrices_misma_dimension(nombre1, nombre2):
     n = int(input("Número de filas: "))
@@ -259,8 +700,172 @@ def introducir_matrices_misma_dimension(nombre1, nombre2):
     matriz2 = leer_matriz(nombre2, n, m)
     return matriz1, matriz2
 
+# ----------------------- MODO POR LOTES (ARCHIVOS) -----------------------
+
+# Operaciones disponibles en modo por lotes: nombre -> (función, número de matrices que usa)
+OPERACIONES_LOTE = {
+    "sumar": (sumar_matrices, 2),
+    "restar": (restar_matrices, 2),
+    "multiplicar": (multiplicar_matrices, 2),
+    "traspuesta": (matriz_traspuesta, 1),
+    "determinante": (determinante, 1),
+    "inversa": (matriz_inversa, 1),
+}
+
+def convertir_valor(texto):
+    """
+    Convierte un texto leído de un archivo en int, en Fraction si es una fracción
+    como "1/3" (así escribe los resultados exactos escribir_resultado_archivo) o en float.
+    """
+    try:
+        return int(texto)
+    except ValueError:
+        if "/" in texto:
+            return Fraction(texto)
+        return float(texto)
+
+def leer_filas_archivo(ruta):
+    """
+    Lee una matriz de un archivo fila a fila, sin cargar el archivo completo.
+
+    Formatos admitidos según la extensión:
+    - .csv: valores separados por comas.
+    - .npy: array de NumPy (se abre con mmap y se recorre por filas).
+    - cualquier otra: valores separados por espacios o tabuladores.
+
+    Las líneas vacías se ignoran.
+
+    Yields:
+        Cada fila como lista de números.
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".npy":
+        import numpy as np  # Solo hace falta NumPy para este formato
+        for fila in np.load(ruta, mmap_mode="r"):
+            yield fila.tolist()
+    elif extension == ".csv":
+        with open(ruta, "r", newline="", encoding="utf-8") as archivo:
+            for fila in csv.reader(archivo):
+                if fila:
+                    yield [convertir_valor(valor.strip()) for valor in fila]
+    else:
+        with open(ruta, "r", encoding="utf-8") as archivo:
+            for linea in archivo:
+                valores = linea.split()
+                if valores:
+                    yield [convertir_valor(valor) for valor in valores]
+
+def leer_matriz_archivo(ruta):
+    """
+    Lee una matriz completa de un archivo (ver leer_filas_archivo).
+
+    Raises:
+        ValueError: Si el archivo está vacío o las filas no tienen la misma longitud.
+    """
+    matriz = list(leer_filas_archivo(ruta))
+    if not matriz:
+        raise ValueError(f"El archivo {ruta} no contiene ninguna matriz.")
+    if any(len(fila) != len(matriz[0]) for fila in matriz):
+        raise ValueError(f"Las filas de {ruta} no tienen todas la misma longitud.")
+    return matriz
+
+def escribir_resultado_archivo(ruta, resultado):
+    """
+    Escribe el resultado (una matriz o un número) en un archivo.
+
+    El formato se elige por la extensión igual que en leer_filas_archivo. En .npy los
+    enteros se guardan como int64 y los reales como float64; en CSV y texto las fracciones
+    se escriben como "1/3".
+
+    Raises:
+        ValueError: Si el resultado no se puede guardar en .npy sin perder exactitud
+                    (fracciones o enteros que no caben en int64).
+    """
+    if isinstance(resultado, Matriz):
+        resultado = resultado.tolist()
+    if not isinstance(resultado, list):
+        resultado = [[resultado]]  # Un número (p. ej. un determinante) se guarda como matriz 1x1
+
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".npy":
+        import numpy as np
+        valores = list(chain.from_iterable(resultado))
+        if any(isinstance(valor, Fraction) for valor in valores):
+            raise ValueError("El resultado tiene fracciones exactas, que no se pueden guardar en .npy "
+                             "sin redondear; usa un archivo .csv o de texto.")
+        if all(isinstance(valor, int) for valor in valores):
+            if any(not -2 ** 63 <= valor < 2 ** 63 for valor in valores):
+                raise ValueError("El resultado tiene enteros que no caben en int64; usa un archivo .csv o de texto.")
+            tipo = np.int64
+        else:
+            tipo = float
+        np.save(ruta, np.asarray(resultado, dtype=tipo))
+    elif extension == ".csv":
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            csv.writer(archivo).writerows(resultado)
+    else:
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            for fila in resultado:
+                archivo.write(" ".join(str(valor) for valor in fila) + "\n")
+
+def ejecutar_operaciones(matrices, operaciones):
+    """
+    Aplica una cadena de operaciones sobre una lista de matrices.
+
+    La primera matriz es el valor inicial; cada operación binaria (sumar,
+    restar, multiplicar) toma como segundo operando la siguiente matriz de la lista.
+
+    Args:
+        matrices : Lista de matrices de entrada.
+        operaciones : Lista de nombres de OPERACIONES_LOTE.
+
+    Returns:
+        Resultado de la última operación.
+
+    Raises:
+        ValueError: Si una operación no existe o faltan o sobran matrices.
+    """
+    pendientes = iter(matrices[1:])
+    resultado = matrices[0]
+    for nombre in operaciones:
+        if nombre not in OPERACIONES_LOTE:
+            raise ValueError(f"Operación desconocida: {nombre}")
+        funcion, operandos = OPERACIONES_LOTE[nombre]
+        if not isinstance(resultado, (list, Matriz)):
+            raise ValueError(f"No se puede aplicar '{nombre}' a un número.")
+        if operandos == 2:
+            otra = next(pendientes, None)
+            if otra is None:
+                raise ValueError(f"Falta una matriz para la operación '{nombre}'.")
+            resultado = funcion(resultado, otra)
+        else:
+            resultado = funcion(resultado)
+    if next(pendientes, None) is not None:
+        raise ValueError("Sobran matrices de entrada para las operaciones indicadas.")
+    return resultado
+
+def modo_lotes(args):
+    """
+    Ejecuta la calculadora sin menú con los argumentos de la línea de órdenes.
+    """
+    try:
+        matrices = [leer_matriz_archivo(ruta) for ruta in args.entrada]
+        resultado = ejecutar_operaciones(matrices, args.operaciones)
+        if args.salida:
+            escribir_resultado_archivo(args.salida, resultado)
+            return 0
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if isinstance(resultado, (list, Matriz)):
+        imprimir_matriz(resultado.tolist() if isinstance(resultado, Matriz) else resultado)
+    else:
+        print(resultado)
+    return 0
+
 # Ahora desarollamos la parte principal del programa
-def main():
+def menu_interactivo():
     opcion = 0
     while opcion!= 7: # Mientras no se elija la opción de salir, se sigue ejecutando el bucle
         print("\n---MENÚ DE OPERACIONES---")
@@ -394,8 +999,31 @@ def main():
                 imprimir_matriz(inversa)
 
 
+def main(argv=None):
+    """
+    Sin argumentos muestra el menú interactivo; con --entrada funciona por lotes.
+
+    Ejemplo:
+        python Calculadora_de_matrices.py -e a.csv b.csv -o multiplicar traspuesta -s resultado.csv
+    """
+    parser = argparse.ArgumentParser(description="Calculadora de matrices.")
+    parser.add_argument("-e", "--entrada", nargs="+",
+                        help="Archivos con las matrices (.csv, .npy o texto separado por espacios).")
+    parser.add_argument("-o", "--operaciones", nargs="+", choices=sorted(OPERACIONES_LOTE),
+                        help="Operaciones a encadenar, en orden.")
+    parser.add_argument("-s", "--salida", help="Archivo donde guardar el resultado (por defecto, pantalla).")
+    args = parser.parse_args(argv)
+
+    if not args.entrada:
+        menu_interactivo()
+        return 0
+    if not args.operaciones:
+        parser.error("en modo por lotes hay que indicar --operaciones")
+    return modo_lotes(args)
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
 
 
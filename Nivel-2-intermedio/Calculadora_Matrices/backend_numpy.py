@@ -0,0 +1,145 @@
+# Implementación vectorizada con NumPy de las operaciones de la calculadora de matrices.
+#
+# Calculadora_de_matrices.py importa este módulo solo si NumPy está instalado.
+# Las funciones tienen la misma firma que las de Python puro y devuelven listas
+# de listas. Cuando no pueden respetar el mismo resultado (por ejemplo, cálculos
+# exactos con Fraction, o enteros cuyo resultado no cabe en int64) devuelven
+# NotImplemented y se usa la versión en Python puro.
+
+import numpy as np
+
+
+MAXIMO_INT64 = int(np.iinfo(np.int64).max)
+
+
+def _a_array(matriz):
+    """
+    Convierte una matriz en un array de NumPy.
+
+    Returns:
+        Array numérico, o None si los valores no son numéricos nativos
+        (Fraction, enteros demasiado grandes...) y hay que usar Python puro.
+    """
+    try:
+        array = np.asarray(matriz)
+    except ValueError:
+        return None  # Filas de distinta longitud
+    if array.dtype == object or array.ndim != 2:
+        return None
+    if array.dtype == bool:
+        array = array.astype(np.int64)  # Con bool, NumPy sumaría como un "o" lógico
+    return array
+
+
+def _es_exacta(array):
+    return array.dtype.kind in "biu"  # Booleanos y enteros
+
+
+def _maximo_absoluto(array):
+    """
+    Mayor valor absoluto de un array, como int de Python (sin desbordarse en int64).
+    """
+    if array.size == 0:
+        return 0
+    return max(int(array.max()), -int(array.min()))
+
+
+def _cabe_en_int64(a, b, productos=None):
+    """
+    Indica si una operación entre los arrays a y b no puede desbordar int64.
+
+    Si alguno no es entero, NumPy trabaja en coma flotante y no hay desbordamiento.
+    Con 'productos' (n de una multiplicación m x n por n x p) se acota la suma de
+    n productos; si no, la suma o resta celda a celda.
+    """
+    if not (_es_exacta(a) and _es_exacta(b)):
+        return True
+    if productos is None:
+        return _maximo_absoluto(a) + _maximo_absoluto(b) <= MAXIMO_INT64
+    return productos * _maximo_absoluto(a) * _maximo_absoluto(b) <= MAXIMO_INT64
+
+
+def _operandos_mismo_tamano(matriz1, matriz2):
+    """
+    Convierte dos matrices para sumarlas o restarlas.
+
+    Returns:
+        Tupla (a, b), o None si hay que usar Python puro.
+
+    Raises:
+        ValueError: Si no tienen el mismo tamaño (NumPy las difundiría en lugar de fallar).
+    """
+    a, b = _a_array(matriz1), _a_array(matriz2)
+    if a is None or b is None:
+        return None
+    if a.shape != b.shape:
+        raise ValueError("Las matrices deben tener el mismo tamaño.")
+    if not _cabe_en_int64(a, b):
+        return None
+    return a, b
+
+
+def sumar_matrices(matriz1, matriz2):
+    operandos = _operandos_mismo_tamano(matriz1, matriz2)
+    if operandos is None:
+        return NotImplemented
+    a, b = operandos
+    return (a + b).tolist()
+
+
+def restar_matrices(matriz1, matriz2):
+    operandos = _operandos_mismo_tamano(matriz1, matriz2)
+    if operandos is None:
+        return NotImplemented
+    a, b = operandos
+    return (a - b).tolist()
+
+
+def multiplicar_matrices(matriz1, matriz2):
+    a, b = _a_array(matriz1), _a_array(matriz2)
+    if a is None or b is None:
+        return NotImplemented
+    if a.shape[1] != b.shape[0]:
+        raise ValueError("Las matrices no se pueden multiplicar: columnas de matriz1 ≠ filas de matriz2")
+    if not _cabe_en_int64(a, b, productos=a.shape[1]):
+        return NotImplemented  # Los enteros de Python no se desbordan
+    return (a @ b).tolist()
+
+
+def matriz_traspuesta(matriz):
+    a = _a_array(matriz)
+    if a is None:
+        return NotImplemented
+    return a.T.tolist()
+
+
+def determinante(matriz, exacto=None):
+    a = _a_array(matriz)
+    if a is None:
+        return NotImplemented
+    if exacto is None:
+        exacto = _es_exacta(a)
+    if exacto:
+        return NotImplemented  # NumPy trabaja en coma flotante: el resultado exacto lo da Python puro
+    if a.shape[0] != a.shape[1]:
+        raise ValueError("La matriz debe ser cuadrada.")
+    return float(np.linalg.det(a))
+
+
+def matriz_inversa(matriz, exacto=None):
+    a = _a_array(matriz)
+    if a is None:
+        return NotImplemented
+    if exacto is None:
+        exacto = _es_exacta(a)
+    if exacto:
+        return NotImplemented  # La inversa exacta (con Fraction) la da Python puro
+    if a.shape[0] != a.shape[1]:
+        raise ValueError("La matriz debe ser cuadrada para poder calcular su inversa.")
+    if np.linalg.matrix_rank(a) < a.shape[0]:
+        # np.linalg.inv solo falla con pivotes exactamente cero: el rango usa una tolerancia relativa
+        raise ValueError("La matriz no tiene inversa porque su determinante es cero.")
+    try:
+        return np.linalg.inv(a.astype(float)).tolist()
+    except np.linalg.LinAlgError:
+        raise ValueError("La matriz no tiene inversa porque su determinante es cero.")
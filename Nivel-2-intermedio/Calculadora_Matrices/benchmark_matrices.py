@@ -0,0 +1,244 @@
+# Pruebas de rendimiento de la calculadora de matrices.
+#
+# Órdenes disponibles:
+#   suite          Mide sumar, multiplicar, determinante, cofactores e inversa con
+#                  varios tamaños y tipos (int, float, Fraction). Puede guardar los
+#                  resultados en JSON y compararlos con los de otra ejecución.
+#   multiplicacion Compara la multiplicación actual con la versión ingenua (i-j-k).
+#   cofactores     Mide la matriz de cofactores y la tasa de aciertos de su caché.
+#   paralelo       Mide el escalado de la multiplicación en paralelo.
+#
+# Uso:
+#   python benchmark_matrices.py suite --json actual.json --comparar anterior.json
+#   python benchmark_matrices.py multiplicacion 64 128 256 512
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from datetime import datetime
+from fractions import Fraction
+
+import Calculadora_de_matrices as calculadora
+from Calculadora_de_matrices import (CacheMenores, determinante, matriz_cofactores, matriz_inversa,
+                                     multiplicar_matrices, sumar_matrices, usar_backend)
+from multiplicacion_paralela import multiplicar_matrices_paralelo
+
+
+TAMANOS_POR_DEFECTO = [64, 128, 256, 512]
+TAMANOS_COFACTORES = [4, 6, 8, 10, 12]
+TAMANO_PARALELO = 256
+TOLERANCIA_REGRESION = 0.20  # Un caso es regresión si tarda más de un 20 % que antes
+
+TIPOS = {"int": int, "float": float, "Fraction": Fraction}
+
+# Casos de la suite: operación -> (función que recibe las matrices, nº de matrices, tamaños)
+CASOS = {
+    "sumar_matrices": (sumar_matrices, 2, [64, 128, 256]),
+    "multiplicar_matrices": (multiplicar_matrices, 2, [32, 64, 128]),
+    "determinante": (determinante, 1, [16, 32, 64]),
+    "matriz_cofactores": (matriz_cofactores, 1, [6, 8, 10]),
+    "matriz_inversa": (matriz_inversa, 1, [16, 32, 64]),
+}
+
+
+def multiplicar_ingenua(matriz1, matriz2):
+    """
+    Multiplicación de referencia con el triple bucle i-j-k (implementación original).
+
+    Args:
+        matriz1 : Primera matriz (m x n).
+        matriz2 : Segunda matriz (n x p).
+
+    Returns:
+        Matriz resultante de tamaño (m x p).
+    """
+    resultado = []
+    for i in range(len(matriz1)):
+        fila = []
+        for j in range(len(matriz2[0])):
+            elemento = 0
+            for k in range(len(matriz1[0])):
+                elemento += matriz1[i][k] * matriz2[k][j]
+            fila.append(elemento)
+        resultado.append(fila)
+    return resultado
+
+
+def matriz_aleatoria(filas, columnas, minimo=-9, maximo=9, tipo=int):
+    """
+    Crea una matriz de valores aleatorios.
+
+    Args:
+        filas, columnas : Dimensiones de la matriz.
+        minimo, maximo : Rango de los valores.
+        tipo : int, float o Fraction.
+
+    Returns:
+        Matriz creada.
+    """
+    return [[tipo(random.randint(minimo, maximo)) for _ in range(columnas)] for _ in range(filas)]
+
+
+def medir(funcion, *args, repeticiones=3):
+    """
+    Devuelve el mejor tiempo (en segundos) de varias ejecuciones de funcion(*args).
+    """
+    return min(timeit.repeat(lambda: funcion(*args), number=1, repeat=repeticiones))
+
+
+def comparar_multiplicacion(tamanos):
+    """
+    Muestra una tabla con el tiempo de la multiplicación ingenua, la actual y la mejora.
+    """
+    print(f"{'n':>6} {'ingenua (s)':>12} {'actual (s)':>12} {'mejora':>8}")
+    for n in tamanos:
+        a = matriz_aleatoria(n, n)
+        b = matriz_aleatoria(n, n)
+        repeticiones = 3 if n <= 128 else 1
+        t_ingenua = medir(multiplicar_ingenua, a, b, repeticiones=repeticiones)
+        t_actual = medir(multiplicar_matrices, a, b, repeticiones=repeticiones)
+        print(f"{n:>6} {t_ingenua:>12.4f} {t_actual:>12.4f} {t_ingenua / t_actual:>7.2f}x")
+
+
+def informe_cofactores(tamanos):
+    """
+    Muestra el tiempo de matriz_cofactores y la tasa de aciertos de su caché de menores.
+    """
+    print(f"{'n':>6} {'tiempo (s)':>12} {'aciertos':>10} {'menores':>10}")
+    for n in tamanos:
+        a = matriz_aleatoria(n, n)
+        cache = CacheMenores()
+        tiempo = medir(matriz_cofactores, a, cache, repeticiones=1)
+        print(f"{n:>6} {tiempo:>12.4f} {cache.tasa_aciertos():>9.1%} {len(cache.valores):>10}")
+
+
+def escalado_paralelo(n, max_procesos=None):
+    """
+    Muestra el tiempo de multiplicar_matrices_paralelo con 1, 2, 4... procesos.
+    """
+    max_procesos = max_procesos or os.cpu_count() or 1
+    a = matriz_aleatoria(n, n)
+    b = matriz_aleatoria(n, n)
+    procesos = 1
+    t_serie = None
+    print(f"{'procesos':>8} {'tiempo (s)':>12} {'aceleración':>12}   (n = {n})")
+    while procesos <= max_procesos:
+        tiempo = medir(multiplicar_matrices_paralelo, a, b, procesos, repeticiones=1)
+        t_serie = t_serie or tiempo
+        print(f"{procesos:>8} {tiempo:>12.4f} {t_serie / tiempo:>11.2f}x")
+        procesos *= 2
+
+
+def ejecutar_suite(tipos, repeticiones=3):
+    """
+    Mide cada caso de CASOS con cada tipo de dato.
+
+    Args:
+        tipos : Nombres de TIPOS a medir.
+        repeticiones : Ejecuciones por caso (se guarda el mejor tiempo).
+
+    Returns:
+        Lista de diccionarios {operacion, tamano, tipo, segundos}.
+    """
+    random.seed(0)  # Mismas matrices en todas las ejecuciones para poder comparar
+    resultados = []
+    print(f"{'operación':<22} {'tipo':<9} {'n':>5} {'tiempo (s)':>12}")
+    for operacion, (funcion, numero_matrices, tamanos) in CASOS.items():
+        for nombre_tipo in tipos:
+            for n in tamanos:
+                matrices = [matriz_aleatoria(n, n, tipo=TIPOS[nombre_tipo]) for _ in range(numero_matrices)]
+                argumentos = matrices
+                if operacion == "matriz_inversa":
+                    argumentos = matrices + [nombre_tipo == "Fraction"]  # Exacta solo con Fraction, como antes
+                segundos = medir(funcion, *argumentos, repeticiones=repeticiones)
+                print(f"{operacion:<22} {nombre_tipo:<9} {n:>5} {segundos:>12.5f}")
+                resultados.append({"operacion": operacion, "tipo": nombre_tipo, "tamano": n, "segundos": segundos})
+    return resultados
+
+
+def guardar_json(ruta, resultados, backend):
+    """
+    Guarda los resultados junto con los datos del entorno en un archivo JSON.
+    """
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "backend": backend,
+        "resultados": resultados,
+    }
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=4)
+
+
+def comparar_resultados(ruta_anterior, resultados, tolerancia=TOLERANCIA_REGRESION):
+    """
+    Compara los resultados con los de un JSON anterior y muestra las regresiones.
+
+    Returns:
+        Lista de casos (operación, tipo, tamaño) que han empeorado más que 'tolerancia'.
+    """
+    with open(ruta_anterior, "r", encoding="utf-8") as f:
+        anteriores = {(r["operacion"], r["tipo"], r["tamano"]): r["segundos"] for r in json.load(f)["resultados"]}
+
+    regresiones = []
+    print(f"\n{'operación':<22} {'tipo':<9} {'n':>5} {'antes (s)':>11} {'ahora (s)':>11} {'cambio':>8}")
+    for r in resultados:
+        clave = (r["operacion"], r["tipo"], r["tamano"])
+        if clave not in anteriores:
+            continue
+        cambio = r["segundos"] / anteriores[clave] - 1
+        marca = "  <-- REGRESIÓN" if cambio > tolerancia else ""
+        print(f"{clave[0]:<22} {clave[1]:<9} {clave[2]:>5} {anteriores[clave]:>11.5f} {r['segundos']:>11.5f} {cambio:>+7.0%}{marca}")
+        if cambio > tolerancia:
+            regresiones.append(clave)
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de la calculadora de matrices.")
+    parser.add_argument("--backend", choices=sorted(calculadora.BACKENDS), default="python",
+                        help="Backend con el que se ejecutan las operaciones (por defecto, python).")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+
+    suite = ordenes.add_parser("suite", help="Suite completa con salida en JSON.")
+    suite.add_argument("--tipos", nargs="+", choices=list(TIPOS), default=list(TIPOS))
+    suite.add_argument("--repeticiones", type=int, default=3)
+    suite.add_argument("--json", help="Archivo donde guardar los resultados.")
+    suite.add_argument("--comparar", help="JSON de una ejecución anterior con el que comparar.")
+    suite.add_argument("--tolerancia", type=float, default=TOLERANCIA_REGRESION)
+
+    multiplicacion = ordenes.add_parser("multiplicacion", help="Multiplicación actual frente a la ingenua.")
+    multiplicacion.add_argument("tamanos", nargs="*", type=int, default=TAMANOS_POR_DEFECTO)
+
+    cofactores = ordenes.add_parser("cofactores", help="Cofactores y caché de menores.")
+    cofactores.add_argument("tamanos", nargs="*", type=int, default=TAMANOS_COFACTORES)
+
+    paralelo = ordenes.add_parser("paralelo", help="Escalado de la multiplicación en paralelo.")
+    paralelo.add_argument("tamano", nargs="?", type=int, default=TAMANO_PARALELO)
+    paralelo.add_argument("--procesos", type=int, help="Número máximo de procesos.")
+
+    args = parser.parse_args(argv)
+    usar_backend(args.backend)
+
+    if args.orden == "multiplicacion":
+        comparar_multiplicacion(args.tamanos)
+    elif args.orden == "cofactores":
+        informe_cofactores(args.tamanos)
+    elif args.orden == "paralelo":
+        escalado_paralelo(args.tamano, args.procesos)
+    else:
+        resultados = ejecutar_suite(args.tipos, args.repeticiones)
+        if args.json:
+            guardar_json(args.json, resultados, args.backend)
+        if args.comparar and comparar_resultados(args.comparar, resultados, args.tolerancia):
+            return 1  # Código de salida distinto de cero si hay regresiones
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
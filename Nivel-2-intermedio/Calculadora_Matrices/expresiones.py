@@ -0,0 +1,139 @@
+# Expresiones de matrices con evaluación perezosa.
+#
+# Las operaciones sobre objetos Expresion no calculan nada: construyen un árbol
+# que se evalúa al llamar a evaluar(). Las operaciones celda a celda (suma, resta,
+# producto por un escalar y traspuesta) se fusionan en un único recorrido fila a
+# fila sin crear matrices intermedias; solo los productos de matrices y las
+# potencias se calculan por separado.
+#
+# Ejemplo:
+#     A, B, C = Expresion(a), Expresion(b), Expresion(c)
+#     resultado = (A @ B + C.T - 2 * A ** 3).evaluar()
+
+from itertools import repeat
+from operator import add, mul, sub
+
+from Calculadora_de_matrices import matriz_traspuesta, multiplicar_matrices, potencia_matriz
+
+
+class Expresion:
+    """
+    Nodo de una expresión de matrices.
+
+    Atributos:
+    - operacion: "hoja", "suma", "resta", "escalar", "traspuesta", "producto" o "potencia"
+    - operandos: nodos hijos (o la matriz, en una hoja)
+    - parametro: escalar o exponente, según la operación
+    - filas, columnas: dimensiones del resultado
+    """
+
+    __slots__ = ("operacion", "operandos", "parametro", "filas", "columnas")
+
+    # Operaciones que se resuelven celda a celda y pueden fusionarse
+    CELDA_A_CELDA = {"suma", "resta", "escalar", "traspuesta"}
+
+    def __init__(self, matriz=None, operacion="hoja", operandos=(), parametro=None, filas=None, columnas=None):
+        """
+        Crea una hoja a partir de una lista de listas: Expresion(matriz).
+        El resto de argumentos los usan los operadores para construir el árbol.
+        """
+        self.operacion = operacion
+        self.parametro = parametro
+        if operacion == "hoja":
+            self.operandos = (matriz,)
+            self.filas = len(matriz)
+            self.columnas = len(matriz[0]) if matriz else 0
+        else:
+            self.operandos = operandos
+            self.filas = filas
+            self.columnas = columnas
+
+    @staticmethod
+    def _como_expresion(valor):
+        return valor if isinstance(valor, Expresion) else Expresion(valor)
+
+    def _celda_a_celda(self, otra, operacion):
+        otra = Expresion._como_expresion(otra)
+        if (self.filas, self.columnas) != (otra.filas, otra.columnas):
+            raise ValueError("Las matrices deben tener el mismo tamaño.")
+        return Expresion(operacion=operacion, operandos=(self, otra), filas=self.filas, columnas=self.columnas)
+
+    def __add__(self, otra):
+        return self._celda_a_celda(otra, "suma")
+
+    def __radd__(self, otra):
+        return Expresion._como_expresion(otra)._celda_a_celda(self, "suma")
+
+    def __sub__(self, otra):
+        return self._celda_a_celda(otra, "resta")
+
+    def __rsub__(self, otra):
+        return Expresion._como_expresion(otra)._celda_a_celda(self, "resta")
+
+    def __mul__(self, escalar):
+        if isinstance(escalar, (Expresion, list)):
+            raise TypeError("Usa @ para multiplicar matrices; * solo admite escalares.")
+        return Expresion(operacion="escalar", operandos=(self,), parametro=escalar,
+                         filas=self.filas, columnas=self.columnas)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return self * -1
+
+    def __matmul__(self, otra):
+        otra = Expresion._como_expresion(otra)
+        if self.columnas != otra.filas:
+            raise ValueError("Las matrices no se pueden multiplicar: columnas de matriz1 ≠ filas de matriz2")
+        return Expresion(operacion="producto", operandos=(self, otra), filas=self.filas, columnas=otra.columnas)
+
+    def __rmatmul__(self, otra):
+        return Expresion._como_expresion(otra) @ self
+
+    def __pow__(self, exponente):
+        if self.filas != self.columnas:
+            raise ValueError("La matriz debe ser cuadrada para poder elevarla a una potencia.")
+        return Expresion(operacion="potencia", operandos=(self,), parametro=exponente,
+                         filas=self.filas, columnas=self.columnas)
+
+    @property
+    def T(self):
+        return Expresion(operacion="traspuesta", operandos=(self,), filas=self.columnas, columnas=self.filas)
+
+    def __repr__(self):
+        return f"Expresion({self.operacion}, {self.filas}x{self.columnas})"
+
+    def evaluar(self):
+        """
+        Calcula la expresión y devuelve el resultado como lista de listas.
+        """
+        if self.operacion == "hoja":
+            return self.operandos[0]
+        if self.operacion == "producto":
+            izquierda, derecha = self.operandos
+            return multiplicar_matrices(izquierda.evaluar(), derecha.evaluar())
+        if self.operacion == "potencia":
+            return potencia_matriz(self.operandos[0].evaluar(), self.parametro)
+        if self.operacion == "traspuesta" and self.operandos[0].operacion not in Expresion.CELDA_A_CELDA:
+            return matriz_traspuesta(self.operandos[0].evaluar())
+        # Operación celda a celda: un único recorrido para todo el subárbol fusionado
+        return [list(fila) for fila in self._filas()]
+
+    def _filas(self):
+        """
+        Devuelve un iterador perezoso sobre las filas del resultado; cada fila es
+        a su vez un iterable que se calcula al recorrerlo.
+        """
+        operacion = self.operacion
+        if operacion in ("suma", "resta"):
+            operador = add if operacion == "suma" else sub
+            izquierda, derecha = self.operandos
+            return (map(operador, fila_i, fila_d) for fila_i, fila_d in zip(izquierda._filas(), derecha._filas()))
+        if operacion == "escalar":
+            escalar = self.parametro
+            return (map(mul, repeat(escalar), fila) for fila in self.operandos[0]._filas())
+        if operacion == "traspuesta":
+            hijo = self.operandos[0]
+            # Las columnas de la matriz del hijo son las filas de la traspuesta (zip las genera de una en una)
+            return zip(*(hijo.operandos[0] if hijo.operacion == "hoja" else hijo.evaluar()))
+        return iter(self.evaluar())  # Producto, potencia u hoja: se calculan y se recorren
@@ -0,0 +1,149 @@
+# Representación compacta de una matriz sobre un único buffer plano de array.
+#
+# En lugar de una lista por fila y un objeto int por celda, la clase Matriz
+# guarda todos los valores en un array('q') (enteros) o array('d') (reales)
+# y localiza cada celda con sus pasos de fila y de columna:
+#
+#     posición de [i][j] = i * paso_fila + j * paso_columna
+#
+# Los enteros que no caben en 64 bits no caben en un array('q'): en ese caso
+# los valores se guardan en una lista de Python, con la misma disposición.
+
+from array import array
+from operator import add, sub
+
+
+def _crear_datos(tipo, valores):
+    """
+    Devuelve array(tipo, valores) o, si algún entero no cabe en un array('q'), una lista con los valores.
+
+    Args:
+        tipo : "q" o "d".
+        valores : Lista con los valores.
+    """
+    try:
+        return array(tipo, valores)
+    except OverflowError:
+        return list(valores)  # Enteros de Python: no tienen límite de tamaño
+
+
+def _codigo_tipo(datos):
+    """
+    Devuelve el código de tipo del array ("q" o "d"), o None si los datos son una lista.
+    """
+    return getattr(datos, "typecode", None)
+
+
+class Matriz:
+    """
+    Matriz de enteros o reales almacenada en un buffer plano.
+
+    Atributos:
+    - datos: array('q') o array('d') con los valores (una lista si hay enteros de más de 64 bits)
+    - filas, columnas: dimensiones de la matriz
+    - paso_fila, paso_columna: saltos en 'datos' para avanzar una fila o una columna
+    """
+
+    __slots__ = ("datos", "filas", "columnas", "paso_fila", "paso_columna")
+
+    def __init__(self, filas, columnas, datos=None, paso_fila=None, paso_columna=1):
+        """
+        Crea una matriz de filas x columnas.
+
+        Args:
+            filas, columnas : Dimensiones de la matriz.
+            datos : array con los valores; si es None se crea una matriz de ceros enteros.
+            paso_fila, paso_columna : Pasos del buffer (por defecto, almacenamiento por filas).
+        """
+        if datos is None:
+            datos = array("q", bytes(8 * filas * columnas))
+        self.datos = datos
+        self.filas = filas
+        self.columnas = columnas
+        self.paso_fila = columnas if paso_fila is None else paso_fila
+        self.paso_columna = paso_columna
+
+    @classmethod
+    def desde_lista(cls, matriz):
+        """
+        Crea una Matriz a partir de una lista de listas.
+
+        Usa array('q') si todos los valores son enteros y array('d') en otro caso
+        (las fracciones se convierten a float). Si algún entero no cabe en 64 bits,
+        los valores se guardan en una lista.
+        """
+        filas = len(matriz)
+        columnas = len(matriz[0]) if filas else 0
+        if any(len(fila) != columnas for fila in matriz):
+            raise ValueError("Todas las filas de la matriz deben tener la misma longitud.")
+        valores = [valor for fila in matriz for valor in fila]
+        if all(isinstance(valor, int) for valor in valores):
+            datos = _crear_datos("q", valores)
+        else:
+            datos = array("d", map(float, valores))
+        return cls(filas, columnas, datos)
+
+    @classmethod
+    def como_matriz(cls, matriz):
+        """
+        Devuelve 'matriz' como Matriz, convirtiéndola solo si es una lista de listas.
+        """
+        return matriz if isinstance(matriz, cls) else cls.desde_lista(matriz)
+
+    def tolist(self):
+        """
+        Devuelve la matriz como lista de listas.
+        """
+        datos, paso_fila, paso_columna = self.datos, self.paso_fila, self.paso_columna
+        ancho = (self.columnas - 1) * paso_columna + 1  # Tramo del buffer que ocupa una fila
+        filas = [datos[i * paso_fila:i * paso_fila + ancho:paso_columna] for i in range(self.filas)]
+        return filas if isinstance(datos, list) else [fila.tolist() for fila in filas]
+
+    def __getitem__(self, posicion):
+        i, j = posicion
+        return self.datos[i * self.paso_fila + j * self.paso_columna]
+
+    def __setitem__(self, posicion, valor):
+        i, j = posicion
+        self.datos[i * self.paso_fila + j * self.paso_columna] = valor
+
+    def __eq__(self, otra):
+        if not isinstance(otra, Matriz):
+            return NotImplemented
+        return (self.filas, self.columnas) == (otra.filas, otra.columnas) and self.tolist() == otra.tolist()
+
+    def __repr__(self):
+        return f"Matriz({self.tolist()})"
+
+    def traspuesta(self):
+        """
+        Devuelve la traspuesta sin copiar datos: comparte el buffer e intercambia los pasos.
+        """
+        return Matriz(self.columnas, self.filas, self.datos, self.paso_columna, self.paso_fila)
+
+    def _operar(self, otra, operador):
+        """
+        Aplica 'operador' celda a celda entre esta matriz y 'otra' (mismo tamaño).
+        """
+        otra = Matriz.como_matriz(otra)
+        if (self.filas, self.columnas) != (otra.filas, otra.columnas):
+            raise ValueError("Las matrices deben tener el mismo tamaño.")
+
+        # Enteros ('q' o lista) con enteros dan enteros; si el resultado no cabe en 'q', lista
+        tipo = "d" if "d" in (_codigo_tipo(self.datos), _codigo_tipo(otra.datos)) else "q"
+        mismos_pasos = (self.paso_fila, self.paso_columna) == (otra.paso_fila, otra.paso_columna)
+        if mismos_pasos and len(self.datos) == len(otra.datos) == self.filas * self.columnas:
+            # Misma disposición en memoria: basta un único recorrido sobre los buffers planos
+            datos = _crear_datos(tipo, list(map(operador, self.datos, otra.datos)))
+            return Matriz(self.filas, self.columnas, datos, self.paso_fila, self.paso_columna)
+
+        # Disposiciones distintas (por ejemplo, una traspuesta): recorremos por posiciones
+        datos = _crear_datos(tipo, [operador(self[i, j], otra[i, j])
+                                    for i in range(self.filas) for j in range(self.columnas)])
+        return Matriz(self.filas, self.columnas, datos)
+
+    def sumar(self, otra):
+        return self._operar(otra, add)
+
+    def restar(self, otra):
+        return self._operar(otra, sub)
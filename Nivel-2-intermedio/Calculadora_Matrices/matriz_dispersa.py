@@ -0,0 +1,140 @@
+# Representación dispersa de una matriz: solo se guardan los valores distintos de cero.
+#
+# Los valores se organizan por filas como diccionarios {columna: valor}
+# (un "diccionario de claves" agrupado por filas). Así la suma solo recorre
+# las celdas no nulas y la multiplicación se salta todos los productos por cero.
+
+
+class MatrizDispersa:
+    """
+    Matriz en la que solo se almacenan los valores no nulos.
+
+    Atributos:
+    - filas, columnas: dimensiones de la matriz
+    - datos: diccionario {fila: {columna: valor}} sin filas vacías ni ceros
+    """
+
+    __slots__ = ("filas", "columnas", "datos")
+
+    def __init__(self, filas, columnas, datos=None):
+        self.filas = filas
+        self.columnas = columnas
+        self.datos = {} if datos is None else datos
+
+    @classmethod
+    def desde_lista(cls, matriz):
+        """
+        Crea una MatrizDispersa a partir de una lista de listas (u otra Matriz con tolist()).
+        """
+        if hasattr(matriz, "tolist"):
+            matriz = matriz.tolist()
+        filas = len(matriz)
+        columnas = len(matriz[0]) if filas else 0
+        datos = {}
+        for i, fila in enumerate(matriz):
+            no_nulos = {j: valor for j, valor in enumerate(fila) if valor}
+            if no_nulos:
+                datos[i] = no_nulos
+        return cls(filas, columnas, datos)
+
+    @classmethod
+    def como_dispersa(cls, matriz):
+        """
+        Devuelve 'matriz' como MatrizDispersa, convirtiéndola solo si hace falta.
+        """
+        return matriz if isinstance(matriz, cls) else cls.desde_lista(matriz)
+
+    def tolist(self):
+        """
+        Devuelve la matriz como lista de listas (densa).
+        """
+        resultado = [[0] * self.columnas for _ in range(self.filas)]
+        for i, fila in self.datos.items():
+            destino = resultado[i]
+            for j, valor in fila.items():
+                destino[j] = valor
+        return resultado
+
+    def no_nulos(self):
+        """
+        Devuelve el número de valores distintos de cero.
+        """
+        return sum(len(fila) for fila in self.datos.values())
+
+    def densidad(self):
+        """
+        Devuelve la proporción de celdas no nulas (0 a 1).
+        """
+        total = self.filas * self.columnas
+        return self.no_nulos() / total if total else 0.0
+
+    def __getitem__(self, posicion):
+        i, j = posicion
+        return self.datos.get(i, {}).get(j, 0)
+
+    def __eq__(self, otra):
+        if not isinstance(otra, MatrizDispersa):
+            return NotImplemented
+        return (self.filas, self.columnas, self.datos) == (otra.filas, otra.columnas, otra.datos)
+
+    def __repr__(self):
+        return f"MatrizDispersa({self.filas}x{self.columnas}, no nulos={self.no_nulos()})"
+
+    def _combinar(self, otra, signo):
+        """
+        Suma (signo=1) o resta (signo=-1) otra matriz del mismo tamaño recorriendo solo los no nulos.
+        """
+        otra = MatrizDispersa.como_dispersa(otra)
+        if (self.filas, self.columnas) != (otra.filas, otra.columnas):
+            raise ValueError("Las matrices deben tener el mismo tamaño.")
+
+        datos = {i: dict(fila) for i, fila in self.datos.items()}
+        for i, fila in otra.datos.items():
+            destino = datos.setdefault(i, {})
+            for j, valor in fila.items():
+                nuevo = destino.get(j, 0) + signo * valor
+                if nuevo:
+                    destino[j] = nuevo
+                else:
+                    destino.pop(j, None)  # Los valores que se anulan dejan de guardarse
+            if not destino:
+                del datos[i]
+        return MatrizDispersa(self.filas, self.columnas, datos)
+
+    def sumar(self, otra):
+        return self._combinar(otra, 1)
+
+    def restar(self, otra):
+        return self._combinar(otra, -1)
+
+    def multiplicar(self, otra):
+        """
+        Multiplica por otra matriz fila a fila: cada valor no nulo a[i][k]
+        se combina solo con los no nulos de la fila k de la otra matriz.
+        """
+        otra = MatrizDispersa.como_dispersa(otra)
+        if self.columnas != otra.filas:
+            raise ValueError("Las matrices no se pueden multiplicar: columnas de matriz1 ≠ filas de matriz2")
+
+        datos = {}
+        for i, fila in self.datos.items():
+            acumulado = {}
+            for k, valor in fila.items():
+                fila_otra = otra.datos.get(k)
+                if fila_otra:
+                    for j, valor_otra in fila_otra.items():
+                        acumulado[j] = acumulado.get(j, 0) + valor * valor_otra
+            acumulado = {j: valor for j, valor in acumulado.items() if valor}
+            if acumulado:
+                datos[i] = acumulado
+        return MatrizDispersa(self.filas, otra.columnas, datos)
+
+    def traspuesta(self):
+        """
+        Devuelve la matriz traspuesta.
+        """
+        datos = {}
+        for i, fila in self.datos.items():
+            for j, valor in fila.items():
+                datos.setdefault(j, {})[i] = valor
+        return MatrizDispersa(self.columnas, self.filas, datos)
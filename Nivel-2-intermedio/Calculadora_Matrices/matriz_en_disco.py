@@ -0,0 +1,274 @@
+# Matrices guardadas en disco y accedidas con mmap, para trabajar con matrices
+# que no caben en memoria.
+#
+# Formato del archivo: una cabecera de 24 bytes (marca "MATZ", código de tipo
+# 'q' o 'd', filas y columnas) seguida de los valores por filas, 8 bytes cada uno.
+#
+# Las operaciones (traspuesta, suma, resta y multiplicación) recorren los
+# operandos por bloques de tamano_bloque x tamano_bloque y escriben el resultado
+# en otro archivo, de modo que en memoria solo hay unos pocos bloques a la vez.
+#
+# Uso de la demostración:
+#   python matriz_en_disco.py [n] [tamaño_bloque]
+
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from itertools import chain
+from operator import add, mul, sub
+
+
+CABECERA = struct.Struct("<4sc3xQQ")  # Marca, tipo, relleno, filas, columnas
+MARCA = b"MATZ"
+TAMANO_BLOQUE_DISCO = 256  # Tamaño de bloque por defecto (filas x columnas)
+
+
+class MatrizEnDisco:
+    """
+    Matriz de enteros ('q') o reales ('d') guardada en un archivo y proyectada en memoria con mmap.
+
+    Atributos:
+    - ruta: archivo donde está la matriz
+    - filas, columnas: dimensiones
+    - tipo: código de tipo de los valores ('q' o 'd')
+    - datos: memoryview sobre los valores (por filas)
+    """
+
+    __slots__ = ("ruta", "filas", "columnas", "tipo", "datos", "_archivo", "_mapa")
+
+    def __init__(self, ruta, escritura=False):
+        """
+        Abre una matriz existente.
+
+        Args:
+            ruta : Archivo de la matriz.
+            escritura : True para poder modificar sus valores.
+
+        Raises:
+            ValueError: Si el archivo no tiene el formato esperado.
+        """
+        self.ruta = ruta
+        self._archivo = open(ruta, "r+b" if escritura else "rb")
+        acceso = mmap.ACCESS_WRITE if escritura else mmap.ACCESS_READ
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=acceso)
+        marca, tipo, self.filas, self.columnas = CABECERA.unpack_from(self._mapa)
+        if marca != MARCA or tipo not in (b"q", b"d"):
+            self.cerrar()
+            raise ValueError(f"{ruta} no es un archivo de matriz válido.")
+        self.tipo = tipo.decode()
+        self.datos = memoryview(self._mapa)[CABECERA.size:].cast(self.tipo)
+
+    @classmethod
+    def crear(cls, ruta, filas, columnas, tipo="d"):
+        """
+        Crea en disco una matriz de ceros y la abre en modo escritura.
+        """
+        with open(ruta, "wb") as archivo:
+            archivo.write(CABECERA.pack(MARCA, tipo.encode(), filas, columnas))
+            archivo.truncate(CABECERA.size + 8 * filas * columnas)  # El sistema rellena con ceros
+        return cls(ruta, escritura=True)
+
+    @classmethod
+    def desde_filas(cls, ruta, filas, columnas, tipo="d"):
+        """
+        Crea una matriz en disco a partir de un iterable de filas, sin cargarlas todas a la vez.
+
+        Args:
+            ruta : Archivo de destino.
+            filas : Iterable de filas (listas de números).
+            columnas : Número de columnas.
+            tipo : 'q' para enteros o 'd' para reales.
+        """
+        numero_filas = 0
+        with open(ruta, "wb") as archivo:
+            archivo.write(CABECERA.pack(MARCA, tipo.encode(), 0, columnas))
+            for fila in filas:
+                if len(fila) != columnas:
+                    raise ValueError("Todas las filas de la matriz deben tener la misma longitud.")
+                archivo.write(array(tipo, fila).tobytes())
+                numero_filas += 1
+            archivo.seek(0)
+            archivo.write(CABECERA.pack(MARCA, tipo.encode(), numero_filas, columnas))
+        return cls(ruta, escritura=True)
+
+    @classmethod
+    def desde_lista(cls, ruta, matriz):
+        """
+        Guarda una lista de listas en disco ('q' si todos los valores son enteros, 'd' si no).
+        """
+        tipo = "q" if all(isinstance(valor, int) for valor in chain.from_iterable(matriz)) else "d"
+        return cls.desde_filas(ruta, matriz, len(matriz[0]), tipo)
+
+    def cerrar(self):
+        """
+        Libera la proyección en memoria y cierra el archivo.
+        """
+        if getattr(self, "datos", None) is not None:
+            self.datos.release()
+            self.datos = None
+        self._mapa.close()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def __repr__(self):
+        return f"MatrizEnDisco({self.ruta!r}, {self.filas}x{self.columnas}, tipo={self.tipo!r})"
+
+    # ---------------------- LECTURA Y ESCRITURA POR PARTES ----------------------
+    def fila(self, i):
+        """
+        Devuelve la fila i como lista.
+        """
+        return self.datos[i * self.columnas:(i + 1) * self.columnas].tolist()
+
+    def leer_bloque(self, inicio_i, fin_i, inicio_j, fin_j):
+        """
+        Devuelve el bloque de filas [inicio_i, fin_i) y columnas [inicio_j, fin_j) como lista de listas.
+        """
+        c = self.columnas
+        return [self.datos[i * c + inicio_j:i * c + fin_j].tolist() for i in range(inicio_i, fin_i)]
+
+    def escribir_bloque(self, inicio_i, inicio_j, bloque):
+        """
+        Escribe un bloque (lista de listas) empezando en la posición [inicio_i][inicio_j].
+        """
+        c = self.columnas
+        for desplazamiento, fila in enumerate(bloque):
+            posicion = (inicio_i + desplazamiento) * c + inicio_j
+            self.datos[posicion:posicion + len(fila)] = array(self.tipo, fila)
+
+    def tolist(self):
+        """
+        Devuelve la matriz completa como lista de listas (solo para matrices que caben en memoria).
+        """
+        return [self.fila(i) for i in range(self.filas)]
+
+    # ---------------------- OPERACIONES POR BLOQUES ----------------------
+    def traspuesta(self, ruta_destino, tamano_bloque=TAMANO_BLOQUE_DISCO):
+        """
+        Escribe la traspuesta en 'ruta_destino' bloque a bloque y la devuelve abierta.
+        """
+        destino = MatrizEnDisco.crear(ruta_destino, self.columnas, self.filas, self.tipo)
+        for inicio_i in range(0, self.filas, tamano_bloque):
+            fin_i = min(inicio_i + tamano_bloque, self.filas)
+            for inicio_j in range(0, self.columnas, tamano_bloque):
+                fin_j = min(inicio_j + tamano_bloque, self.columnas)
+                bloque = self.leer_bloque(inicio_i, fin_i, inicio_j, fin_j)
+                destino.escribir_bloque(inicio_j, inicio_i, zip(*bloque))
+        destino._mapa.flush()
+        return destino
+
+    def _combinar(self, otra, ruta_destino, operador, tamano_bloque):
+        if (self.filas, self.columnas) != (otra.filas, otra.columnas):
+            raise ValueError("Las matrices deben tener el mismo tamaño.")
+        tipo = "q" if self.tipo == otra.tipo == "q" else "d"
+        destino = MatrizEnDisco.crear(ruta_destino, self.filas, self.columnas, tipo)
+        # Como las dos matrices se guardan por filas, basta recorrer bandas contiguas de filas
+        paso = tamano_bloque * self.columnas
+        for inicio in range(0, self.filas * self.columnas, paso):
+            fin = min(inicio + paso, self.filas * self.columnas)
+            destino.datos[inicio:fin] = array(tipo, map(operador, self.datos[inicio:fin], otra.datos[inicio:fin]))
+        destino._mapa.flush()
+        return destino
+
+    def sumar(self, otra, ruta_destino, tamano_bloque=TAMANO_BLOQUE_DISCO):
+        """
+        Escribe self + otra en 'ruta_destino' y la devuelve abierta.
+        """
+        return self._combinar(otra, ruta_destino, add, tamano_bloque)
+
+    def restar(self, otra, ruta_destino, tamano_bloque=TAMANO_BLOQUE_DISCO):
+        """
+        Escribe self - otra en 'ruta_destino' y la devuelve abierta.
+        """
+        return self._combinar(otra, ruta_destino, sub, tamano_bloque)
+
+    def multiplicar(self, otra, ruta_destino, tamano_bloque=TAMANO_BLOQUE_DISCO):
+        """
+        Escribe self · otra en 'ruta_destino' multiplicando por bloques y la devuelve abierta.
+
+        En memoria solo hay un bloque de cada operando y el bloque del resultado.
+        """
+        if self.columnas != otra.filas:
+            raise ValueError("Las matrices no se pueden multiplicar: columnas de matriz1 ≠ filas de matriz2")
+        m, n, p = self.filas, self.columnas, otra.columnas
+        tipo = "q" if self.tipo == otra.tipo == "q" else "d"
+        destino = MatrizEnDisco.crear(ruta_destino, m, p, tipo)
+
+        for inicio_i in range(0, m, tamano_bloque):
+            fin_i = min(inicio_i + tamano_bloque, m)
+            for inicio_j in range(0, p, tamano_bloque):
+                fin_j = min(inicio_j + tamano_bloque, p)
+                acumulado = [[0] * (fin_j - inicio_j) for _ in range(fin_i - inicio_i)]
+                for inicio_k in range(0, n, tamano_bloque):
+                    fin_k = min(inicio_k + tamano_bloque, n)
+                    filas_a = self.leer_bloque(inicio_i, fin_i, inicio_k, fin_k)
+                    columnas_b = list(zip(*otra.leer_bloque(inicio_k, fin_k, inicio_j, fin_j)))
+                    for fila_acumulada, fila_a in zip(acumulado, filas_a):
+                        fila_acumulada[:] = [valor + sum(map(mul, fila_a, columna))
+                                             for valor, columna in zip(fila_acumulada, columnas_b)]
+                destino.escribir_bloque(inicio_i, inicio_j, acumulado)
+        destino._mapa.flush()
+        return destino
+
+
+def pico_memoria(funcion, *args, **kwargs):
+    """
+    Ejecuta funcion(*args, **kwargs) y mide el pico de memoria reservada por Python.
+
+    Las páginas del archivo proyectadas con mmap no cuentan: el pico refleja los
+    bloques que la operación tiene a la vez en memoria.
+
+    Returns:
+        Tupla (resultado, pico en bytes).
+    """
+    tracemalloc.start()
+    try:
+        resultado = funcion(*args, **kwargs)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, pico
+
+
+def demostracion(n, tamano_bloque):
+    """
+    Crea dos matrices aleatorias n x n en disco y muestra el tiempo y el pico
+    de memoria de la traspuesta, la suma y la multiplicación por bloques.
+    """
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = lambda nombre: os.path.join(carpeta, nombre)
+        filas_aleatorias = lambda: ([random.random() for _ in range(n)] for _ in range(n))
+        with MatrizEnDisco.desde_filas(ruta("a.mat"), filas_aleatorias(), n) as a, \
+                MatrizEnDisco.desde_filas(ruta("b.mat"), filas_aleatorias(), n) as b:
+            print(f"n = {n}, bloque = {tamano_bloque}, tamaño de cada operando: {8 * n * n / 2**20:.1f} MiB")
+            print(f"{'operación':<14} {'tiempo (s)':>12} {'pico (KiB)':>12}")
+            operaciones = [
+                ("traspuesta", lambda: a.traspuesta(ruta("t.mat"), tamano_bloque)),
+                ("suma", lambda: a.sumar(b, ruta("s.mat"), tamano_bloque)),
+                ("multiplicar", lambda: a.multiplicar(b, ruta("p.mat"), tamano_bloque)),
+            ]
+            for nombre, operacion in operaciones:
+                # tracemalloc ralentiza mucho la ejecución: el tiempo se mide en una pasada aparte
+                inicio = time.perf_counter()
+                operacion().cerrar()
+                tiempo = time.perf_counter() - inicio
+                resultado, pico = pico_memoria(operacion)
+                resultado.cerrar()
+                print(f"{nombre:<14} {tiempo:>12.3f} {pico / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    tamano_bloque = int(sys.argv[2]) if len(sys.argv) > 2 else TAMANO_BLOQUE_DISCO
+    demostracion(n, tamano_bloque)
@@ -0,0 +1,125 @@
+# Multiplicación de matrices en paralelo con varios procesos.
+#
+# El resultado se divide en bandas de filas y cada banda la calcula un proceso
+# de un ProcessPoolExecutor. Las dos matrices y el resultado viven en memoria
+# compartida (multiprocessing.shared_memory), así que a cada tarea solo se le
+# envían los nombres de los bloques y el rango de filas, no las matrices.
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from multiprocessing import shared_memory
+from operator import mul
+
+from Calculadora_de_matrices import multiplicar_matrices
+
+
+UMBRAL_PARALELO = 128 ** 3  # Por debajo de m·n·p productos se multiplica en serie
+BANDAS_POR_PROCESO = 4  # Varias bandas por proceso para repartir mejor la carga
+MAXIMO_INT64 = 2 ** 63 - 1  # Mayor valor de un array('q')
+
+
+def _tipo_array(matriz1, matriz2):
+    """
+    Devuelve 'q' si todos los valores son enteros, 'd' si hay reales, o None si
+    hay otros tipos (Fraction...) que no caben en memoria compartida o enteros
+    con los que algún valor del resultado podría no caber en 64 bits.
+    """
+    tipos = {type(valor) for valor in chain(chain.from_iterable(matriz1), chain.from_iterable(matriz2))}
+    if tipos <= {int}:
+        # Cada valor del resultado es una suma de n productos: la acotamos con los mayores valores absolutos
+        maximo1 = max((abs(valor) for valor in chain.from_iterable(matriz1)), default=0)
+        maximo2 = max((abs(valor) for valor in chain.from_iterable(matriz2)), default=0)
+        return "q" if len(matriz2) * maximo1 * maximo2 <= MAXIMO_INT64 else None
+    if tipos <= {int, float}:
+        return "d"
+    return None
+
+
+def _crear_compartida(valores, tipo):
+    """
+    Copia 'valores' en un bloque nuevo de memoria compartida.
+    """
+    datos = array(tipo, valores)
+    bloque = shared_memory.SharedMemory(create=True, size=datos.itemsize * len(datos))
+    bloque.buf[:len(datos) * datos.itemsize] = datos.tobytes()
+    return bloque
+
+
+def _calcular_banda(nombres, tipo, n, p, inicio, fin):
+    """
+    Calcula las filas [inicio, fin) del resultado y las escribe en memoria compartida.
+
+    Args:
+        nombres : Nombres de los bloques (matriz1, matriz2 traspuesta, resultado).
+        tipo : Código de tipo del array ('q' o 'd').
+        n : Columnas de matriz1 (= filas de matriz2).
+        p : Columnas de matriz2.
+        inicio, fin : Rango de filas de esta banda.
+    """
+    bloques = [shared_memory.SharedMemory(name=nombre) for nombre in nombres]
+    vistas = []
+    try:
+        vistas = [bloque.buf.cast(tipo) for bloque in bloques]
+        a, bt, c = vistas
+        columnas = [bt[j * n:(j + 1) * n].tolist() for j in range(p)]
+        for i in range(inicio, fin):
+            fila = a[i * n:(i + 1) * n].tolist()
+            c[i * p:(i + 1) * p] = array(tipo, [sum(map(mul, fila, columna)) for columna in columnas])
+    finally:
+        # Hay que soltar las vistas antes de cerrar los bloques, también si ha habido un error
+        for vista in vistas:
+            vista.release()
+        for bloque in bloques:
+            bloque.close()
+
+
+def multiplicar_matrices_paralelo(matriz1, matriz2, procesos=None):
+    """
+    Multiplica dos matrices repartiendo bandas de filas entre varios procesos.
+
+    Args:
+        matriz1 : Primera matriz (m x n).
+        matriz2 : Segunda matriz (n x p).
+        procesos : Número de procesos (por defecto, os.cpu_count()).
+
+    Returns:
+        Matriz resultante de tamaño (m x p). Si el problema es pequeño, hay un
+        solo proceso o los valores no son int/float, se usa multiplicar_matrices.
+
+    Raises:
+        ValueError: Si las dimensiones no permiten la multiplicación.
+    """
+    if len(matriz1[0]) != len(matriz2):
+        raise ValueError("Las matrices no se pueden multiplicar: columnas de matriz1 ≠ filas de matriz2")
+
+    procesos = procesos or os.cpu_count() or 1
+    m, n, p = len(matriz1), len(matriz2), len(matriz2[0])
+    tipo = _tipo_array(matriz1, matriz2)
+    if procesos == 1 or m * n * p < UMBRAL_PARALELO or tipo is None:
+        return multiplicar_matrices(matriz1, matriz2)
+
+    bloques = []
+    try:
+        bloques.append(_crear_compartida(chain.from_iterable(matriz1), tipo))
+        bloques.append(_crear_compartida(chain.from_iterable(zip(*matriz2)), tipo))  # matriz2 traspuesta
+        bloques.append(shared_memory.SharedMemory(create=True, size=8 * m * p))  # Resultado ('q' y 'd' ocupan 8 bytes)
+        nombres = [bloque.name for bloque in bloques]
+
+        tamano_banda = max(1, -(-m // (procesos * BANDAS_POR_PROCESO)))  # División redondeando hacia arriba
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            tareas = [ejecutor.submit(_calcular_banda, nombres, tipo, n, p, inicio, min(inicio + tamano_banda, m))
+                      for inicio in range(0, m, tamano_banda)]
+            for tarea in tareas:
+                tarea.result()  # Propaga cualquier error de los procesos
+
+        resultado = bloques[2].buf.cast(tipo)
+        try:
+            return [resultado[i * p:(i + 1) * p].tolist() for i in range(m)]
+        finally:
+            resultado.release()
+    finally:
+        for bloque in bloques:
+            bloque.close()
+            bloque.unlink()
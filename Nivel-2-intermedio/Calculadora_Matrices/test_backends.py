@@ -0,0 +1,153 @@
+# Pruebas diferenciales: cada operación pública se ejecuta con el backend de
+# Python puro y con el de NumPy sobre las mismas matrices aleatorias, y los
+# resultados (o los errores) tienen que coincidir.
+#
+# Uso:
+#   python -m unittest test_backends
+#   python -m pytest test_backends.py
+
+import math
+import random
+import unittest
+from fractions import Fraction
+
+import Calculadora_de_matrices as calc
+
+
+SEMILLA = 2024
+REPETICIONES = 20  # Matrices aleatorias por operación y tipo de valor
+TAMANO_MAXIMO = 6
+
+
+def generar_valor(azar, tipo):
+    """
+    Devuelve un valor aleatorio del tipo indicado: "int", "grande", "float" o "fraction".
+    """
+    if tipo == "int":
+        return azar.randint(-50, 50)
+    if tipo == "grande":  # Enteros cuyas sumas y productos no caben en int64
+        return azar.choice((-1, 1)) * azar.randint(2 ** 40, 2 ** 70)
+    if tipo == "float":
+        return azar.uniform(-100, 100)
+    return Fraction(azar.randint(-50, 50), azar.randint(1, 20))
+
+
+def generar_matriz(azar, filas, columnas, tipo):
+    return [[generar_valor(azar, tipo) for _ in range(columnas)] for _ in range(filas)]
+
+
+def ejecutar(backend, funcion, *args, **kwargs):
+    """
+    Ejecuta funcion(*args) con el backend indicado.
+
+    Returns:
+        ("ok", resultado) o ("error", tipo de la excepción).
+    """
+    calc.usar_backend(backend)
+    try:
+        return "ok", funcion(*args, **kwargs)
+    except (ValueError, ZeroDivisionError) as e:
+        return "error", type(e)
+    finally:
+        calc.usar_backend("python")
+
+
+def iguales(a, b):
+    """
+    Compara dos resultados: exactos si ninguno es float, con tolerancia relativa si alguno lo es.
+    """
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(iguales(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-7, abs_tol=1e-7)
+    return a == b
+
+
+@unittest.skipIf(calc.backend_numpy is None, "NumPy no está instalado")
+class PruebasBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.azar = random.Random(SEMILLA)
+
+    def tearDown(self):
+        calc.usar_backend("python")
+
+    def comparar(self, funcion, *args, **kwargs):
+        """
+        Comprueba que los dos backends dan el mismo resultado o el mismo error.
+        """
+        esperado = ejecutar("python", funcion, *args, **kwargs)
+        obtenido = ejecutar("numpy", funcion, *args, **kwargs)
+        self.assertEqual(esperado[0], obtenido[0], f"{funcion.__name__}{args}: {esperado} != {obtenido}")
+        if esperado[0] == "error":
+            self.assertEqual(esperado[1], obtenido[1])
+        else:
+            self.assertTrue(iguales(esperado[1], obtenido[1]),
+                            f"{funcion.__name__}{args}: {esperado[1]} != {obtenido[1]}")
+        return esperado
+
+    def casos(self, tipos=("int", "grande", "float", "fraction")):
+        for tipo in tipos:
+            for _ in range(REPETICIONES):
+                yield tipo, self.azar.randint(1, TAMANO_MAXIMO), self.azar.randint(1, TAMANO_MAXIMO)
+
+    def test_sumar_y_restar(self):
+        for tipo, filas, columnas in self.casos():
+            a = generar_matriz(self.azar, filas, columnas, tipo)
+            b = generar_matriz(self.azar, filas, columnas, tipo)
+            self.comparar(calc.sumar_matrices, a, b)
+            self.comparar(calc.restar_matrices, a, b)
+
+    def test_multiplicar(self):
+        for tipo, filas, columnas in self.casos():
+            a = generar_matriz(self.azar, filas, columnas, tipo)
+            b = generar_matriz(self.azar, columnas, self.azar.randint(1, TAMANO_MAXIMO), tipo)
+            self.comparar(calc.multiplicar_matrices, a, b)
+
+    def test_traspuesta(self):
+        for tipo, filas, columnas in self.casos():
+            self.comparar(calc.matriz_traspuesta, generar_matriz(self.azar, filas, columnas, tipo))
+
+    def test_determinante(self):
+        for tipo, n, _ in self.casos():
+            self.comparar(calc.determinante, generar_matriz(self.azar, n, n, tipo))
+
+    def test_inversa(self):
+        for tipo, n, _ in self.casos(("int", "float", "fraction")):
+            matriz = generar_matriz(self.azar, n, n, tipo)
+            singular = calc.determinante(matriz, exacto=True) == 0
+            esperado = self.comparar(calc.matriz_inversa, matriz)
+            if singular:
+                self.assertEqual(esperado, ("error", ValueError))
+            if tipo != "float":
+                self.comparar(calc.matriz_inversa, matriz, exacto=True)
+
+    def test_inversa_singular(self):
+        singular = [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+        for matriz in (singular, [[float(valor) for valor in fila] for fila in singular]):
+            for exacto in (None, False, True):
+                self.assertEqual(self.comparar(calc.matriz_inversa, matriz, exacto=exacto), ("error", ValueError))
+
+    def test_enteros_que_desbordan_int64(self):
+        potencia = [[2 ** 40, 0], [0, 2 ** 40]]
+        _, resultado = self.comparar(calc.multiplicar_matrices, potencia, potencia)
+        self.assertEqual(resultado, [[2 ** 80, 0], [0, 2 ** 80]])
+        _, resultado = self.comparar(calc.sumar_matrices, [[2 ** 62]], [[2 ** 62]])
+        self.assertEqual(resultado, [[2 ** 63]])
+        self.comparar(calc.restar_matrices, [[-(2 ** 62)]], [[2 ** 62]])
+
+    def test_tamanos_distintos(self):
+        for tipo in ("int", "float", "fraction"):
+            a = generar_matriz(self.azar, 1, 1, tipo)
+            b = generar_matriz(self.azar, 2, 2, tipo)
+            c = generar_matriz(self.azar, 2, 3, tipo)
+            for funcion in (calc.sumar_matrices, calc.restar_matrices):
+                self.assertEqual(self.comparar(funcion, a, b), ("error", ValueError))
+                self.assertEqual(self.comparar(funcion, c, b), ("error", ValueError))
+            self.assertEqual(self.comparar(calc.multiplicar_matrices, c, c), ("error", ValueError))
+            self.assertEqual(self.comparar(calc.determinante, c), ("error", ValueError))
+            self.assertEqual(self.comparar(calc.matriz_inversa, c), ("error", ValueError))
+
+
+if __name__ == "__main__":
+    unittest.main()
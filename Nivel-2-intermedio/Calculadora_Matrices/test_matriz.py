@@ -0,0 +1,50 @@
+# Pruebas del tipo Matriz (matriz.py): sus resultados tienen que coincidir con
+# los de las mismas operaciones sobre listas de listas, también cuando los
+# enteros no caben en el array('q') de 64 bits.
+#
+# Uso:
+#   python -m unittest test_matriz
+#   python -m pytest test_matriz.py
+
+import unittest
+
+import Calculadora_de_matrices as calc
+from matriz import Matriz
+
+
+class PruebasMatriz(unittest.TestCase):
+
+    def setUp(self):
+        calc.usar_backend("python")
+
+    def comparar(self, funcion, *matrices):
+        """
+        Comprueba que funcion da lo mismo con listas de listas que con objetos Matriz.
+        """
+        esperado = funcion(*matrices)
+        obtenido = funcion(*(Matriz.desde_lista(m) for m in matrices))
+        self.assertIsInstance(obtenido, Matriz)
+        self.assertEqual(obtenido.tolist(), esperado)
+        return obtenido
+
+    def test_enteros_que_desbordan_int64(self):
+        self.assertEqual(self.comparar(calc.sumar_matrices, [[2 ** 62]], [[2 ** 62]]).tolist(), [[2 ** 63]])
+        self.comparar(calc.restar_matrices, [[-(2 ** 62)]], [[2 ** 62]])
+        self.assertEqual(self.comparar(calc.multiplicar_matrices, [[2 ** 40]], [[2 ** 40]]).tolist(), [[2 ** 80]])
+
+    def test_enteros_grandes_en_la_entrada(self):
+        grande = [[2 ** 70, 1], [2, -(2 ** 65)]]
+        pequena = [[1, 2], [3, 4]]
+        self.comparar(calc.sumar_matrices, grande, pequena)
+        self.comparar(calc.restar_matrices, grande, pequena)
+        self.comparar(calc.matriz_traspuesta, grande)
+        self.assertEqual(calc.restar_matrices(Matriz.desde_lista(grande), grande).datos.typecode, "q")
+
+    def test_reales_con_enteros_grandes(self):
+        resultado = calc.sumar_matrices(Matriz.desde_lista([[2 ** 70]]), Matriz.desde_lista([[0.5]]))
+        self.assertEqual(resultado.datos.typecode, "d")
+        self.assertEqual(resultado.tolist(), [[2 ** 70 + 0.5]])
+
+
+if __name__ == "__main__":
+    unittest.main()
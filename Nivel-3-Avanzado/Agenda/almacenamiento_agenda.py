@@ -0,0 +1,691 @@
+import io
+import json
+import os
+import re
+import sqlite3
+from urllib.parse import quote
+
+from indice_texto import normalizar
+from instantanea_agenda import InstantaneaBinaria, escribir_instantanea
+
+
+TAMANO_LECTURA = 1 << 20  # Caracteres que se leen de cada vez al cargar un archivo JSON
+ESPACIOS_JSON = re.compile(r"[ \t\n\r]*")  # Espacios que JSON permite entre elementos
+CONTINUACION_NUMERO = frozenset("0123456789.eE+-")  # Caracteres con los que puede seguir un número
+
+
+def leer_lista_json(f, tamano_lectura=TAMANO_LECTURA):
+    """
+    Recorre uno a uno los elementos de una lista JSON leyendo el archivo por partes,
+    sin cargar todo el texto ni toda la lista en memoria.
+
+    Raises:
+        json.JSONDecodeError: Si el archivo no contiene una lista JSON válida.
+    """
+    decodificador = json.JSONDecoder()
+    texto = ""
+    posicion = 0
+
+    def rellenar():
+        """
+        Añade al texto pendiente (desde 'posicion') el siguiente bloque. Devuelve False al final del archivo.
+        """
+        nonlocal texto, posicion
+        mas = f.read(tamano_lectura)
+        if not mas:
+            return False
+        texto, posicion = texto[posicion:] + mas, 0
+        return True
+
+    def siguiente():
+        """
+        Salta los espacios y devuelve el siguiente carácter sin consumirlo ("" al final del archivo).
+        """
+        nonlocal posicion
+        while True:
+            posicion = ESPACIOS_JSON.match(texto, posicion).end()
+            if posicion < len(texto):
+                return texto[posicion]
+            if not rellenar():
+                return ""
+
+    def terminar():
+        """
+        Consume el ']' final y comprueba que después solo hay espacios, como json.load.
+        """
+        nonlocal posicion
+        posicion += 1
+        if siguiente() != "":
+            raise json.JSONDecodeError("Datos extra después de la lista", texto, posicion)
+
+    if siguiente() != "[":
+        raise json.JSONDecodeError("Se esperaba una lista", texto, posicion)
+    posicion += 1
+    if siguiente() == "]":
+        terminar()
+        return
+    while True:
+        # Caso habitual sin llamar a 'siguiente': el elemento empieza en el bloque actual
+        posicion = ESPACIOS_JSON.match(texto, posicion).end()
+        if posicion == len(texto) and not siguiente():
+            raise json.JSONDecodeError("Fin de archivo inesperado", texto, posicion)
+        while True:
+            try:
+                elemento, final = decodificador.raw_decode(texto, posicion)
+            except json.JSONDecodeError:
+                # El elemento puede estar cortado al final del bloque: leemos más y reintentamos
+                if not rellenar():
+                    raise
+                continue
+            # Un número cortado por el final del bloque se decodifica sin error pero incompleto
+            # ("-1.5e10" leído como "-1." da -1): si puede seguir, leemos más y reintentamos
+            cortado = final == len(texto) or (isinstance(elemento, (int, float))
+                                              and texto[final] in CONTINUACION_NUMERO)
+            if cortado and rellenar():
+                continue
+            break
+        posicion = ESPACIOS_JSON.match(texto, final).end()
+        yield elemento
+        caracter = texto[posicion] if posicion < len(texto) else siguiente()
+        if caracter == "]":
+            terminar()
+            return
+        if caracter != ",":
+            raise json.JSONDecodeError("Se esperaba ',' o ']'", texto, posicion)
+        posicion += 1
+
+
+class AlmacenamientoJSON:
+    """
+    Guarda la agenda en un archivo JSON (la "foto" completa) más un diario de cambios.
+
+    Cada cambio se añade como una línea JSON al diario (archivo_json + ".diario"),
+    sin reescribir la agenda. Al compactar ('guardar'), la agenda completa se escribe
+    de forma atómica en el archivo JSON y el diario se vacía.
+
+    Cada cambio lleva su número de secuencia ("seq"). Al compactar, el último número
+    se guarda en archivo_json + ".secuencia", así la numeración sigue tras reiniciar.
+    Después de 'cargar':
+    - secuencia: número del último cambio guardado.
+    - secuencia_base: número del último cambio incluido en el archivo JSON (los
+      anteriores ya no se pueden consultar uno a uno).
+    - historial: cambios del diario, tuplas (secuencia, operación, ID, diccionario o None).
+    """
+
+    def __init__(self, archivo_json="agenda.json"):
+        self.archivo_json = archivo_json
+        self.archivo_diario = archivo_json + ".diario"  # Cambios pendientes de compactar (JSON Lines)
+        self.archivo_secuencia = archivo_json + ".secuencia"  # Número del último cambio compactado
+        self.cambios_pendientes = 0  # Líneas del diario desde la última compactación
+        self.secuencia = 0
+        self.secuencia_base = 0
+        self.historial = []
+
+    def cargar(self):
+        """
+        Lee el archivo JSON por partes, le aplica los cambios del diario y devuelve la
+        lista de contactos como diccionarios. Si un ID aparece repetido, se conserva el primero.
+        
+        Maneja errores:
+        - Si el archivo no existe, se empieza con una agenda vacía.
+        - Si el archivo está corrupto, se avisa y se empieza con una agenda vacía.
+        """
+        datos = {}
+        try:
+            for c in self._leer_instantanea():
+                datos.setdefault(c["id_contacto"], c)
+        except FileNotFoundError:
+            pass  # Si el archivo no existe, empezamos con una agenda vacía
+        except ValueError:  # json.JSONDecodeError es un ValueError
+            print(f"Error: el archivo {self.archivo_json} está corrupto. Se cargará agenda vacía.")
+            datos = {}
+        self.secuencia = self.secuencia_base = self._leer_secuencia()
+        self._reproducir_diario(datos)
+        return list(datos.values())
+
+    def _leer_secuencia(self):
+        """
+        Devuelve el número de secuencia guardado en la última compactación (0 si no hay).
+        """
+        try:
+            with open(self.archivo_secuencia, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            print(f"Aviso: el archivo {self.archivo_secuencia} está dañado; la secuencia empieza en 0.")
+            return 0
+
+    def _leer_instantanea(self):
+        """
+        Recorre los contactos del archivo de la agenda completa (aquí, una lista JSON leída por partes).
+        """
+        with open(self.archivo_json, "r", encoding="utf-8") as f:
+            yield from leer_lista_json(f)
+
+    def _volcar_instantanea(self, f, datos):
+        """
+        Escribe la agenda completa en el archivo f, abierto en modo binario (aquí, como JSON).
+        """
+        texto = io.TextIOWrapper(f, encoding="utf-8")
+        json.dump(list(datos), texto, indent=4)
+        texto.flush()
+        texto.detach()  # Devuelve f sin cerrarlo
+
+    def _reproducir_diario(self, datos):
+        """
+        Aplica sobre 'datos' (ID -> diccionario) los cambios del diario.
+        
+        Si el programa se interrumpió mientras escribía, la última línea puede estar
+        incompleta: se ignora, igual que cualquier línea que no se pueda interpretar,
+        y se compacta la agenda para no seguir escribiendo detrás de ella.
+        """
+        self.cambios_pendientes = 0
+        self.historial = []
+        danado = False
+        try:
+            with open(self.archivo_diario, "r", encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                        self._aplicar(datos, registro)
+                        self.cambios_pendientes += 1
+                        if "seq" in registro:  # Los diarios antiguos no numeran los cambios
+                            self.secuencia = max(self.secuencia, registro["seq"])
+                            self.historial.append((registro["seq"], registro["op"], registro["id"],
+                                                   registro.get("contacto")))
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        print("Aviso: se ha ignorado una línea dañada del diario.")
+                        danado = True
+        except FileNotFoundError:
+            pass  # Sin diario no hay cambios pendientes
+        if danado:
+            self._escribir(list(datos.values()))
+
+    @staticmethod
+    def _aplicar(datos, registro):
+        """
+        Aplica un cambio del diario sobre el diccionario ID -> contacto.
+        """
+        operacion, id_contacto = registro["op"], registro["id"]
+        if operacion in ("eliminar", "modificar"):
+            datos.pop(id_contacto, None)
+        if operacion in ("añadir", "modificar"):
+            contacto = registro["contacto"]
+            datos.pop(contacto["id_contacto"], None)  # Al reemplazar, pasa al final como en memoria
+            datos[contacto["id_contacto"]] = contacto
+        elif operacion in ("favorito", "no_favorito") and id_contacto in datos:
+            datos[id_contacto]["favorito"] = operacion == "favorito"
+
+    def registrar(self, operacion, id_contacto, contacto=None, secuencia=None):
+        """
+        Añade un cambio al final del diario: una línea JSON, sin reescribir la agenda.
+
+        Devuelve el número de secuencia del cambio (el que se ha recibido).
+        """
+        datos = contacto.to_dict() if contacto is not None else None
+        return self.registrar_varios([(operacion, id_contacto, datos, secuencia)])[0]
+
+    def registrar_varios(self, cambios, sincronizar=False):
+        """
+        Añade varios cambios (tuplas (operación, ID, diccionario del contacto o None, secuencia o None))
+        al diario con una sola escritura. Con sincronizar=True se fuerzan a disco.
+
+        Devuelve la lista de números de secuencia de los cambios (los que se han recibido).
+        """
+        lineas = []
+        for operacion, id_contacto, datos, secuencia in cambios:
+            registro = {"op": operacion, "id": id_contacto}
+            if datos is not None:
+                registro["contacto"] = datos
+            if secuencia is not None:
+                registro["seq"] = secuencia
+                self.secuencia = max(self.secuencia, secuencia)
+            lineas.append(json.dumps(registro) + "\n")
+        with open(self.archivo_diario, "a", encoding="utf-8") as f:
+            f.write("".join(lineas))
+            if sincronizar:
+                f.flush()
+                os.fsync(f.fileno())
+        self.cambios_pendientes += len(lineas)
+        return [secuencia for _, _, _, secuencia in cambios]
+
+    def guardar(self, datos, secuencia=None):
+        """
+        Escribe todos los contactos (diccionarios) en el archivo JSON y vacía el diario (compactación).
+        
+        'secuencia' es el número del último cambio que ya incluyen los datos.
+        """
+        if secuencia is not None:
+            self.secuencia = max(self.secuencia, secuencia)
+        self._escribir(datos)
+
+    def _escribir(self, datos):
+        """
+        Escribe los diccionarios en un archivo temporal, lo fuerza a disco y sustituye
+        el archivo JSON con 'os.replace' (operación atómica: si el programa se
+        interrumpe, queda el archivo anterior o el nuevo, nunca uno a medias).
+        """
+        temporal = self.archivo_json + ".tmp"
+        with open(temporal, "wb") as f:
+            self._volcar_instantanea(f, datos)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.archivo_json)
+        # La secuencia se guarda después de la agenda y antes de borrar el diario: si el
+        # programa se interrumpe entre medias, el diario aún tiene los números de sus cambios
+        temporal = self.archivo_secuencia + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(str(self.secuencia))
+        os.replace(temporal, self.archivo_secuencia)
+        if os.path.exists(self.archivo_diario):
+            os.remove(self.archivo_diario)  # Sus cambios ya están en el archivo JSON
+        self.cambios_pendientes = 0
+
+    def cerrar(self):
+        pass  # No hay recursos abiertos entre operaciones
+
+
+class AlmacenamientoBinario(AlmacenamientoJSON):
+    """
+    Igual que AlmacenamientoJSON (mismo diario de cambios), pero la agenda completa
+    se guarda en el formato binario de 'instantanea_agenda': ocupa menos, cada texto
+    repetido se guarda una vez y se carga con mmap sin interpretar JSON.
+    
+    (El atributo 'archivo_json' guarda aquí la ruta del archivo binario.)
+    """
+
+    def __init__(self, archivo_binario="agenda.bin"):
+        super().__init__(archivo_binario)
+
+    def _leer_instantanea(self):
+        with InstantaneaBinaria(self.archivo_json) as instantanea:
+            yield from instantanea
+
+    def _volcar_instantanea(self, f, datos):
+        escribir_instantanea(f, datos)
+
+
+class AlmacenamientoSQLite:
+    """
+    Guarda la agenda en una base de datos SQLite.
+
+    - Tabla 'contactos' con 'id_contacto' como clave primaria (indexada). La columna no
+      tiene tipo, así que los IDs enteros siguen siendo enteros al cargarlos.
+    - Tabla virtual FTS5 'contactos_fts' con el nombre, teléfono y correo normalizados
+      (sin mayúsculas ni acentos) para buscar texto sin cargar la agenda (si la versión
+      de SQLite no tiene FTS5 se busca con LIKE).
+    - Cada cambio es una transacción: varios procesos pueden escribir en la misma
+      base de datos sin pisarse el archivo completo. Por eso 'guardar' no reescribe
+      la base de datos: solo 'reemplazar' (importar) sustituye todo su contenido.
+    - Tabla 'metadatos' con el número de secuencia del último cambio (ver AlmacenamientoJSON).
+      El número lo asigna la base de datos dentro de la transacción de cada cambio, así que
+      la numeración es única y creciente aunque escriban varios procesos.
+    - Tabla 'cambios' con el número del último cambio de cada ID (y si se eliminó), escrita
+      en la misma transacción: 'cambios_desde' la consulta y ve también los cambios de otros
+      procesos. Los cambios anteriores a 'secuencia_base' (el último 'reemplazar') no se conocen.
+    - Las consultas usan una segunda conexión, de solo lectura, y la base de datos está en
+      modo WAL: aunque otro hilo tenga una escritura a medias, solo ven cambios confirmados.
+
+    El archivo JSON se puede seguir usando para importar y exportar la agenda.
+    """
+
+    COLUMNAS = ("id_contacto", "nombre", "telefono", "direccion", "correo", "notas", "favorito")
+    VERSION_ESQUEMA = 3  # 2: 'id_contacto' sin tipo y texto normalizado en 'contactos_fts'; 3: tabla 'cambios'
+
+    def __init__(self, archivo_db="agenda.db"):
+        self.archivo_db = archivo_db
+        self.cambios_pendientes = 0  # Nunca hay cambios pendientes: se confirman al momento
+        self.secuencia = 0
+        self.secuencia_base = 0
+        self.historial = []
+        try:
+            # El servidor escribe desde un hilo aparte (nunca dos a la vez): la conexión no se ata a un hilo
+            self.conn = sqlite3.connect(archivo_db, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode = WAL")  # Las lecturas no esperan a las escrituras
+            self.crear_tablas()
+            self.lectura = self._conectar_lectura()
+        except sqlite3.Error as e:
+            print(f"Error al conectar con la base de datos: {e}")
+            raise
+
+    def _conectar_lectura(self):
+        """
+        Abre una conexión de solo lectura para las consultas (obtener, buscar_texto, cambios_desde).
+
+        Así una consulta hecha mientras otro hilo tiene una transacción abierta en 'conn'
+        nunca ve cambios aún sin confirmar, que se podrían deshacer.
+        """
+        if self.archivo_db == ":memory:":
+            return self.conn  # Una base de datos en memoria solo existe en su conexión
+        ruta = "file:" + quote(os.path.abspath(self.archivo_db)) + "?mode=ro"
+        return sqlite3.connect(ruta, uri=True)
+
+    def crear_tablas(self):
+        """
+        Crea las tablas si no existen.
+        """
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS contactos (
+                    id_contacto PRIMARY KEY,
+                    nombre TEXT,
+                    telefono TEXT,
+                    direccion TEXT,
+                    correo TEXT,
+                    notas TEXT,
+                    favorito INTEGER
+                )
+            """)
+            try:
+                self.conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS contactos_fts
+                    USING fts5(id_contacto UNINDEXED, nombre, telefono, correo, tokenize='trigram')
+                """)
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False  # SQLite sin FTS5 o sin el tokenizador 'trigram'
+            self.conn.execute("CREATE TABLE IF NOT EXISTS metadatos (clave TEXT PRIMARY KEY, valor INTEGER)")
+            self.conn.execute("INSERT OR IGNORE INTO metadatos VALUES ('secuencia', 0)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS cambios (
+                    id_contacto PRIMARY KEY,
+                    secuencia INTEGER,
+                    eliminado INTEGER
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS cambios_secuencia ON cambios (secuencia)")
+            fila = self.conn.execute("SELECT valor FROM metadatos WHERE clave = 'version'").fetchone()
+            if fila is None or fila[0] < self.VERSION_ESQUEMA:
+                self._migrar(fila[0] if fila else 0)
+                self.conn.execute("INSERT OR REPLACE INTO metadatos VALUES ('version', ?)", (self.VERSION_ESQUEMA,))
+
+    def _migrar(self, version):
+        """
+        Actualiza una base de datos de una versión anterior, dentro de la transacción en curso.
+
+        - Si 'id_contacto' era TEXT (convertía los IDs enteros en texto), se rehace la tabla sin tipo.
+          Los IDs que ya se guardaron como texto siguen siendo texto.
+        - Se vuelve a llenar 'contactos_fts' con el texto normalizado.
+        - La tabla 'cambios' empieza vacía: los cambios anteriores no se conocen, así que
+          'secuencia_base' pasa a ser el número del último cambio.
+        """
+        if version < 3:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO metadatos SELECT 'secuencia_base', valor FROM metadatos WHERE clave = 'secuencia'")
+        if version >= 2:
+            return
+        tipos = {columna[1]: columna[2] for columna in self.conn.execute("PRAGMA table_info(contactos)")}
+        if tipos.get("id_contacto", "").upper() == "TEXT":
+            self.conn.execute("ALTER TABLE contactos RENAME TO contactos_antigua")
+            self.conn.execute("""
+                CREATE TABLE contactos (
+                    id_contacto PRIMARY KEY,
+                    nombre TEXT,
+                    telefono TEXT,
+                    direccion TEXT,
+                    correo TEXT,
+                    notas TEXT,
+                    favorito INTEGER
+                )
+            """)
+            self.conn.execute("INSERT INTO contactos SELECT * FROM contactos_antigua ORDER BY rowid")
+            self.conn.execute("DROP TABLE contactos_antigua")
+        if self.fts:
+            self.conn.execute("DELETE FROM contactos_fts")
+            filas = self.conn.execute("SELECT id_contacto, nombre, telefono, correo FROM contactos ORDER BY rowid")
+            self.conn.executemany("INSERT INTO contactos_fts VALUES (?, ?, ?, ?)",
+                                  [(f[0], normalizar(f[1]), normalizar(f[2]), normalizar(f[3])) for f in filas])
+
+    def _fila(self, c):
+        return (c["id_contacto"], c["nombre"], c["telefono"], c["direccion"], c["correo"],
+                c.get("notas", ""), int(bool(c.get("favorito", False))))
+
+    def _insertar(self, datos):
+        """
+        Inserta contactos dados como diccionarios, dentro de la transacción en curso.
+
+        No reemplaza: si un ID ya existe (quizá lo ha añadido otro proceso) lanza sqlite3.IntegrityError.
+        """
+        filas = [self._fila(c) for c in datos]
+        self.conn.executemany("INSERT INTO contactos VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+        if self.fts:
+            self.conn.executemany("INSERT INTO contactos_fts VALUES (?, ?, ?, ?)",
+                                  [(f[0], normalizar(f[1]), normalizar(f[2]), normalizar(f[4])) for f in filas])
+
+    def _actualizar(self, datos):
+        """
+        Sustituye los datos de un contacto que conserva su ID, dentro de la transacción en curso.
+
+        Devuelve False si el contacto ya no existe (por ejemplo, lo ha eliminado otro proceso).
+        """
+        fila = self._fila(datos)
+        cursor = self.conn.execute(
+            "UPDATE contactos SET nombre = ?, telefono = ?, direccion = ?, correo = ?, notas = ?, favorito = ? "
+            "WHERE id_contacto = ?", fila[1:] + fila[:1])
+        if cursor.rowcount == 0:
+            return False
+        if self.fts:
+            self.conn.execute("DELETE FROM contactos_fts WHERE id_contacto = ?", (fila[0],))
+            self.conn.execute("INSERT INTO contactos_fts VALUES (?, ?, ?, ?)",
+                              (fila[0], normalizar(fila[1]), normalizar(fila[2]), normalizar(fila[4])))
+        return True
+
+    def _borrar(self, id_contacto):
+        self.conn.execute("DELETE FROM contactos WHERE id_contacto = ?", (id_contacto,))
+        if self.fts:
+            self.conn.execute("DELETE FROM contactos_fts WHERE id_contacto = ?", (id_contacto,))
+
+    def cargar(self):
+        """
+        Devuelve todos los contactos como diccionarios, en orden de inserción.
+        """
+        self.secuencia, self.secuencia_base = self._leer_secuencias()
+        cursor = self.conn.execute(f"SELECT {', '.join(self.COLUMNAS)} FROM contactos ORDER BY rowid")
+        return [self._a_diccionario(fila) for fila in cursor]
+
+    def _leer_secuencias(self, conexion=None):
+        """
+        Devuelve (número del último cambio, 'secuencia_base') tal como están en la base de datos
+        (leídos con 'conexion'; por defecto, la de escritura).
+        """
+        valores = dict((conexion or self.conn).execute(
+            "SELECT clave, valor FROM metadatos WHERE clave IN ('secuencia', 'secuencia_base')"))
+        return valores.get("secuencia", 0), valores.get("secuencia_base", 0)
+
+    def _a_diccionario(self, fila):
+        datos = dict(zip(self.COLUMNAS, fila))
+        datos["favorito"] = bool(datos["favorito"])
+        return datos
+
+    def registrar(self, operacion, id_contacto, contacto=None, secuencia=None):
+        """
+        Aplica un cambio en la base de datos en una transacción.
+
+        Devuelve el número de secuencia que le ha asignado la base de datos, o None si
+        la base de datos lo ha rechazado (ver 'registrar_varios').
+        """
+        datos = contacto.to_dict() if contacto is not None else None
+        return self.registrar_varios([(operacion, id_contacto, datos, secuencia)])[0]
+
+    def registrar_varios(self, cambios, sincronizar=False):
+        """
+        Aplica varios cambios (tuplas (operación, ID, diccionario del contacto o None, secuencia o None))
+        en una única transacción. SQLite ya fuerza a disco cada transacción, así que
+        'sincronizar' no cambia nada; está por compatibilidad con AlmacenamientoJSON.
+
+        Los números de secuencia los asigna la base de datos (se ignoran los recibidos).
+        Devuelve la lista de números asignados, en el orden de los cambios, con None
+        en los cambios rechazados, que no se aplican:
+        - añadir un contacto, o cambiarle el ID, a un ID que ya existe (por ejemplo,
+          porque lo ha añadido otro proceso): no se reemplaza al que ya estaba.
+        - modificar un contacto que ya no existe.
+        """
+        if not cambios:
+            return []
+        numeros = []
+        with self.conn:  # Confirma al salir o deshace si hay un error
+            # Se bloquea la base de datos para escribir desde el principio: ningún otro proceso
+            # puede escribir ni tomar números de secuencia hasta que se confirme
+            self.conn.execute("BEGIN IMMEDIATE")
+            for operacion, id_contacto, datos, _ in cambios:
+                id_nuevo = datos["id_contacto"] if datos is not None else id_contacto
+                self.conn.execute("SAVEPOINT cambio")
+                try:
+                    aplicado = True
+                    if operacion == "eliminar" or (operacion == "modificar" and id_nuevo != id_contacto):
+                        self._borrar(id_contacto)
+                    if operacion == "añadir" or (operacion == "modificar" and id_nuevo != id_contacto):
+                        self._insertar([datos])
+                    elif operacion == "modificar":
+                        aplicado = self._actualizar(datos)
+                    elif operacion in ("favorito", "no_favorito"):
+                        self.conn.execute("UPDATE contactos SET favorito = ? WHERE id_contacto = ?",
+                                          (int(operacion == "favorito"), id_contacto))
+                except sqlite3.IntegrityError:
+                    aplicado = False  # El ID ya existe
+                if not aplicado:
+                    self.conn.execute("ROLLBACK TO cambio")  # Deshace solo este cambio
+                    numeros.append(None)
+                else:
+                    secuencia = self._reservar_secuencias(1)
+                    self._anotar_cambio(secuencia, operacion, id_contacto, id_nuevo)
+                    numeros.append(secuencia)
+                self.conn.execute("RELEASE cambio")
+            self.secuencia = self._leer_secuencias()[0]
+        return numeros
+
+    def _reservar_secuencias(self, cantidad):
+        """
+        Suma 'cantidad' al número de secuencia guardado y devuelve el nuevo valor, dentro de la transacción en curso.
+        """
+        return self.conn.execute("UPDATE metadatos SET valor = valor + ? WHERE clave = 'secuencia' RETURNING valor",
+                                 (cantidad,)).fetchall()[0][0]
+
+    def _anotar_cambio(self, secuencia, operacion, id_contacto, id_nuevo):
+        """
+        Apunta en la tabla 'cambios' el cambio número 'secuencia', dentro de la transacción en curso.
+
+        Como GestorAgenda._anotar: si una modificación cambia el ID, el antiguo queda como eliminado.
+        """
+        if operacion == "eliminar" or id_nuevo != id_contacto:
+            self.conn.execute("INSERT OR REPLACE INTO cambios VALUES (?, ?, 1)", (id_contacto, secuencia))
+        if operacion != "eliminar":
+            self.conn.execute("INSERT OR REPLACE INTO cambios VALUES (?, ?, 0)", (id_nuevo, secuencia))
+
+    def guardar(self, datos, secuencia=None):
+        """
+        No hace nada más que confirmar: cada cambio ya se guardó en su propia transacción.
+
+        No se reescribe la base de datos con 'datos' (la copia en memoria de este
+        proceso) porque borraría los contactos que hayan añadido otros procesos.
+        """
+        self.conn.commit()
+
+    def reemplazar(self, datos):
+        """
+        Sustituye todo el contenido de la base de datos por 'datos' (diccionarios, sin IDs
+        repetidos) en una única transacción.
+
+        Cuenta como un cambio nuevo que no se puede consultar uno a uno: vacía la tabla
+        'cambios' y 'secuencia_base' pasa a ser su número (quien sincroniza debe recargar todo).
+        """
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.secuencia = self.secuencia_base = self._reservar_secuencias(1)
+            self.conn.execute("INSERT OR REPLACE INTO metadatos VALUES ('secuencia_base', ?)", (self.secuencia,))
+            self.conn.execute("DELETE FROM cambios")
+            self.conn.execute("DELETE FROM contactos")
+            if self.fts:
+                self.conn.execute("DELETE FROM contactos_fts")
+            self._insertar(datos)
+
+    def obtener(self, id_contacto):
+        """
+        Busca un contacto por ID directamente en la base de datos (usa la clave primaria).
+        
+        Devuelve un diccionario o None si no existe.
+        """
+        fila = self.lectura.execute(f"SELECT {', '.join(self.COLUMNAS)} FROM contactos WHERE id_contacto = ?",
+                                    (id_contacto,)).fetchone()
+        return self._a_diccionario(fila) if fila else None
+
+    def buscar_texto(self, texto, limite=None):
+        """
+        Busca en la base de datos los IDs de los contactos cuyo nombre, teléfono o
+        correo contienen el texto (sin distinguir mayúsculas ni acentos), los más relevantes primero.
+
+        Con 'limite' (número máximo de IDs) la consulta se detiene al encontrarlos.
+        """
+        texto = normalizar(texto)
+        limite = -1 if limite is None else limite  # En SQLite, LIMIT -1 es sin límite
+        if self.fts and len(texto) >= 3:  # El tokenizador 'trigram' necesita al menos 3 caracteres
+            frase = '"' + texto.replace('"', '""') + '"'
+            cursor = self.lectura.execute(
+                "SELECT id_contacto FROM contactos_fts WHERE contactos_fts MATCH ? ORDER BY rank LIMIT ?",
+                (frase, limite))
+        else:
+            # Sin FTS5 se busca en 'contactos', sin normalizar (LIKE solo ignora mayúsculas en ASCII)
+            tabla = "contactos_fts" if self.fts else "contactos"
+            patron = "%" + texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            cursor = self.lectura.execute(
+                f"SELECT id_contacto FROM {tabla} WHERE nombre LIKE ?1 ESCAPE '\\' "
+                "OR telefono LIKE ?1 ESCAPE '\\' OR correo LIKE ?1 ESCAPE '\\' ORDER BY rowid LIMIT ?2",
+                (patron, limite))
+        return [fila[0] for fila in cursor]
+
+    def cambios_desde(self, secuencia):
+        """
+        Devuelve los contactos que han cambiado después del cambio número 'secuencia',
+        con el mismo formato que GestorAgenda.cambios_desde, leídos de la base de datos
+        (incluye los cambios hechos por otros procesos).
+
+        Usa el índice de 'cambios' por secuencia: el coste depende de los cambios pedidos.
+        """
+        # Se lee con la conexión de lectura y en una transacción: todas las consultas ven la misma
+        # foto de la base de datos, solo con cambios confirmados (sus números ya no se reutilizan)
+        columnas = ", ".join("contactos." + columna for columna in self.COLUMNAS)
+        self.lectura.execute("BEGIN")
+        try:
+            actual, base = self._leer_secuencias(self.lectura)
+            if secuencia < base or secuencia > actual:
+                cursor = self.lectura.execute(
+                    f"SELECT coalesce(cambios.secuencia, ?), contactos.id_contacto, 0, {columnas} FROM contactos "
+                    "LEFT JOIN cambios ON cambios.id_contacto = contactos.id_contacto ORDER BY contactos.rowid",
+                    (base,))
+            else:
+                cursor = self.lectura.execute(
+                    f"SELECT cambios.secuencia, cambios.id_contacto, cambios.eliminado, {columnas} FROM cambios "
+                    "LEFT JOIN contactos ON contactos.id_contacto = cambios.id_contacto "
+                    "WHERE cambios.secuencia > ? ORDER BY cambios.secuencia", (secuencia,))
+            cambios = [{"secuencia": fila[0], "id_contacto": fila[1],
+                        "contacto": None if fila[2] or fila[3] is None else self._a_diccionario(fila[3:])}
+                       for fila in cursor]
+        finally:
+            self.lectura.rollback()  # Solo se ha leído: se termina la transacción sin más
+        return {"secuencia": actual, "reinicio": not base <= secuencia <= actual, "cambios": cambios}
+
+    def importar_json(self, archivo_json):
+        """
+        Sustituye el contenido de la base de datos por el de un archivo JSON de la agenda.
+        
+        Devuelve el número de contactos importados.
+        """
+        with open(archivo_json, "r", encoding="utf-8") as f:
+            datos = {}
+            for c in json.load(f):
+                datos.setdefault(c["id_contacto"], c)  # Si un ID se repite, se conserva el primero
+        self.reemplazar(list(datos.values()))
+        return len(datos)
+
+    def exportar_json(self, archivo_json):
+        """
+        Escribe la agenda en un archivo JSON con el mismo formato que usa AlmacenamientoJSON.
+        """
+        with open(archivo_json, "w", encoding="utf-8") as f:
+            json.dump(self.cargar(), f, indent=4)
+
+    def cerrar(self):
+        if self.lectura is not self.conn:
+            self.lectura.close()
+        self.conn.close()
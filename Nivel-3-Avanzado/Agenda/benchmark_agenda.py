@@ -0,0 +1,152 @@
+# Pruebas de rendimiento de la agenda.
+#
+# Genera una agenda de prueba en un directorio temporal y mide:
+#   - El tiempo de arranque (crear GestorAgenda, que carga el archivo).
+#   - El pico de memoria durante la carga (con tracemalloc, en una pasada aparte
+#     porque tracemalloc ralentiza mucho la ejecución).
+#   - El tiempo del primer acceso por ID y de la primera búsqueda por texto
+#     (que construye los índices secundarios).
+#   - El tiempo y la memoria por contacto al crear todos los objetos Contacto,
+#     con y sin validar el correo.
+#
+# Con --instantaneas compara la agenda completa en JSON y en formato binario:
+# tiempo de guardar y de cargar, tamaño del archivo y acceso aleatorio a un contacto.
+#
+# Uso:
+#   python benchmark_agenda.py                 # 1.000.000 de contactos
+#   python benchmark_agenda.py -n 100000 --sqlite
+#   python benchmark_agenda.py --instantaneas
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from almacenamiento_agenda import AlmacenamientoBinario, AlmacenamientoJSON, AlmacenamientoSQLite
+from contacto_agenda import Contacto
+from datos_prueba_agenda import escribir_agenda_json, generar_contactos
+from gestor_agenda import GestorAgenda
+from instantanea_agenda import InstantaneaBinaria
+
+
+CONTACTOS_POR_DEFECTO = 1_000_000
+
+
+def crear_gestor(ruta, sqlite):
+    """
+    Crea el gestor de la agenda sobre el archivo indicado.
+    """
+    if sqlite:
+        return GestorAgenda(almacenamiento=AlmacenamientoSQLite(ruta))
+    return GestorAgenda(ruta)
+
+
+def medir(funcion):
+    """
+    Ejecuta la función y devuelve (resultado, segundos).
+    """
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def pico_memoria(funcion):
+    """
+    Devuelve el pico de memoria (en MiB) reservado mientras se ejecuta la función.
+    """
+    tracemalloc.start()
+    try:
+        resultado = funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return pico / 2**20
+
+
+def crear_objetos(datos, validar):
+    """
+    Crea un objeto Contacto por diccionario y devuelve (segundos, bytes por contacto).
+
+    El tiempo y la memoria se miden en pasadas distintas, porque tracemalloc ralentiza la creación.
+    """
+    contactos, segundos = medir(lambda: [Contacto.from_dict(d, validar=validar) for d in datos])
+    del contactos
+    tracemalloc.start()
+    try:
+        antes, _ = tracemalloc.get_traced_memory()
+        contactos = [Contacto.from_dict(d, validar=validar) for d in datos]
+        despues, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Descontamos la lista que guarda los contactos (un puntero por contacto)
+    return segundos, (despues - antes) / len(contactos) - 8
+
+
+def comparar_instantaneas(n, directorio, accesos=10000):
+    """
+    Guarda y carga n contactos con AlmacenamientoJSON y AlmacenamientoBinario y muestra
+    tiempos, tamaños y el acceso aleatorio por posición de la instantánea binaria.
+    """
+    datos = list(generar_contactos(n))
+    for nombre, almacenamiento in (("JSON", AlmacenamientoJSON(os.path.join(directorio, "agenda.json"))),
+                                   ("binario", AlmacenamientoBinario(os.path.join(directorio, "agenda.bin")))):
+        _, guardar = medir(lambda: almacenamiento.guardar(datos))
+        cargados, cargar = medir(almacenamiento.cargar)
+        assert cargados == datos
+        tamano = os.path.getsize(almacenamiento.archivo_json)
+        print(f"{nombre:8} guardar {guardar:6.2f} s ({n / guardar:9.0f} contactos/s)   "
+              f"cargar {cargar:6.2f} s ({n / cargar:9.0f} contactos/s)   "
+              f"{tamano / 2**20:7.1f} MiB ({tamano / n:.0f} bytes por contacto)")
+
+    posiciones = random.Random(1).choices(range(n), k=accesos)
+    with InstantaneaBinaria(os.path.join(directorio, "agenda.bin")) as instantanea:
+        _, segundos = medir(lambda: [instantanea.contacto(p) for p in posiciones])
+    print(f"Acceso aleatorio a la instantánea binaria (mmap): {segundos / accesos * 1e6:.1f} µs por contacto")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de la agenda.")
+    parser.add_argument("-n", "--contactos", type=int, default=CONTACTOS_POR_DEFECTO,
+                        help="Número de contactos de la agenda de prueba.")
+    parser.add_argument("--sqlite", action="store_true", help="Usa el almacenamiento SQLite en lugar de JSON.")
+    parser.add_argument("--instantaneas", action="store_true",
+                        help="Compara la agenda completa en JSON y en formato binario.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        if args.instantaneas:
+            comparar_instantaneas(args.contactos, directorio)
+            return
+        ruta_json = os.path.join(directorio, "agenda.json")
+        _, segundos = medir(lambda: escribir_agenda_json(ruta_json, args.contactos))
+        print(f"Agenda de {args.contactos} contactos generada en {segundos:.2f} s "
+              f"({os.path.getsize(ruta_json) / 2**20:.1f} MiB)")
+        ruta = ruta_json
+        if args.sqlite:
+            ruta = os.path.join(directorio, "agenda.db")
+            AlmacenamientoSQLite(ruta).importar_json(ruta_json)
+
+        agenda, segundos = medir(lambda: crear_gestor(ruta, args.sqlite))
+        print(f"Arranque: {segundos:.2f} s")
+        _, segundos = medir(lambda: agenda.buscar_contacto_por_id(str(args.contactos // 2)))
+        print(f"Primer acceso por ID: {segundos * 1e6:.1f} µs")
+        _, segundos = medir(lambda: agenda.buscar_contactos_por_texto("lucia"))
+        print(f"Primera búsqueda por texto (construye los índices): {segundos:.2f} s")
+        _, segundos = medir(lambda: agenda.buscar_contactos_por_texto("lucia"))
+        print(f"Segunda búsqueda por texto: {segundos * 1e3:.1f} ms")
+        datos = list(agenda.contactos.diccionarios())
+        del agenda
+        for validar in (True, False):
+            segundos, por_contacto = crear_objetos(datos, validar)
+            print(f"Crear {len(datos)} objetos Contacto ({'validando' if validar else 'sin validar'} el correo): "
+                  f"{segundos:.2f} s, {por_contacto:.0f} bytes por contacto (tracemalloc)")
+        del datos
+
+        print(f"Pico de memoria al arrancar: {pico_memoria(lambda: crear_gestor(ruta, args.sqlite)):.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
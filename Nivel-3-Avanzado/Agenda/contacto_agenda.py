@@ -1,5 +1,8 @@
 import re  # Importamos el módulo 're' para usar expresiones regulares y validar correos
 
+# Patrón básico de correo (texto@texto.texto), compilado una sola vez al importar el módulo
+PATRON_CORREO = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+
 class Contacto:
     """
     Clase que representa un contacto de la agenda.
@@ -12,8 +15,13 @@ class Contacto:
     - correo: dirección de correo electrónico (validada)
     - notas: información adicional opcional
     - favorito: indica si el contacto está marcado como favorito (True/False)
+    
+    Usa __slots__ para no crear un diccionario por contacto: con agendas grandes
+    ahorra memoria y hace más rápida la creación de objetos.
     """
 
+    __slots__ = ("id_contacto", "nombre", "telefono", "direccion", "correo", "notas", "favorito")
+
     def __init__(self, id_contacto, nombre, telefono, direccion, correo, notas=""):
         """
         Constructor de la clase Contacto. Se ejecuta al crear un nuevo contacto.
@@ -56,8 +64,7 @@ class Contacto:
         - True si el correo es válido
         - False si no cumple el patrón
         """
-        patron = r"^[\w\.-]+@[\w\.-]+\.\w+$"  # Patrón básico: texto@texto.texto
-        return re.match(patron, correo) is not None
+        return PATRON_CORREO.match(correo) is not None
 
     def to_dict(self):
         """
@@ -76,16 +83,28 @@ class Contacto:
         }
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, validar=True):
         """
         Crea un objeto Contacto a partir de un diccionario (como los que se leen del JSON).
         
         Parámetros:
         - data: diccionario con los datos del contacto
+        - validar: si es False no se valida el correo. Solo para datos de confianza,
+          como los que la propia agenda guardó (ya se validaron al crearlos).
         
         Devuelve:
         - Una instancia de Contacto con los datos cargados
         """
+        if not validar:
+            contacto = cls.__new__(cls)  # Sin pasar por __init__, así no se valida el correo
+            contacto.id_contacto = data["id_contacto"]
+            contacto.nombre = data["nombre"]
+            contacto.telefono = data["telefono"]
+            contacto.direccion = data["direccion"]
+            contacto.correo = data["correo"]
+            contacto.notas = data.get("notas", "")
+            contacto.favorito = data.get("favorito", False)
+            return contacto
         contacto = cls(
             data["id_contacto"],
             data["nombre"],
@@ -97,17 +116,25 @@ class Contacto:
         contacto.favorito = data.get("favorito", False)  # Marca como favorito si el diccionario lo indica
         return contacto
 
+    def como_texto(self):
+        """
+        Devuelve los datos del contacto como texto, un campo por línea.
+        """
+        return (
+            f"ID: {self.id_contacto}\n"
+            f"Nombre: {self.nombre}\n"
+            f"Teléfono: {self.telefono}\n"
+            f"Dirección: {self.direccion}\n"
+            f"Correo: {self.correo}\n"
+            f"Notas: {self.notas}\n"
+            f"Favorito: {'Sí' if self.favorito else 'No'}"  # Muestra 'Sí' si es favorito, 'No' si no lo es
+        )
+
     def mostrar_contacto(self):
         """
-        Muestra los datos del contacto en pantalla de forma clara.
+        Muestra los datos del contacto en pantalla de forma clara (con una sola escritura).
         """
-        print(f"ID: {self.id_contacto}")
-        print(f"Nombre: {self.nombre}")
-        print(f"Teléfono: {self.telefono}")
-        print(f"Dirección: {self.direccion}")
-        print(f"Correo: {self.correo}")
-        print(f"Notas: {self.notas}")
-        print(f"Favorito: {'Sí' if self.favorito else 'No'}")  # Muestra 'Sí' si es favorito, 'No' si no lo es
+        print(self.como_texto())
 
     def marcar_favorito(self):
         """
@@ -0,0 +1,41 @@
+# Agendas de prueba generadas al azar (siempre las mismas para una semilla dada).
+#
+# Las usan benchmark_agenda.py y el generador de carga de servidor_agenda.py.
+
+import json
+import random
+
+
+NOMBRES = ["Ana", "Luis", "María", "José", "Lucía", "Pedro", "Sofía", "Javier", "Elena", "Álvaro"]
+APELLIDOS = ["García", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Fernández", "Díaz"]
+
+
+def generar_contactos(n, semilla=0):
+    """
+    Genera n contactos de prueba como diccionarios.
+    """
+    aleatorio = random.Random(semilla)
+    for i in range(n):
+        nombre = f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)}"
+        yield {
+            "id_contacto": str(i),
+            "nombre": nombre,
+            "telefono": f"6{aleatorio.randrange(10**8):08d}",
+            "direccion": f"Calle {aleatorio.randrange(1, 200)}",
+            "correo": f"contacto{i}@ejemplo.com",
+            "notas": "",
+            "favorito": aleatorio.random() < 0.05,
+        }
+
+
+def escribir_agenda_json(ruta, n):
+    """
+    Escribe una agenda JSON de n contactos, un contacto cada vez.
+    """
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, contacto in enumerate(generar_contactos(n)):
+            if i:
+                f.write(",\n")
+            json.dump(contacto, f)
+        f.write("\n]")
@@ -0,0 +1,201 @@
+import re
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from indice_texto import normalizar
+
+
+TAMANO_MAXIMO_BLOQUE = 50  # Claves compartidas por más contactos se descartan (p. ej., un nombre muy frecuente)
+DIGITOS_TELEFONO = 9  # Dígitos significativos de un teléfono (sin prefijo de país)
+MINIMO_DIGITOS_TELEFONO = 6  # Teléfonos más cortos no se usan como clave
+SIMILITUD_MINIMA_NOMBRE = 0.8  # Parecido mínimo (0 a 1) de las claves fonéticas de dos nombres del mismo contacto
+
+# Reglas de la clave fonética, en orden (pensadas para la pronunciación del español)
+REGLAS_FONETICAS = [(re.compile(patron), sustitucion) for patron, sustitucion in (
+    (r"[^a-z]", ""),  # Solo letras (los acentos ya se han quitado al normalizar)
+    (r"ch", "X"),  # 'ch' se conserva antes de quitar la 'h'
+    (r"h", ""),  # La 'h' no suena
+    (r"qu", "k"),
+    (r"c(?=[ei])", "s"),  # Seseo: 'ce', 'ci' y 'z' suenan como 's'
+    (r"z", "s"),
+    (r"c", "k"),
+    (r"g(?=[ei])", "j"),  # 'ge', 'gi' suenan como 'je', 'ji'
+    (r"gu(?=[ei])", "g"),  # 'gue', 'gui' suenan como 'ge', 'gi' con 'g' suave
+    (r"[vw]", "b"),
+    (r"ll", "y"),
+    (r"y$", "i"),
+    (r"x", "ks"),
+    (r"(.)\1+", r"\1"),  # Letras repetidas ('rr', 'ss', ...) cuentan como una
+)]
+
+
+def normalizar_telefono(telefono):
+    """
+    Deja solo los dígitos del teléfono y quita el prefijo internacional.
+
+    Devuelve None si quedan muy pocos dígitos para usarlo como clave.
+    Ejemplo: "+34 600-12-34-56" -> "600123456"
+    """
+    digitos = "".join(c for c in telefono if c.isdigit())
+    if len(digitos) < MINIMO_DIGITOS_TELEFONO:
+        return None
+    return digitos[-DIGITOS_TELEFONO:]
+
+
+def normalizar_correo(correo):
+    """
+    Normaliza un correo: minúsculas y sin la etiqueta '+...' de la parte local.
+
+    Devuelve None si no es un correo.
+    Ejemplo: "Ana.Lopez+trabajo@Ejemplo.com" -> "ana.lopez@ejemplo.com"
+    """
+    local, arroba, dominio = correo.strip().lower().rpartition("@")
+    if not arroba or not local or not dominio:
+        return None
+    return f"{local.split('+')[0]}@{dominio}"
+
+
+@lru_cache(maxsize=65536)
+def _palabra_fonetica(palabra):
+    """
+    Aplica las reglas fonéticas a una palabra ya normalizada (los nombres se repiten mucho, por eso la caché).
+    """
+    for patron, sustitucion in REGLAS_FONETICAS:
+        palabra = patron.sub(sustitucion, palabra)
+    return palabra.lower()
+
+
+def clave_fonetica(nombre):
+    """
+    Clave fonética de un nombre: cada palabra se transforma según cómo suena
+    y las palabras se ordenan, así no importa el orden de nombre y apellidos.
+
+    Devuelve None si el nombre no tiene letras.
+    Ejemplo: "Giménez, Álvaro" y "alvaro jimenes" -> "albaro jimenes"
+    """
+    palabras = (_palabra_fonetica(palabra) for palabra in normalizar(nombre).split())
+    return " ".join(sorted(p for p in palabras if p)) or None
+
+
+def claves_bloqueo(nombre, telefono, correo):
+    """
+    Devuelve las claves de bloqueo de un contacto: dos contactos con una clave en
+    común son candidatos a duplicado. Cada clave lleva delante el campo del que sale.
+    """
+    claves = []
+    for campo, clave in (("telefono", normalizar_telefono(telefono)),
+                         ("correo", normalizar_correo(correo)),
+                         ("nombre", clave_fonetica(nombre))):
+        if clave is not None:
+            claves.append((campo, clave))
+    return claves
+
+
+def nombres_parecidos(nombre1, nombre2):
+    """
+    Indica si dos nombres pueden ser del mismo contacto: suenan igual o sus claves
+    fonéticas se parecen al menos SIMILITUD_MINIMA_NOMBRE (por ejemplo, con una errata).
+    """
+    clave1, clave2 = clave_fonetica(nombre1), clave_fonetica(nombre2)
+    if clave1 is None or clave2 is None:
+        return False
+    return clave1 == clave2 or SequenceMatcher(None, clave1, clave2).ratio() >= SIMILITUD_MINIMA_NOMBRE
+
+
+def son_duplicados(campos1, campos2):
+    """
+    Compara dos contactos dados como tuplas (nombre, teléfono, correo).
+
+    Son duplicados si tienen el mismo teléfono o el mismo correo (normalizados)
+    y además nombres parecidos: compartir solo el teléfono (una centralita, una
+    familia) o solo el nombre no basta.
+    """
+    nombre1, telefono1, correo1 = campos1
+    nombre2, telefono2, correo2 = campos2
+    telefono1, correo1 = normalizar_telefono(telefono1), normalizar_correo(correo1)
+    mismo_telefono = telefono1 is not None and telefono1 == normalizar_telefono(telefono2)
+    mismo_correo = correo1 is not None and correo1 == normalizar_correo(correo2)
+    return (mismo_telefono or mismo_correo) and nombres_parecidos(nombre1, nombre2)
+
+
+def dividir_grupo(grupo, campos):
+    """
+    Divide un grupo de candidatos (de 'buscar_grupos') en grupos que se pueden fusionar.
+
+    Args:
+        grupo : IDs del grupo, en el orden de la agenda.
+        campos : Diccionario ID -> (nombre, teléfono, correo) con al menos los del grupo.
+
+    Returns:
+        Lista de grupos de al menos dos IDs, cada uno empezando por el más antiguo.
+        Dentro de cada grupo todos los pares cumplen 'son_duplicados': no se
+        fusiona a nadie solo porque se parezca a otro miembro del grupo.
+    """
+    grupos = []
+    pendientes = list(grupo)
+    while pendientes:
+        nuevo, pendientes = [pendientes[0]], pendientes[1:]
+        restantes = []
+        for id_contacto in pendientes:
+            if all(son_duplicados(campos[id_contacto], campos[otro]) for otro in nuevo):
+                nuevo.append(id_contacto)
+            else:
+                restantes.append(id_contacto)
+        pendientes = restantes
+        if len(nuevo) > 1:
+            grupos.append(nuevo)
+    return grupos
+
+
+def buscar_grupos(campos, tamano_maximo_bloque=TAMANO_MAXIMO_BLOQUE):
+    """
+    Agrupa los contactos que pueden ser duplicados sin compararlos todos con todos.
+
+    Args:
+        campos : Iterable de tuplas (ID, nombre, teléfono, correo), como las de
+                 'ContactosPerezosos.campos'.
+        tamano_maximo_bloque : Las claves que comparten más contactos que esto se
+                 descartan (no distinguen nada y harían grupos enormes).
+
+    Returns:
+        Lista de grupos (listas de IDs con al menos dos contactos), en el orden de la agenda.
+        Dos contactos van al mismo grupo si comparten alguna clave de bloqueo,
+        directamente o a través de otros contactos del grupo. Son solo candidatos:
+        antes de fusionar hay que comprobarlos par a par con 'dividir_grupo'.
+
+    Coste: lineal en el número de contactos (más la unión de conjuntos, casi constante).
+    """
+    bloques = {}  # Clave de bloqueo -> IDs que la tienen
+    orden = {}  # ID -> posición en la agenda
+    for id_contacto, nombre, telefono, correo in campos:
+        orden[id_contacto] = len(orden)
+        for clave in claves_bloqueo(nombre, telefono, correo):
+            bloques.setdefault(clave, []).append(id_contacto)
+
+    padre = {}  # Unión de conjuntos: ID -> ID de su representante
+
+    def raiz(id_contacto):
+        while padre.get(id_contacto, id_contacto) != id_contacto:
+            padre[id_contacto] = padre.get(padre[id_contacto], padre[id_contacto])  # Compresión de caminos
+            id_contacto = padre[id_contacto]
+        return id_contacto
+
+    for ids in bloques.values():
+        if len(ids) < 2 or len(ids) > tamano_maximo_bloque:
+            continue
+        primero = raiz(ids[0])
+        for otro in ids[1:]:
+            otro = raiz(otro)
+            if otro != primero:
+                # El representante es siempre el que aparece antes en la agenda
+                if orden[otro] < orden[primero]:
+                    primero, otro = otro, primero
+                padre[otro] = primero
+
+    grupos = {}
+    for id_contacto in padre:
+        grupos.setdefault(raiz(id_contacto), set()).add(id_contacto)
+    return sorted(
+        (sorted(miembros | {representante}, key=orden.__getitem__) for representante, miembros in grupos.items()),
+        key=lambda grupo: orden[grupo[0]],
+    )
@@ -0,0 +1,239 @@
+import csv
+import json
+import os
+
+from almacenamiento_agenda import leer_lista_json
+
+
+CAMPOS = ("id_contacto", "nombre", "telefono", "direccion", "correo", "notas", "favorito")
+VERDADERO = {"1", "true", "sí", "si", "yes", "x"}  # Valores que se leen como favorito = True
+
+
+def a_booleano(valor):
+    """
+    Convierte el valor de la columna 'favorito' (texto o booleano) en True/False.
+    """
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in VERDADERO
+
+
+# ---------------------- CSV ----------------------
+def leer_csv(f):
+    """
+    Recorre los contactos de un CSV con cabecera (las columnas se llaman como los campos de Contacto).
+    """
+    for fila in csv.DictReader(f):
+        fila["favorito"] = a_booleano(fila.get("favorito") or False)
+        yield fila
+
+
+def escribir_csv(f, datos):
+    """
+    Escribe los contactos en formato CSV con cabecera. Devuelve el número de contactos escritos.
+    """
+    escritor = csv.DictWriter(f, fieldnames=CAMPOS, extrasaction="ignore")
+    escritor.writeheader()
+    total = 0
+    for d in datos:
+        escritor.writerow(d)
+        total += 1
+    return total
+
+
+# ---------------------- JSON ----------------------
+def leer_json(f):
+    """
+    Recorre los contactos de una lista JSON (el mismo formato que agenda.json) leyéndola por partes.
+    """
+    return leer_lista_json(f)
+
+
+def escribir_json(f, datos):
+    """
+    Escribe los contactos como lista JSON, un contacto por línea y sin montar la lista en memoria.
+    Devuelve el número de contactos escritos.
+    """
+    f.write("[")
+    total = 0
+    for d in datos:
+        f.write(",\n" if total else "\n")
+        f.write(json.dumps(d, ensure_ascii=False))
+        total += 1
+    f.write("\n]\n")
+    return total
+
+
+# ---------------------- vCard ----------------------
+def escapar_vcard(texto):
+    """
+    Escapa un valor de texto de vCard (barra invertida, coma, punto y coma y saltos de línea).
+    """
+    return (str(texto).replace("\\", "\\\\").replace(",", "\\,")
+            .replace(";", "\\;").replace("\n", "\\n"))
+
+
+def desescapar_vcard(texto):
+    """
+    Deshace 'escapar_vcard'.
+    """
+    resultado = []
+    i = 0
+    while i < len(texto):
+        if texto[i] == "\\" and i + 1 < len(texto):
+            i += 1
+            resultado.append("\n" if texto[i] in "nN" else texto[i])
+        else:
+            resultado.append(texto[i])
+        i += 1
+    return "".join(resultado)
+
+
+def dividir_vcard(texto, separador=";"):
+    """
+    Divide un valor compuesto de vCard (como ADR) por el separador, respetando los escapes.
+    """
+    partes, actual = [], []
+    i = 0
+    while i < len(texto):
+        if texto[i] == "\\" and i + 1 < len(texto):
+            actual.append(texto[i:i + 2])
+            i += 2
+            continue
+        if texto[i] == separador:
+            partes.append("".join(actual))
+            actual = []
+        else:
+            actual.append(texto[i])
+        i += 1
+    partes.append("".join(actual))
+    return partes
+
+
+def _lineas_vcard(f):
+    """
+    Recorre las líneas lógicas de un archivo vCard, uniendo las líneas plegadas
+    (las que empiezan por un espacio o un tabulador continúan la anterior).
+    """
+    anterior = None
+    for linea in f:
+        linea = linea.rstrip("\r\n")
+        if linea[:1] in (" ", "\t") and anterior is not None:
+            anterior += linea[1:]
+            continue
+        if anterior is not None:
+            yield anterior
+        anterior = linea
+    if anterior is not None:
+        yield anterior
+
+
+def leer_vcard(f):
+    """
+    Recorre los contactos de un archivo vCard (versiones 3.0 y 4.0).
+
+    Se leen UID, FN, TEL, ADR, EMAIL, NOTE y CATEGORIES (la categoría "favorito"
+    marca el contacto como favorito). De cada propiedad repetida se usa la primera.
+    """
+    contacto = None
+    for linea in _lineas_vcard(f):
+        if not linea.strip():
+            continue
+        nombre, _, valor = linea.partition(":")
+        propiedad = nombre.split(";")[0].upper()
+        if propiedad == "BEGIN":
+            contacto = {}
+        elif propiedad == "END" and contacto is not None:
+            contacto.setdefault("notas", "")
+            contacto.setdefault("favorito", False)
+            yield contacto
+            contacto = None
+        elif contacto is None:
+            continue
+        elif propiedad == "UID":
+            contacto.setdefault("id_contacto", desescapar_vcard(valor))
+        elif propiedad == "FN":
+            contacto.setdefault("nombre", desescapar_vcard(valor))
+        elif propiedad == "TEL":
+            contacto.setdefault("telefono", desescapar_vcard(valor).removeprefix("tel:"))
+        elif propiedad == "ADR":
+            partes = [desescapar_vcard(p) for p in dividir_vcard(valor)]
+            contacto.setdefault("direccion", ", ".join(p for p in partes if p))
+        elif propiedad == "EMAIL":
+            contacto.setdefault("correo", desescapar_vcard(valor))
+        elif propiedad == "NOTE":
+            contacto.setdefault("notas", desescapar_vcard(valor))
+        elif propiedad == "CATEGORIES":
+            categorias = [desescapar_vcard(c).strip().lower() for c in dividir_vcard(valor, ",")]
+            contacto["favorito"] = "favorito" in categorias
+
+
+def escribir_vcard(f, datos):
+    """
+    Escribe los contactos en formato vCard 3.0 (la dirección va en el campo "calle" de ADR).
+    Devuelve el número de contactos escritos.
+    """
+    total = 0
+    for d in datos:
+        lineas = [
+            "BEGIN:VCARD",
+            "VERSION:3.0",
+            f"UID:{escapar_vcard(d['id_contacto'])}",
+            f"FN:{escapar_vcard(d['nombre'])}",
+            f"N:{escapar_vcard(d['nombre'])};;;;",
+            f"TEL:{escapar_vcard(d['telefono'])}",
+            f"ADR:;;{escapar_vcard(d['direccion'])};;;;",
+            f"EMAIL:{escapar_vcard(d['correo'])}",
+        ]
+        if d.get("notas"):
+            lineas.append(f"NOTE:{escapar_vcard(d['notas'])}")
+        if d.get("favorito"):
+            lineas.append("CATEGORIES:favorito")
+        lineas.append("END:VCARD")
+        f.write("\r\n".join(lineas) + "\r\n")  # vCard usa CRLF como fin de línea
+        total += 1
+    return total
+
+
+# ---------------------- SELECCIÓN DE FORMATO ----------------------
+# Formato -> (función de lectura, función de escritura, opciones de 'open')
+FORMATOS = {
+    "csv": (leer_csv, escribir_csv, {"newline": ""}),
+    "json": (leer_json, escribir_json, {}),
+    "vcard": (leer_vcard, escribir_vcard, {"newline": ""}),
+}
+EXTENSIONES = {".csv": "csv", ".json": "json", ".vcf": "vcard", ".vcard": "vcard"}
+
+
+def formato_de(ruta, formato=None):
+    """
+    Devuelve el formato indicado o, si es None, el que corresponde a la extensión del archivo.
+
+    Lanza ValueError si el formato no está soportado.
+    """
+    if formato is None:
+        formato = EXTENSIONES.get(os.path.splitext(ruta)[1].lower())
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato or ruta} (usa csv, json o vcard)")
+    return formato
+
+
+def leer_contactos(ruta, formato=None):
+    """
+    Recorre uno a uno los contactos (como diccionarios) de un archivo CSV, JSON o vCard.
+    """
+    lector, _, opciones = FORMATOS[formato_de(ruta, formato)]
+    with open(ruta, "r", encoding="utf-8-sig", **opciones) as f:  # utf-8-sig: admite BOM
+        yield from lector(f)
+
+
+def escribir_contactos(ruta, datos, formato=None):
+    """
+    Escribe los contactos (diccionarios) en un archivo CSV, JSON o vCard.
+
+    Los contactos se escriben según se recorren, con un único búfer de escritura.
+    Devuelve el número de contactos escritos.
+    """
+    _, escritor, opciones = FORMATOS[formato_de(ruta, formato)]
+    with open(ruta, "w", encoding="utf-8", buffering=1 << 20, **opciones) as f:
+        return escritor(f, datos)
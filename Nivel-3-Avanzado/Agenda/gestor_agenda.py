@@ -1,5 +1,75 @@
-import json
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from almacenamiento_agenda import AlmacenamientoJSON  # Persistencia por defecto: JSON + diario
 from contacto_agenda import Contacto  # Importa la clase Contacto desde otro archivo
+from duplicados_agenda import buscar_grupos, dividir_grupo  # Detección de posibles contactos duplicados
+from formatos_agenda import escribir_contactos  # Exportación a CSV, JSON o vCard
+from indice_ordenado import IndiceOrdenado  # Listas ordenadas para listar por páginas
+from indice_texto import IndiceTexto  # Índice de n-gramas para la búsqueda por texto
+
+
+UMBRAL_COMPACTACION = 1000  # Cambios en el diario tras los que se reescribe el archivo JSON
+TAMANO_LOTE_IMPORTACION = 1000  # Contactos que se validan juntos al importar
+
+
+class ContactosPerezosos(MutableMapping):
+    """
+    Diccionario ID -> Contacto que guarda los datos cargados tal cual (diccionarios)
+    y solo crea el objeto Contacto la primera vez que se accede a él.
+
+    Así, al arrancar solo hace falta leer los datos y construir el índice por ID.
+    """
+
+    def __init__(self):
+        self._datos = {}  # ID -> Contacto, o diccionario si aún no se ha creado el Contacto
+
+    def __getitem__(self, id_contacto):
+        valor = self._datos[id_contacto]
+        if isinstance(valor, dict):
+            # Primer acceso: creamos el objeto y lo guardamos. Los datos vienen del
+            # almacenamiento de la agenda, que solo guarda contactos ya validados.
+            valor = Contacto.from_dict(valor, validar=False)
+            self._datos[id_contacto] = valor
+        return valor
+
+    def __setitem__(self, id_contacto, contacto):
+        self._datos[id_contacto] = contacto
+
+    def __delitem__(self, id_contacto):
+        del self._datos[id_contacto]
+
+    def __contains__(self, id_contacto):
+        return id_contacto in self._datos
+
+    def __iter__(self):
+        return iter(self._datos)
+
+    def __len__(self):
+        return len(self._datos)
+
+    def guardar_datos(self, datos):
+        """
+        Guarda un contacto en forma de diccionario, sin crear todavía el objeto Contacto.
+        """
+        self._datos[datos["id_contacto"]] = datos
+
+    def campos(self):
+        """
+        Recorre (ID, nombre, teléfono, correo) de todos los contactos sin crear objetos Contacto.
+        """
+        for id_contacto, valor in self._datos.items():
+            if isinstance(valor, dict):
+                yield id_contacto, valor["nombre"], valor["telefono"], valor["correo"]
+            else:
+                yield id_contacto, valor.nombre, valor.telefono, valor.correo
+
+    def diccionarios(self):
+        """
+        Recorre todos los contactos como diccionarios (para guardarlos) sin crear objetos Contacto.
+        """
+        for valor in self._datos.values():
+            yield valor if isinstance(valor, dict) else valor.to_dict()
 
 
 class GestorAgenda:
@@ -10,68 +80,221 @@ class GestorAgenda:
     - Buscar contactos por ID o por texto
     - Listar todos los contactos
     - Marcar y desmarcar favoritos
-    La información se guarda en un archivo JSON para mantenerla entre ejecuciones.
+    La información se guarda mediante un objeto de almacenamiento para mantenerla
+    entre ejecuciones (ver almacenamiento_agenda.py):
+    - AlmacenamientoJSON (por defecto): archivo JSON más un diario de cambios que
+      se compacta en el archivo cada cierto número de cambios.
+    - AlmacenamientoSQLite: base de datos SQLite con un índice de texto FTS5.
+
+    Los contactos se guardan en un diccionario indexado por ID y se mantienen
+    índices secundarios (favoritos, teléfonos y correos), de modo que buscar,
+    eliminar o modificar un contacto no obliga a recorrer toda la agenda.
+
+    Al cargar solo se construyen el índice por ID y el de favoritos: los objetos
+    Contacto se crean al acceder a cada uno (ver ContactosPerezosos) y los índices
+    de teléfonos, correos y texto se construyen la primera vez que se usan.
+
+    Cada cambio recibe un número de secuencia creciente (ver 'cambios_desde'), así
+    otro programa puede mantener una copia de la agenda pidiendo solo lo que ha cambiado.
     """
 
-    def __init__(self, archivo_json="agenda.json"):
+    def __init__(self, archivo_json="agenda.json", almacenamiento=None):
         """
         Método constructor que se ejecuta al crear un objeto GestorAgenda.
         
         Parámetros:
         archivo_json: nombre del archivo donde se guardarán los contactos (por defecto "agenda.json").
+        almacenamiento: objeto de almacenamiento a usar; si es None se usa AlmacenamientoJSON(archivo_json).
         
         Lo que hace:
-        1. Guarda el nombre del archivo en un atributo.
-        2. Inicializa una lista vacía que contendrá todos los contactos.
-        3. Llama a 'cargar_contactos' para cargar los contactos existentes del archivo JSON.
+        1. Guarda el nombre del archivo y el almacenamiento en atributos.
+        2. Inicializa el diccionario de contactos y los índices secundarios.
+        3. Llama a 'cargar_contactos' para cargar los contactos guardados.
         """
         self.archivo_json = archivo_json
-        self.contactos = []  # Aquí se guardarán los objetos Contacto
+        self.almacenamiento = almacenamiento if almacenamiento is not None else AlmacenamientoJSON(archivo_json)
+        self.contactos = ContactosPerezosos()  # Contactos indexados por su ID (mantiene el orden de inserción)
+        self.favoritos = set()  # IDs de los contactos favoritos
+        self.por_telefono = None  # Teléfono -> conjunto de IDs con ese teléfono (None hasta que se use)
+        self.por_correo = None  # Correo (en minúsculas) -> conjunto de IDs con ese correo (None hasta que se use)
+        self.indice_texto = None  # Búsqueda por nombre, teléfono o correo (None hasta que se use)
+        self.ordenes = {}  # Orden ("id", "nombre", "favorito") -> IndiceOrdenado (se crean al usarlos)
+        self.secuencia = 0  # Número del último cambio
+        self.secuencia_minima = 0  # Desde este número se conocen todos los cambios uno a uno
+        self.historial = OrderedDict()  # ID -> (secuencia de su último cambio, eliminado), en orden de secuencia
         self.cargar_contactos()  # Carga los contactos guardados previamente
 
+    # ---------------------- ÍNDICES ----------------------
+    def _indexar(self, contacto):
+        """
+        Añade un contacto al diccionario principal y a los índices secundarios.
+        
+        Si falla algún índice se deshace lo añadido y se relanza el error, para que
+        la agenda en memoria no tenga contactos que no llegan a guardarse.
+        """
+        self.contactos[contacto.id_contacto] = contacto
+        try:
+            if contacto.favorito:
+                self.favoritos.add(contacto.id_contacto)
+            for indice in self.ordenes.values():
+                indice.añadir(contacto.id_contacto, contacto.nombre, contacto.favorito)
+            if self.indice_texto is not None:  # Solo si los índices ya se han construido
+                self._indexar_campos(contacto.id_contacto, contacto.nombre, contacto.telefono, contacto.correo)
+        except Exception:
+            self._desindexar(contacto)  # Empieza por el diccionario principal
+            raise
+
+    def _indexar_campos(self, id_contacto, nombre, telefono, correo):
+        """
+        Añade los campos de búsqueda de un contacto a los índices de teléfonos, correos y texto.
+        """
+        self.por_telefono.setdefault(telefono, set()).add(id_contacto)
+        self.por_correo.setdefault(correo.lower(), set()).add(id_contacto)
+        self.indice_texto.añadir_campos(id_contacto, nombre, telefono, correo)
+
+    def _desindexar(self, contacto):
+        """
+        Quita un contacto del diccionario principal y de los índices secundarios.
+        """
+        del self.contactos[contacto.id_contacto]
+        self.favoritos.discard(contacto.id_contacto)
+        for indice in self.ordenes.values():
+            indice.eliminar(contacto.id_contacto, contacto.nombre, contacto.favorito)
+        if self.indice_texto is None:
+            return  # Los índices secundarios aún no existen
+        self.indice_texto.eliminar(contacto.id_contacto)
+        for indice, clave in ((self.por_telefono, contacto.telefono), (self.por_correo, contacto.correo.lower())):
+            ids = indice.get(clave)
+            if ids is not None:
+                ids.discard(contacto.id_contacto)
+                if not ids:
+                    del indice[clave]  # No dejamos entradas vacías en el índice
+
+    def _asegurar_indices(self):
+        """
+        Construye los índices de teléfonos, correos y texto si todavía no existen.
+        
+        Se recorren los datos cargados sin crear objetos Contacto.
+        """
+        if self.indice_texto is not None:
+            return
+        self.por_telefono = {}
+        self.por_correo = {}
+        self.indice_texto = IndiceTexto()
+        for campos in self.contactos.campos():
+            self._indexar_campos(*campos)
+
+    def construir_indices(self):
+        """
+        Construye ya los índices de búsqueda, para que no tenga que hacerlo la primera
+        búsqueda (útil en un servidor, que carga la agenda una vez y atiende muchas peticiones).
+        """
+        self._asegurar_indices()
+
+    def _indice_orden(self, orden):
+        """
+        Devuelve el índice ordenado de un orden, construyéndolo (sin crear objetos Contacto) si no existe.
+        """
+        if orden not in self.ordenes:
+            self.ordenes[orden] = IndiceOrdenado(
+                orden, ((id_contacto, nombre, id_contacto in self.favoritos)
+                        for id_contacto, nombre, _, _ in self.contactos.campos()))
+        return self.ordenes[orden]
+
+    def _vaciar(self):
+        """
+        Deja la agenda y sus índices vacíos.
+        """
+        self.contactos = ContactosPerezosos()
+        self.favoritos = set()
+        self.por_telefono = None
+        self.por_correo = None
+        self.indice_texto = None
+        self.ordenes = {}
+        self.secuencia = 0
+        self.secuencia_minima = 0
+        self.historial = OrderedDict()
+
+    # ---------------------- PERSISTENCIA ----------------------
     def cargar_contactos(self):
         """
-        Carga los contactos desde el archivo JSON.
+        Carga los contactos desde el almacenamiento.
         
         Cómo funciona:
-        1. Intenta abrir el archivo JSON y leer los datos.
-        2. Convierte cada diccionario (cada contacto) en un objeto Contacto usando 'from_dict'.
-        3. Maneja errores:
-           - Si el archivo no existe, se deja la lista vacía.
-           - Si el archivo está corrupto, se avisa y se deja la lista vacía.
-           - Cualquier otro error se muestra en pantalla.
+        1. Pide al almacenamiento la lista de contactos (como diccionarios).
+        2. Guarda cada diccionario en el índice por ID; el objeto Contacto se creará
+           con 'from_dict' la primera vez que se acceda a él.
+        3. Recupera el número de secuencia y los cambios que el almacenamiento aún
+           conoce uno a uno (con JSON, los del diario).
+        4. Si ocurre un error inesperado, lo muestra en pantalla y deja la agenda vacía.
         """
+        self._vaciar()
         try:
-            with open(self.archivo_json, "r", encoding="utf-8") as f:
-                datos = json.load(f)  # Carga los datos del archivo JSON en formato de lista de diccionarios
-                self.contactos = [Contacto.from_dict(c) for c in datos]  # Convierte cada diccionario en un objeto Contacto
-        except FileNotFoundError:
-            # Si el archivo no existe, empezamos con una agenda vacía
-            self.contactos = []
-        except json.JSONDecodeError:
-            # Si el archivo existe pero está corrupto, avisamos y dejamos la agenda vacía
-            print("Error: el archivo JSON está corrupto. Se cargará agenda vacía.")
-            self.contactos = []
+            for c in self.almacenamiento.cargar():
+                self.contactos.guardar_datos(c)
+                if c.get("favorito", False):
+                    self.favoritos.add(c["id_contacto"])
+            self.secuencia = self.almacenamiento.secuencia
+            self.secuencia_minima = self.almacenamiento.secuencia_base
+            for secuencia, operacion, id_contacto, datos in self.almacenamiento.historial:
+                self._anotar(secuencia, operacion, id_contacto, datos["id_contacto"] if datos else id_contacto)
         except Exception as e:
             # Captura cualquier otro error inesperado
             print(f"Ocurrió un error inesperado al cargar contactos: {e}")
-            self.contactos = []
+            self._vaciar()
 
     def guardar_contactos(self):
         """
-        Guarda la lista de contactos en el archivo JSON.
+        Guarda todos los contactos en el almacenamiento.
         
-        Cómo funciona:
-        1. Convierte cada objeto Contacto en un diccionario usando 'to_dict'.
-        2. Escribe la lista de diccionarios en el archivo JSON con formato legible.
-        3. Si ocurre un error al guardar, lo muestra por pantalla.
+        Con AlmacenamientoJSON es la compactación: se reescribe el archivo JSON de forma
+        atómica y se vacía el diario. Si ocurre un error al guardar, lo muestra por pantalla.
         """
         try:
-            with open(self.archivo_json, "w", encoding="utf-8") as f:
-                json.dump([c.to_dict() for c in self.contactos], f, indent=4)
+            self.almacenamiento.guardar(self.contactos.diccionarios(), self.secuencia)
         except Exception as e:
             print(f"No se pudo guardar la agenda: {e}")
 
+    def _registrar(self, operacion, id_contacto, contacto=None):
+        """
+        Guarda un cambio en el almacenamiento (con JSON, una línea en el diario).
+        
+        El cambio recibe el siguiente número de secuencia, salvo que el almacenamiento
+        asigne otro (SQLite lo asigna en la base de datos, compartida con otros procesos).
+        Cuando se acumulan UMBRAL_COMPACTACION cambios pendientes, se compacta con 'guardar_contactos'.
+        
+        Devuelve False si el almacenamiento rechaza el cambio (con SQLite, si otro proceso
+        ya ha añadido un contacto con ese ID o ha eliminado el que se modifica); quien
+        llama debe deshacer el cambio en memoria. Si falla al escribir, avisa y devuelve True.
+        """
+        secuencia = self.secuencia + 1
+        try:
+            secuencia = self.almacenamiento.registrar(operacion, id_contacto, contacto, secuencia)
+        except Exception as e:
+            print(f"No se pudo guardar el cambio: {e}")
+        if secuencia is None:
+            return False
+        self.secuencia = max(self.secuencia, secuencia)
+        self._anotar(secuencia, operacion, id_contacto,
+                     contacto.id_contacto if contacto is not None else id_contacto)
+        if self.almacenamiento.cambios_pendientes >= UMBRAL_COMPACTACION:
+            self.guardar_contactos()
+        return True
+
+    def _anotar(self, secuencia, operacion, id_contacto, id_nuevo):
+        """
+        Apunta en el historial el cambio número 'secuencia' de un contacto.
+        
+        'id_nuevo' es el ID que tiene el contacto después del cambio: si una
+        modificación cambia el ID, el antiguo queda como eliminado.
+        """
+        if operacion == "eliminar" or id_nuevo != id_contacto:
+            self.historial[id_contacto] = (secuencia, True)
+            self.historial.move_to_end(id_contacto)
+        if operacion != "eliminar":
+            self.historial[id_nuevo] = (secuencia, False)
+            self.historial.move_to_end(id_nuevo)
+
     def añadir_contacto(self, contacto):
         """
         Añade un contacto a la agenda.
@@ -80,15 +303,25 @@ class GestorAgenda:
         contacto: objeto de la clase Contacto que se quiere añadir.
         
         Qué hace:
-        1. Añade el contacto a la lista.
-        2. Guarda la lista actualizada en el archivo JSON.
-        3. Captura errores si algo sale mal.
+        1. Comprueba que no exista ya un contacto con el mismo ID.
+        2. Añade el contacto a la agenda y a los índices.
+        3. Guarda el cambio en el diario (una línea, sin reescribir el archivo JSON).
+        4. Devuelve True si se añadió, False si el ID ya existía o hubo un error.
         """
         try:
-            self.contactos.append(contacto)  # Añade el contacto a la lista
-            self.guardar_contactos()  # Guarda los cambios en el archivo
+            if contacto.id_contacto in self.contactos:
+                print(f"Ya existe un contacto con el ID {contacto.id_contacto}.")
+                return False
+            self._indexar(contacto)  # Añade el contacto a la agenda
+            if not self._registrar("añadir", contacto.id_contacto, contacto):  # Guarda el cambio en el diario
+                # Otro proceso ya ha guardado un contacto con ese ID en la base de datos
+                self._desindexar(contacto)
+                print(f"Ya existe un contacto con el ID {contacto.id_contacto}.")
+                return False
+            return True
         except Exception as e:
             print(f"Error al añadir contacto: {e}")
+            return False
 
     def eliminar_contacto(self, id_contacto):
         """
@@ -98,19 +331,18 @@ class GestorAgenda:
         id_contacto: número o cadena que identifica unívocamente al contacto.
         
         Qué hace:
-        1. Comprueba si existe el contacto.
-        2. Lo elimina de la lista si existe.
-        3. Guarda los cambios en el archivo JSON.
+        1. Comprueba si existe el contacto (acceso directo por ID).
+        2. Lo elimina de la agenda y de los índices si existe.
+        3. Guarda el cambio en el diario.
         4. Devuelve True si se eliminó, False si no se encontró.
         """
         try:
-            original = len(self.contactos)  # Guarda el número original de contactos
-            # Filtra todos los contactos que NO tengan el ID especificado
-            self.contactos = [c for c in self.contactos if c.id_contacto != id_contacto]
-            if len(self.contactos) < original:  # Si la lista se redujo, significa que se eliminó un contacto
-                self.guardar_contactos()
-                return True
-            return False
+            contacto = self._obtener(id_contacto)
+            if contacto is None:
+                return False
+            self._desindexar(contacto)
+            self._registrar("eliminar", id_contacto)
+            return True
         except Exception as e:
             print(f"Error al eliminar contacto: {e}")
             return False
@@ -125,17 +357,30 @@ class GestorAgenda:
         
         Qué hace:
         1. Busca el contacto por ID.
-        2. Reemplaza sus datos por los nuevos.
-        3. Guarda los cambios en el archivo JSON.
+        2. Reemplaza sus datos por los nuevos y actualiza los índices.
+        3. Guarda el cambio en el diario.
         4. Devuelve True si se modificó, False si no se encontró.
         """
         try:
-            for i, c in enumerate(self.contactos):
-                if c.id_contacto == id_contacto:
-                    self.contactos[i] = nuevos_datos
-                    self.guardar_contactos()
-                    return True
-            return False
+            actual = self._obtener(id_contacto)
+            if actual is None:
+                return False
+            if nuevos_datos.id_contacto != id_contacto and nuevos_datos.id_contacto in self.contactos:
+                print(f"Ya existe un contacto con el ID {nuevos_datos.id_contacto}.")
+                return False
+            self._desindexar(actual)
+            try:
+                self._indexar(nuevos_datos)
+            except Exception:
+                self._indexar(actual)  # El contacto se queda como estaba
+                raise
+            if not self._registrar("modificar", id_contacto, nuevos_datos):
+                # En la base de datos ya hay otro contacto con el ID nuevo o ya no está el actual
+                self._desindexar(nuevos_datos)
+                self._indexar(actual)
+                print(f"No se pudo modificar el contacto {id_contacto}: ha cambiado en la base de datos.")
+                return False
+            return True
         except Exception as e:
             print(f"Error al modificar contacto: {e}")
             return False
@@ -152,30 +397,51 @@ class GestorAgenda:
         - None si no existe.
         """
         try:
-            for c in self.contactos:
-                if c.id_contacto == id_contacto:
-                    return c
-            return None
+            return self._obtener(id_contacto)
         except Exception as e:
             print(f"Error al buscar contacto: {e}")
             return None
 
-    def buscar_contactos_por_texto(self, texto):
+    def _obtener(self, id_contacto):
+        """
+        Devuelve el contacto con ese ID, o None si no existe.
+        
+        Si no está en memoria y el almacenamiento sabe buscar por ID (SQLite), se
+        busca allí: puede haberlo añadido otro proceso que usa la misma base de datos.
+        En ese caso se incorpora a la agenda en memoria.
+        """
+        contacto = self.contactos.get(id_contacto)  # Acceso directo por ID
+        obtener = getattr(self.almacenamiento, "obtener", None)
+        if contacto is None and obtener is not None:
+            datos = obtener(id_contacto)
+            if datos is not None:
+                contacto = Contacto.from_dict(datos, validar=False)
+                self._indexar(contacto)  # Ya está guardado: no se registra el cambio
+        return contacto
+
+    def buscar_contactos_por_texto(self, texto, limite=None):
         """
         Busca contactos que contengan un texto en su nombre, teléfono o correo.
         
+        No distingue mayúsculas ni acentos y no recorre toda la agenda en cada búsqueda:
+        si el almacenamiento sabe buscar texto (SQLite con FTS5) se busca en él, y si
+        no, en el índice de trigramas en memoria.
+        
         Parámetros:
         texto: palabra o frase que queremos buscar.
+        limite: número máximo de contactos a devolver (None: todos).
         
         Qué devuelve:
-        - Lista de contactos que coinciden con el texto.
+        - Lista de contactos que coinciden con el texto, los más relevantes primero
+          (coincidencia exacta, después prefijo, inicio de palabra y subcadena).
         """
         try:
-            texto = texto.lower()  # Convierte el texto a minúsculas para búsqueda sin distinción de mayúsculas
-            return [
-                c for c in self.contactos
-                if texto in c.nombre.lower() or texto in c.telefono.lower() or texto in c.correo.lower()
-            ]
+            buscar_texto = getattr(self.almacenamiento, "buscar_texto", None)
+            if buscar_texto is not None:
+                contactos = (self._obtener(i) for i in buscar_texto(texto, limite))
+                return [c for c in contactos if c is not None]
+            self._asegurar_indices()
+            return [self.contactos[i] for i in self.indice_texto.buscar(texto, limite)]
         except Exception as e:
             print(f"Error al buscar contactos: {e}")
             return []
@@ -186,7 +452,47 @@ class GestorAgenda:
         
         Útil para mostrar todos los contactos en pantalla.
         """
-        return self.contactos
+        return list(self.contactos.values())
+
+    def listar_contactos_pagina(self, pagina=1, tamano=20, orden="id", descendente=False):
+        """
+        Devuelve una página de contactos ordenados.
+        
+        Parámetros:
+        pagina: número de página, empezando en 1.
+        tamano: contactos por página.
+        orden: "id", "nombre" o "favorito" (primero los favoritos y después por nombre).
+        descendente: True para invertir el orden.
+        
+        Los índices ordenados se mantienen al añadir, modificar o eliminar contactos,
+        así que cada página cuesta lo que su tamaño y no hay que ordenar toda la agenda.
+        Lanza ValueError si el orden no existe.
+        
+        Qué devuelve:
+        - Tupla (lista de contactos de la página, número total de contactos).
+        """
+        indice = self._indice_orden(orden)
+        return [self.contactos[i] for i in indice.pagina(pagina, tamano, descendente)], len(indice)
+
+    def buscar_contactos_por_telefono(self, telefono):
+        """
+        Devuelve la lista de contactos con exactamente ese teléfono (usa el índice de teléfonos).
+        """
+        self._asegurar_indices()
+        return [self.contactos[i] for i in self.por_telefono.get(telefono, ())]
+
+    def buscar_contactos_por_correo(self, correo):
+        """
+        Devuelve la lista de contactos con ese correo, sin distinguir mayúsculas (usa el índice de correos).
+        """
+        self._asegurar_indices()
+        return [self.contactos[i] for i in self.por_correo.get(correo.lower(), ())]
+
+    def listar_favoritos(self):
+        """
+        Devuelve la lista de contactos marcados como favoritos (usa el índice de favoritos).
+        """
+        return [self.contactos[i] for i in self.favoritos]
 
     # ---------------------- MÉTODOS DE FAVORITOS ----------------------
     def marcar_favorito(self, id_contacto):
@@ -202,8 +508,8 @@ class GestorAgenda:
         """
         contacto = self.buscar_contacto_por_id(id_contacto)
         if contacto:
-            contacto.marcar_favorito()  # Llama al método de Contacto para marcar como favorito
-            self.guardar_contactos()
+            self._cambiar_favorito(contacto, True)
+            self._registrar("favorito", id_contacto)
             return True
         return False
 
@@ -220,7 +526,263 @@ class GestorAgenda:
         """
         contacto = self.buscar_contacto_por_id(id_contacto)
         if contacto:
-            contacto.desmarcar_favorito()  # Llama al método de Contacto para quitar el favorito
-            self.guardar_contactos()
+            self._cambiar_favorito(contacto, False)
+            self._registrar("no_favorito", id_contacto)
             return True
         return False
+
+    def _cambiar_favorito(self, contacto, favorito):
+        """
+        Marca o desmarca un contacto como favorito y actualiza los índices que dependen de ello.
+        """
+        for indice in self.ordenes.values():
+            indice.eliminar(contacto.id_contacto, contacto.nombre, contacto.favorito)
+        if favorito:
+            contacto.marcar_favorito()  # Llama al método de Contacto para marcar como favorito
+            self.favoritos.add(contacto.id_contacto)
+        else:
+            contacto.desmarcar_favorito()  # Llama al método de Contacto para quitar el favorito
+            self.favoritos.discard(contacto.id_contacto)
+        for indice in self.ordenes.values():
+            indice.añadir(contacto.id_contacto, contacto.nombre, contacto.favorito)
+
+    # ---------------------- DUPLICADOS ----------------------
+    def buscar_duplicados(self):
+        """
+        Busca grupos de contactos que pueden ser el mismo (mismo teléfono, mismo correo
+        o nombre que suena igual). Ver 'duplicados_agenda.buscar_grupos'.
+        
+        Son solo candidatos para revisar: un grupo puede juntar a personas distintas
+        que comparten un teléfono. Para fusionar, usar 'grupos_fusionables'.
+        
+        Qué devuelve:
+        - Lista de grupos de IDs; en cada grupo, primero el contacto más antiguo.
+        """
+        return buscar_grupos(self.contactos.campos())
+
+    def grupos_fusionables(self, grupos=None):
+        """
+        Comprueba par a par los grupos de candidatos y devuelve los que se pueden fusionar.
+        
+        Parámetros:
+        grupos: grupos de candidatos; si es None se usan los de 'buscar_duplicados'.
+        
+        Qué devuelve:
+        - Lista de grupos de IDs en los que cada par de contactos tiene el mismo teléfono
+          o correo y nombres parecidos (ver 'duplicados_agenda.dividir_grupo');
+          en cada grupo, primero el contacto más antiguo.
+        """
+        if grupos is None:
+            grupos = self.buscar_duplicados()
+        fusionables = []
+        for grupo in grupos:
+            contactos = [self.contactos.get(i) for i in grupo]
+            campos = {c.id_contacto: (c.nombre, c.telefono, c.correo) for c in contactos if c is not None}
+            fusionables.extend(dividir_grupo([i for i in grupo if i in campos], campos))
+        return fusionables
+
+    def fusionar_contactos(self, id_principal, ids_duplicados):
+        """
+        Fusiona varios contactos en uno.
+        
+        Parámetros:
+        id_principal: ID del contacto que se conserva.
+        ids_duplicados: IDs de los contactos que se fusionan con él y se eliminan.
+        
+        Qué hace:
+        1. Los campos vacíos del contacto principal se rellenan con los de los duplicados.
+        2. Las notas distintas se juntan y el resultado es favorito si alguno lo era.
+        3. Elimina los duplicados y guarda los cambios en el diario.
+        4. Devuelve True si se fusionaron, False si algún contacto no existe.
+        """
+        try:
+            principal = self.contactos.get(id_principal)
+            duplicados = [self.contactos.get(i) for i in ids_duplicados if i != id_principal]
+            if principal is None or None in duplicados:
+                return False
+            fusionado = Contacto.from_dict(principal.to_dict(), validar=False)  # Copia del principal
+            notas = [fusionado.notas] if fusionado.notas else []
+            for duplicado in duplicados:
+                for campo in ("nombre", "telefono", "direccion", "correo"):
+                    if not getattr(fusionado, campo):
+                        setattr(fusionado, campo, getattr(duplicado, campo))
+                if duplicado.notas and duplicado.notas not in notas:
+                    notas.append(duplicado.notas)
+                fusionado.favorito = fusionado.favorito or duplicado.favorito
+            fusionado.notas = "\n".join(notas)
+            for duplicado in duplicados:
+                self._desindexar(duplicado)
+                self._registrar("eliminar", duplicado.id_contacto)
+            self._desindexar(principal)
+            self._indexar(fusionado)
+            self._registrar("modificar", id_principal, fusionado)
+            return True
+        except Exception as e:
+            print(f"Error al fusionar contactos: {e}")
+            return False
+
+    def fusionar_duplicados(self, confirmar):
+        """
+        Tarea por lotes: busca los grupos de duplicados de toda la agenda y fusiona
+        en su contacto más antiguo cada grupo que se confirme.
+        
+        Parámetros:
+        confirmar: función que recibe un grupo (lista de IDs, el primero es el que se
+        conserva) y devuelve True si se debe fusionar. Solo se le pasan los grupos de
+        'grupos_fusionables'; nada se elimina sin su confirmación.
+        
+        Qué devuelve:
+        - El número de contactos eliminados al fusionar.
+        """
+        eliminados = 0
+        for grupo in self.grupos_fusionables():
+            principal, *duplicados = grupo
+            if confirmar(grupo) and self.fusionar_contactos(principal, duplicados):
+                eliminados += len(duplicados)
+        return eliminados
+
+    # ---------------------- IMPORTACIÓN Y EXPORTACIÓN ----------------------
+    def importar_contactos(self, contactos, tamano_lote=TAMANO_LOTE_IMPORTACION):
+        """
+        Añade muchos contactos de una vez (por ejemplo, los de 'formatos_agenda.leer_contactos').
+        
+        Parámetros:
+        contactos: iterable de objetos Contacto o de diccionarios con sus campos.
+        tamano_lote: número de contactos que se validan juntos antes de añadirlos.
+        
+        Qué hace:
+        1. Recorre los contactos por lotes; en cada lote primero convierte y valida
+           todos los contactos y después añade los válidos a la agenda y a los índices.
+        2. Guarda los cambios de cada lote juntos, con una sola escritura
+           ('registrar_varios'); con JSON, al terminar se compacta el diario si ha crecido.
+        3. Los contactos cuyo ID ya existe (en la agenda o antes en la importación)
+           no se añaden y se informa de ellos.
+        
+        Qué devuelve:
+        - Un diccionario con "importados" (número de contactos añadidos), "duplicados"
+          (lista de IDs repetidos) e "invalidos" (lista de (posición, error), contando desde 1).
+        """
+        resultado = {"importados": 0, "duplicados": [], "invalidos": []}
+        lote = []
+        try:
+            for posicion, registro in enumerate(contactos, start=1):
+                lote.append((posicion, registro))
+                if len(lote) == tamano_lote:
+                    self._importar_lote(lote, resultado)
+                    lote = []
+            self._importar_lote(lote, resultado)
+        except Exception as e:
+            print(f"Error al importar contactos: {e}")
+        finally:
+            if self.almacenamiento.cambios_pendientes >= UMBRAL_COMPACTACION:
+                self.guardar_contactos()  # Una única compactación para toda la importación
+        return resultado
+
+    def _importar_lote(self, lote, resultado):
+        """
+        Valida un lote de contactos y añade a la agenda los válidos con ID nuevo.
+        """
+        validos = []
+        for posicion, registro in lote:
+            try:
+                contacto = registro if isinstance(registro, Contacto) else Contacto.from_dict(registro)
+            except KeyError as e:
+                resultado["invalidos"].append((posicion, f"falta el campo {e}"))
+                continue
+            except (TypeError, ValueError) as e:
+                resultado["invalidos"].append((posicion, str(e)))
+                continue
+            validos.append(contacto)
+        nuevos = []
+        try:
+            for contacto in validos:
+                if contacto.id_contacto in self.contactos:
+                    resultado["duplicados"].append(contacto.id_contacto)
+                    continue
+                self._indexar(contacto)
+                nuevos.append(contacto)
+            numeros = []
+            if nuevos:
+                # El almacenamiento devuelve los números que ha usado (SQLite asigna los suyos)
+                numeros = self.almacenamiento.registrar_varios(
+                    [("añadir", contacto.id_contacto, contacto.to_dict(), secuencia)
+                     for secuencia, contacto in enumerate(nuevos, start=self.secuencia + 1)])
+        except Exception:
+            # Si no se puede indexar o guardar el lote, ninguno de sus contactos se queda en memoria
+            for contacto in nuevos:
+                self._desindexar(contacto)
+            raise
+        for secuencia, contacto in zip(numeros, nuevos):
+            if secuencia is None:
+                # El almacenamiento lo ha rechazado: otro proceso ya ha guardado ese ID
+                self._desindexar(contacto)
+                resultado["duplicados"].append(contacto.id_contacto)
+                continue
+            self.secuencia = max(self.secuencia, secuencia)
+            self._anotar(secuencia, "añadir", contacto.id_contacto, contacto.id_contacto)
+            resultado["importados"] += 1
+
+    def exportar_contactos(self, ruta, formato=None):
+        """
+        Guarda todos los contactos en un archivo CSV, JSON o vCard.
+        
+        Parámetros:
+        ruta: archivo de destino.
+        formato: "csv", "json" o "vcard"; si es None se deduce de la extensión
+        (.csv, .json, .vcf o .vcard).
+        
+        Los contactos se escriben según se recorren (sin crear objetos Contacto
+        para los que aún no se han usado) y con una única escritura a disco.
+        
+        Qué devuelve:
+        - El número de contactos exportados, o None si hubo un error.
+        """
+        try:
+            return escribir_contactos(ruta, self.contactos.diccionarios(), formato)
+        except Exception as e:
+            print(f"Error al exportar contactos: {e}")
+            return None
+
+    # ---------------------- CAMBIOS ----------------------
+    def cambios_desde(self, secuencia):
+        """
+        Devuelve los contactos que han cambiado después del cambio número 'secuencia'.
+        
+        Parámetros:
+        secuencia: último número de secuencia que conoce quien pregunta (0 la primera vez).
+        
+        Qué hace:
+        1. Recorre el historial desde el final hasta llegar a 'secuencia', así el
+           coste depende de los cambios pedidos y no del tamaño de la agenda.
+        2. Si un contacto cambió varias veces, solo aparece su último estado.
+        3. Si esos cambios ya no se conocen uno a uno (por ejemplo, se compactaron
+           antes de arrancar) o 'secuencia' es mayor que la actual, devuelve la agenda
+           completa y marca "reinicio": quien pregunta debe descartar su copia.
+        
+        Qué devuelve:
+        - Un diccionario con "secuencia" (la actual, para la próxima llamada), "reinicio"
+          y "cambios": lista, en orden de secuencia, de diccionarios con "secuencia",
+          "id_contacto" y "contacto" (el contacto como diccionario, o None si se eliminó).
+        
+        Si el almacenamiento tiene su propio registro de cambios (SQLite), se le pregunta
+        a él: así también aparecen los cambios que han hecho otros procesos.
+        """
+        cambios_almacenamiento = getattr(self.almacenamiento, "cambios_desde", None)
+        if cambios_almacenamiento is not None:
+            return cambios_almacenamiento(secuencia)
+        if secuencia < self.secuencia_minima or secuencia > self.secuencia:
+            cambios = [
+                {"secuencia": self.historial.get(c["id_contacto"], (self.secuencia_minima,))[0],
+                 "id_contacto": c["id_contacto"], "contacto": c}
+                for c in self.contactos.diccionarios()
+            ]
+            return {"secuencia": self.secuencia, "reinicio": True, "cambios": cambios}
+        cambios = []
+        for id_contacto, (numero, eliminado) in reversed(self.historial.items()):
+            if numero <= secuencia:
+                break
+            contacto = None if eliminado else self.contactos.get(id_contacto)
+            cambios.append({"secuencia": numero, "id_contacto": id_contacto,
+                            "contacto": contacto.to_dict() if contacto is not None else None})
+        cambios.reverse()
+        return {"secuencia": self.secuencia, "reinicio": False, "cambios": cambios}
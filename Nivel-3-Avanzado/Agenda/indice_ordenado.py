@@ -0,0 +1,74 @@
+from bisect import bisect_left, insort
+
+from indice_texto import normalizar
+
+
+def clave_id(id_contacto):
+    """
+    Clave para ordenar IDs: los numéricos por su valor (2 antes que 10) y delante de los demás.
+
+    Incluye el tipo del ID para que 7 y "7" tengan claves distintas y nunca haya que comparar un número con un texto.
+    """
+    texto = str(id_contacto)
+    if texto.isascii() and texto.isdecimal():  # Solo 0-9: isdigit() también acepta "²", que int() no convierte
+        return (0, int(texto), "", type(id_contacto).__name__)
+    return (1, 0, texto, type(id_contacto).__name__)
+
+
+# Orden -> función que da la clave de orden a partir de (ID, nombre, favorito)
+CLAVES_ORDEN = {
+    "id": lambda id_contacto, nombre, favorito: (),
+    "nombre": lambda id_contacto, nombre, favorito: (normalizar(nombre),),
+    "favorito": lambda id_contacto, nombre, favorito: (not favorito, normalizar(nombre)),  # Favoritos primero
+}
+
+
+class IndiceOrdenado:
+    """
+    Lista de IDs de contacto mantenida siempre ordenada con 'bisect'.
+
+    Añadir o quitar un contacto cuesta una búsqueda binaria más el desplazamiento
+    de la lista (muy rápido), y obtener una página cuesta lo que el tamaño de la
+    página, sin reordenar la agenda en cada listado.
+    """
+
+    def __init__(self, orden, contactos=()):
+        """
+        Crea el índice para un orden de CLAVES_ORDEN a partir de tuplas (ID, nombre, favorito).
+        """
+        if orden not in CLAVES_ORDEN:
+            raise ValueError(f"Orden no válido: {orden} (usa {', '.join(CLAVES_ORDEN)})")
+        self.clave = CLAVES_ORDEN[orden]
+        self.entradas = sorted(self._entrada(*c) for c in contactos)  # (clave..., clave del ID, ID)
+
+    def _entrada(self, id_contacto, nombre, favorito):
+        # A igualdad de clave se ordena por ID, así cada entrada es única
+        return (*self.clave(id_contacto, nombre, favorito), clave_id(id_contacto), id_contacto)
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def añadir(self, id_contacto, nombre, favorito):
+        """
+        Inserta un contacto en su posición.
+        """
+        insort(self.entradas, self._entrada(id_contacto, nombre, favorito))
+
+    def eliminar(self, id_contacto, nombre, favorito):
+        """
+        Quita un contacto (hay que pasar los mismos datos con los que se añadió).
+        """
+        entrada = self._entrada(id_contacto, nombre, favorito)
+        posicion = bisect_left(self.entradas, entrada)
+        if posicion < len(self.entradas) and self.entradas[posicion] == entrada:
+            del self.entradas[posicion]
+
+    def pagina(self, numero, tamano, descendente=False):
+        """
+        Devuelve los IDs de la página 'numero' (empezando en 1) de 'tamano' contactos.
+        """
+        inicio = (numero - 1) * tamano
+        if not descendente:
+            return [entrada[-1] for entrada in self.entradas[inicio:inicio + tamano]]
+        fin = len(self.entradas) - inicio
+        return [entrada[-1] for entrada in reversed(self.entradas[max(fin - tamano, 0):max(fin, 0)])]
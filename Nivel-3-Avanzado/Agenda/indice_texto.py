@@ -0,0 +1,148 @@
+import heapq
+import unicodedata
+from itertools import islice
+
+
+def normalizar(texto):
+    """
+    Normaliza un texto para buscar sin distinguir mayúsculas ni acentos.
+
+    Ejemplo: "María Ñúñez" -> "maria nunez"
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return sin_acentos.casefold()
+
+
+class IndiceTexto:
+    """
+    Índice invertido de trigramas sobre el nombre, el teléfono y el correo de los contactos.
+
+    Permite buscar por subcadena sin recorrer toda la agenda:
+    - Textos de 3 o más caracteres: se cruzan los trigramas del texto y solo se comprueban esos candidatos.
+    - Textos de 1 o 2 caracteres: un trigrama "de borde" (el texto precedido de MARCA_BORDE)
+      da los contactos con algún campo o palabra que empieza por él. Si hacen falta más
+      resultados, se recorren los demás contactos buscando la subcadena hasta completar el límite.
+
+    Los resultados se ordenan por relevancia (coincidencia exacta, prefijo,
+    inicio de palabra y subcadena; a igualdad, primero las del nombre).
+    """
+
+    N = 3  # Longitud de los n-gramas indexados
+    MARCA_BORDE = "\x00"  # Carácter que marca el inicio de un campo o de una palabra (no aparece en los textos)
+
+    def __init__(self):
+        self.campos = {}  # ID -> tupla de campos normalizados (nombre, teléfono, correo)
+        self.ngramas = {}  # Trigrama -> conjunto de IDs que lo contienen
+
+    @classmethod
+    def _ngramas_de(cls, texto):
+        """
+        Devuelve los trigramas de un texto, más un trigrama de borde por cada inicio de
+        palabra y longitud de 1 o 2 caracteres (MARCA_BORDE delante hasta completar 3).
+        """
+        ngramas = {texto[i:i + cls.N] for i in range(len(texto) - cls.N + 1)}
+        for palabra in texto.split(" "):
+            for n in range(1, cls.N):
+                if len(palabra) >= n:
+                    ngramas.add(cls.MARCA_BORDE * (cls.N - n) + palabra[:n])
+        return ngramas
+
+    def añadir(self, contacto):
+        """
+        Indexa los campos de búsqueda de un contacto.
+        """
+        self.añadir_campos(contacto.id_contacto, contacto.nombre, contacto.telefono, contacto.correo)
+
+    def añadir_campos(self, id_contacto, nombre, telefono, correo):
+        """
+        Indexa los campos de búsqueda de un contacto dados por separado.
+        """
+        campos = (normalizar(nombre), normalizar(telefono), normalizar(correo))
+        self.campos[id_contacto] = campos
+        for ngrama in set().union(*(self._ngramas_de(campo) for campo in campos)):
+            self.ngramas.setdefault(ngrama, set()).add(id_contacto)
+
+    def eliminar(self, id_contacto):
+        """
+        Quita un contacto del índice (si estaba).
+        """
+        campos = self.campos.pop(id_contacto, None)
+        if campos is None:
+            return
+        for ngrama in set().union(*(self._ngramas_de(campo) for campo in campos)):
+            ids = self.ngramas.get(ngrama)
+            if ids is not None:
+                ids.discard(id_contacto)
+                if not ids:
+                    del self.ngramas[ngrama]
+
+    @staticmethod
+    def _puntuacion(campos, texto):
+        """
+        Relevancia de un contacto para un texto: cuanto mayor, mejor. 0 si no coincide.
+        """
+        mejor = 0
+        inicio_palabra = " " + texto
+        for prioridad, campo in zip((3, 2, 1), campos):  # El nombre pesa más que el teléfono y el correo
+            if texto not in campo:  # El caso más frecuente: se descarta con una sola búsqueda
+                continue
+            if campo == texto:
+                nivel = 4
+            elif campo.startswith(texto):
+                nivel = 3
+            elif inicio_palabra in campo:  # Empieza alguna palabra
+                nivel = 2
+            else:
+                nivel = 1
+            mejor = max(mejor, nivel * 10 + prioridad)
+        return mejor
+
+    def _ordenar(self, candidatos, texto, limite):
+        """
+        Puntúa los candidatos y devuelve los 'limite' mejores IDs (todos si limite es None).
+        """
+        puntuados = []
+        for id_contacto in candidatos:
+            campos = self.campos[id_contacto]
+            puntuacion = self._puntuacion(campos, texto)
+            if puntuacion:  # Los trigramas solo dan candidatos: hay que confirmar
+                # A igualdad de puntuación y nombre, por ID (como texto y tipo: 7 y "7" no se comparan)
+                puntuados.append((-puntuacion, campos[0], str(id_contacto), type(id_contacto).__name__, id_contacto))
+        mejores = sorted(puntuados) if limite is None else heapq.nsmallest(limite, puntuados)
+        return [entrada[-1] for entrada in mejores]
+
+    def buscar(self, texto, limite=None):
+        """
+        Busca los contactos cuyo nombre, teléfono o correo contienen el texto.
+
+        Args:
+            texto : Texto a buscar.
+            limite : Número máximo de IDs a devolver (None: todos).
+
+        Returns:
+            Lista de IDs ordenada por relevancia. Con texto vacío, todos los IDs.
+            Con textos de 1 o 2 caracteres, las coincidencias que no empiezan un
+            campo ni una palabra van al final en el orden de la agenda.
+        """
+        texto = normalizar(texto)
+        if not texto:
+            return list(islice(self.campos, limite))
+
+        if len(texto) >= self.N:
+            trigramas = {texto[i:i + self.N] for i in range(len(texto) - self.N + 1)}
+            # Empezamos por el trigrama menos frecuente para que la intersección sea pequeña
+            listas = sorted((self.ngramas.get(t, set()) for t in trigramas), key=len)
+            return self._ordenar(set(listas[0]).intersection(*listas[1:]), texto, limite)
+
+        inicios = self.ngramas.get(self.MARCA_BORDE * (self.N - len(texto)) + texto, set())
+        resultado = self._ordenar(inicios, texto, limite)
+        if limite is not None and len(resultado) >= limite:
+            return resultado
+        # Recorrido acotado: solo hasta completar el límite con las demás subcadenas
+        for id_contacto, campos in self.campos.items():
+            if id_contacto not in inicios and any(texto in campo for campo in campos):
+                resultado.append(id_contacto)
+                if limite is not None and len(resultado) >= limite:
+                    break
+        return resultado
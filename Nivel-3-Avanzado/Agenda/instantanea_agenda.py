@@ -0,0 +1,152 @@
+import mmap
+import struct
+
+
+# Formato binario de la agenda completa (la "instantánea"), todo en little-endian:
+#
+#   cabecera   CABECERA
+#   registros  un REGISTRO de tamaño fijo por contacto: los índices de sus 6 textos
+#              en la tabla de cadenas y un byte de banderas
+#   tabla      (cadenas + 1) desplazamientos uint32 dentro de los datos de cadenas
+#   datos      las cadenas en UTF-8, una detrás de otra y sin repetir
+#
+# Como los registros tienen tamaño fijo, el contacto i está en
+# posicion_registros + i * REGISTRO.size y se puede leer sin leer los demás.
+
+MAGIA = b"AGDB"
+VERSION = 1
+# magia, versión, reservado, nº de contactos, nº de cadenas, posición de los registros, posición de la tabla
+CABECERA = struct.Struct("<4sHHIIQQ")
+REGISTRO = struct.Struct("<6IB3x")  # 6 índices de cadena + banderas (+ relleno hasta 28 bytes)
+DESPLAZAMIENTO = struct.Struct("<I")
+
+CAMPOS_TEXTO = ("id_contacto", "nombre", "telefono", "direccion", "correo", "notas")
+BANDERA_FAVORITO = 1
+BANDERA_ID_ENTERO = 2  # El ID era un número entero (se guarda como texto)
+
+
+def escribir_instantanea(f, datos):
+    """
+    Escribe los contactos (diccionarios) en formato binario en el archivo f (abierto en modo binario).
+
+    Devuelve el número de contactos escritos. Lanza ValueError si las cadenas ocupan más de 4 GiB.
+    """
+    indices = {}  # Cadena -> índice en la tabla (cada texto repetido se guarda una sola vez)
+    cadenas = []
+    registros = bytearray()
+    for d in datos:
+        banderas = BANDERA_FAVORITO if d.get("favorito", False) else 0
+        if isinstance(d["id_contacto"], int) and not isinstance(d["id_contacto"], bool):
+            banderas |= BANDERA_ID_ENTERO
+        numeros = []
+        for campo in CAMPOS_TEXTO:
+            valor = str(d.get(campo, ""))
+            numero = indices.get(valor)
+            if numero is None:
+                numero = indices[valor] = len(cadenas)
+                cadenas.append(valor.encode("utf-8"))
+            numeros.append(numero)
+        registros += REGISTRO.pack(*numeros, banderas)
+
+    desplazamientos = [0]
+    for cadena in cadenas:
+        desplazamientos.append(desplazamientos[-1] + len(cadena))
+    if desplazamientos[-1] > 0xFFFFFFFF:
+        raise ValueError("Las cadenas de la agenda no caben en una instantánea binaria (más de 4 GiB)")
+
+    contactos = len(registros) // REGISTRO.size
+    f.write(CABECERA.pack(MAGIA, VERSION, 0, contactos, len(cadenas),
+                          CABECERA.size, CABECERA.size + len(registros)))
+    f.write(registros)
+    f.write(struct.pack(f"<{len(desplazamientos)}I", *desplazamientos))
+    f.write(b"".join(cadenas))
+    return contactos
+
+
+class InstantaneaBinaria:
+    """
+    Lectura de una instantánea binaria a través de mmap.
+
+    - 'contacto(i)' lee solo el registro i y sus cadenas (acceso aleatorio, sin cargar el resto).
+    - Recorrer la instantánea devuelve todos los contactos, decodificando cada cadena una sola vez.
+
+    Lanza ValueError si el archivo no es una instantánea válida.
+    """
+
+    def __init__(self, ruta):
+        self._archivo = open(ruta, "rb")
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise ValueError(f"{ruta} está vacío")
+        try:
+            (magia, version, _, self.contactos, self.cadenas,
+             self._registros, self._tabla) = CABECERA.unpack_from(self._mapa, 0)
+            if magia != MAGIA or version != VERSION:
+                raise ValueError(f"{ruta} no es una instantánea de la agenda (versión {VERSION})")
+            self._datos = self._tabla + (self.cadenas + 1) * DESPLAZAMIENTO.size
+            if (self._tabla != self._registros + self.contactos * REGISTRO.size
+                    or len(self._mapa) < self._datos
+                    or len(self._mapa) != self._datos + DESPLAZAMIENTO.unpack_from(self._mapa, self._datos - 4)[0]):
+                raise ValueError(f"{ruta} está incompleto o dañado")
+        except (struct.error, ValueError) as e:
+            self.cerrar()
+            raise ValueError(str(e)) from e
+
+    def __len__(self):
+        return self.contactos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        self._mapa.close()
+        self._archivo.close()
+
+    @staticmethod
+    def _a_diccionario(valores, banderas):
+        datos = dict(zip(CAMPOS_TEXTO, valores))
+        if banderas & BANDERA_ID_ENTERO:
+            datos["id_contacto"] = int(datos["id_contacto"])
+        datos["favorito"] = bool(banderas & BANDERA_FAVORITO)
+        return datos
+
+    def cadena(self, numero):
+        """
+        Devuelve la cadena número 'numero' de la tabla.
+        """
+        inicio = self._datos + DESPLAZAMIENTO.unpack_from(self._mapa, self._tabla + numero * DESPLAZAMIENTO.size)[0]
+        fin = self._datos + DESPLAZAMIENTO.unpack_from(self._mapa, self._tabla + (numero + 1) * DESPLAZAMIENTO.size)[0]
+        return self._mapa[inicio:fin].decode("utf-8")
+
+    def contacto(self, posicion):
+        """
+        Devuelve como diccionario el contacto que ocupa la posición indicada (desde 0).
+        """
+        if not 0 <= posicion < self.contactos:
+            raise IndexError(f"No hay contacto en la posición {posicion}")
+        *numeros, banderas = REGISTRO.unpack_from(self._mapa, self._registros + posicion * REGISTRO.size)
+        return self._a_diccionario([self.cadena(n) for n in numeros], banderas)
+
+    def __iter__(self):
+        desplazamientos = struct.unpack_from(f"<{self.cadenas + 1}I", self._mapa, self._tabla)
+        datos = self._mapa[self._datos:]
+        # Cada cadena se decodifica una vez y la comparten todos los contactos que la usan
+        cadenas = [datos[inicio:fin].decode("utf-8") for inicio, fin in zip(desplazamientos, desplazamientos[1:])]
+        registros = REGISTRO.iter_unpack(self._mapa[self._registros:self._tabla])
+        # El diccionario se monta a mano (sin '_a_diccionario'): es el bucle que más se repite al cargar
+        for id_contacto, nombre, telefono, direccion, correo, notas, banderas in registros:
+            id_contacto = cadenas[id_contacto]
+            yield {
+                "id_contacto": int(id_contacto) if banderas & BANDERA_ID_ENTERO else id_contacto,
+                "nombre": cadenas[nombre],
+                "telefono": cadenas[telefono],
+                "direccion": cadenas[direccion],
+                "correo": cadenas[correo],
+                "notas": cadenas[notas],
+                "favorito": bool(banderas & BANDERA_FAVORITO),
+            }
@@ -1,5 +1,10 @@
-# Importamos la clase Contacto y el gestor de la agenda
+import argparse
+import sys
+
+# Importamos la clase Contacto, el gestor de la agenda y el almacenamiento SQLite
+from almacenamiento_agenda import AlmacenamientoBinario, AlmacenamientoSQLite
 from contacto_agenda import Contacto
+from formatos_agenda import leer_contactos
 from gestor_agenda import GestorAgenda
 
 # Función para pedir todos los datos necesarios para crear un contacto
@@ -27,6 +32,14 @@ def pedir_datos_contacto():
         print(f"Error al introducir los datos: {e}")
         return None
 
+TAMANO_PAGINA = 20  # Contactos por página al listar
+
+# Muestra varios contactos separados por una línea, con una sola escritura en pantalla
+def mostrar_contactos(contactos):
+    separador = "\n" + "-" * 20 + "\n"  # Separador visual entre contactos
+    sys.stdout.write(separador.join(c.como_texto() for c in contactos) + separador)
+    sys.stdout.flush()
+
 # Función que muestra el menú principal y devuelve la opción elegida por el usuario
 def mostrar_menu():
     print("\n--- AGENDA ELECTRÓNICA ---")
@@ -38,13 +51,78 @@ def mostrar_menu():
     print("6. Buscar contactos por texto")
     print("7. Marcar contacto como favorito")
     print("8. Desmarcar contacto como favorito")
-    print("9. Salir")
+    print("9. Importar contactos (CSV, JSON o vCard)")
+    print("10. Exportar contactos (CSV, JSON o vCard)")
+    print("11. Salir")
     return input("Elige una opción: ")
 
+# Lee los argumentos de la línea de órdenes
+def leer_argumentos():
+    parser = argparse.ArgumentParser(description="Agenda electrónica.")
+    parser.add_argument("--sqlite", metavar="ARCHIVO_DB",
+                        help="Guarda la agenda en una base de datos SQLite en lugar de agenda.json.")
+    parser.add_argument("--binario", metavar="ARCHIVO_BIN",
+                        help="Guarda la agenda en formato binario (más compacto y rápido de cargar) en lugar de agenda.json.")
+    parser.add_argument("--importar-json", metavar="ARCHIVO_JSON",
+                        help="Con --sqlite, carga antes en la base de datos los contactos de un archivo JSON.")
+    parser.add_argument("--duplicados", action="store_true",
+                        help="Muestra los grupos de posibles contactos duplicados y termina.")
+    parser.add_argument("--fusionar-duplicados", action="store_true",
+                        help="Propone los grupos de duplicados que coinciden par a par y fusiona en su contacto "
+                             "más antiguo los que se confirmen; después termina.")
+    return parser.parse_args()
+
+# Crea el gestor de la agenda según los argumentos de la línea de órdenes
+def crear_agenda(args):
+    if args.binario:
+        return GestorAgenda(almacenamiento=AlmacenamientoBinario(args.binario))
+    if not args.sqlite:
+        return GestorAgenda()  # Por defecto: agenda.json con diario de cambios
+    almacenamiento = AlmacenamientoSQLite(args.sqlite)
+    if args.importar_json:
+        total = almacenamiento.importar_json(args.importar_json)
+        print(f"Importados {total} contactos de {args.importar_json}.")
+    return GestorAgenda(almacenamiento=almacenamiento)
+
+# Devuelve una línea con el ID, nombre, teléfono y correo de cada contacto del grupo
+def describir_grupo(agenda, grupo):
+    contactos = [agenda.buscar_contacto_por_id(i) for i in grupo]
+    return " | ".join(f"{c.id_contacto}: {c.nombre}, {c.telefono}, {c.correo}" for c in contactos)
+
+# Pregunta al usuario si se fusiona un grupo de duplicados (por defecto, no)
+def confirmar_fusion(agenda, grupo):
+    print(describir_grupo(agenda, grupo))
+    respuesta = input(f"¿Fusionar en el contacto {grupo[0]} y eliminar los demás? (s/N): ")
+    return respuesta.strip().lower() in ("s", "si", "sí")
+
+# Tarea por lotes: muestra (y opcionalmente fusiona, grupo a grupo) los contactos duplicados
+def revisar_duplicados(agenda, fusionar):
+    grupos = agenda.buscar_duplicados()
+    lineas = [f"Grupos de posibles duplicados: {len(grupos)}"]
+    lineas.extend(describir_grupo(agenda, grupo) for grupo in grupos)
+    print("\n".join(lineas))
+    if fusionar:
+        # Solo se proponen los contactos que coinciden par a par, y cada grupo se confirma
+        fusionados = []
+
+        def confirmar(grupo):
+            if confirmar_fusion(agenda, grupo):
+                fusionados.append(grupo)
+                return True
+            return False
+
+        eliminados = agenda.fusionar_duplicados(confirmar)
+        agenda.guardar_contactos()
+        print(f"Fusionados {len(fusionados)} grupos; se han eliminado {eliminados} contactos duplicados.")
+
 # Función principal que controla el flujo del programa
 def main():
     # Creamos un gestor de agenda para manejar los contactos
-    agenda = GestorAgenda()
+    args = leer_argumentos()
+    agenda = crear_agenda(args)
+    if args.duplicados or args.fusionar_duplicados:
+        revisar_duplicados(agenda, args.fusionar_duplicados)
+        return
 
     # Bucle infinito hasta que el usuario decida salir
     while True:
@@ -55,8 +133,7 @@ def main():
             # --- Añadir contacto ---
             if opcion == "1":
                 contacto = pedir_datos_contacto()
-                if contacto:
-                    agenda.añadir_contacto(contacto)
+                if contacto and agenda.añadir_contacto(contacto):
                     print("Contacto añadido con éxito.")
 
             # --- Buscar contacto por ID ---
@@ -76,15 +153,23 @@ def main():
                 else:
                     print("No se encontró el contacto.")
 
-            # --- Listar todos los contactos ---
+            # --- Listar todos los contactos (por páginas) ---
             elif opcion == "4":
-                contactos = agenda.listar_contactos()
-                if contactos:
-                    for c in contactos:
-                        c.mostrar_contacto()
-                        print("-" * 20)  # Separador visual entre contactos
-                else:
-                    print("No hay contactos en la agenda.")
+                orden = input("Ordenar por (id, nombre, favorito) [id]: ").strip().lower() or "id"
+                pagina = 1
+                while True:
+                    contactos, total = agenda.listar_contactos_pagina(pagina, TAMANO_PAGINA, orden)
+                    if not contactos:
+                        print("No hay contactos en la agenda." if pagina == 1 else "No hay más contactos.")
+                        break
+                    mostrar_contactos(contactos)
+                    paginas = (total + TAMANO_PAGINA - 1) // TAMANO_PAGINA
+                    if pagina >= paginas:
+                        break
+                    respuesta = input(f"Página {pagina} de {paginas}. Enter para seguir, q para terminar: ")
+                    if respuesta.strip().lower() == "q":
+                        break
+                    pagina += 1
 
             # --- Modificar contacto ---
             elif opcion == "5":
@@ -143,9 +228,7 @@ def main():
                 texto = input("Introduce parte del nombre, teléfono o correo: ").strip()
                 encontrados = agenda.buscar_contactos_por_texto(texto)
                 if encontrados:
-                    for c in encontrados:
-                        c.mostrar_contacto()
-                        print("-" * 20)
+                    mostrar_contactos(encontrados)
                 else:
                     print("No se encontraron coincidencias.")
 
@@ -165,8 +248,30 @@ def main():
                 else:
                     print("No se encontró el contacto.")
 
-            # --- Salir del programa ---
+            # --- Importar contactos ---
             elif opcion == "9":
+                ruta = input("Archivo a importar (.csv, .json o .vcf): ").strip()
+                resultado = agenda.importar_contactos(leer_contactos(ruta))
+                print(f"Contactos importados: {resultado['importados']}.")
+                if resultado["duplicados"]:
+                    ids = ", ".join(str(i) for i in resultado["duplicados"][:10])
+                    print(f"IDs duplicados, no importados ({len(resultado['duplicados'])}): {ids}"
+                          + (" ..." if len(resultado["duplicados"]) > 10 else ""))
+                for posicion, error in resultado["invalidos"][:10]:
+                    print(f"Contacto {posicion} no válido: {error}")
+                if len(resultado["invalidos"]) > 10:
+                    print(f"... y {len(resultado['invalidos']) - 10} contactos no válidos más.")
+
+            # --- Exportar contactos ---
+            elif opcion == "10":
+                ruta = input("Archivo de destino (.csv, .json o .vcf): ").strip()
+                total = agenda.exportar_contactos(ruta)
+                if total is not None:
+                    print(f"Exportados {total} contactos a {ruta}.")
+
+            # --- Salir del programa ---
+            elif opcion == "11":
+                agenda.guardar_contactos()  # Con JSON compacta el diario; con SQLite ya está todo guardado
                 print("¡Hasta luego!")
                 break
 
@@ -0,0 +1,416 @@
+# Servidor de la agenda para varios clientes a la vez (asyncio).
+#
+# Protocolo: una petición JSON por línea y una respuesta JSON por línea.
+#   {"op": "añadir", "contacto": {...}}          -> {"ok": true, "resultado": {...}}
+#   {"op": "buscar", "texto": "ana", "limite": 10}
+#   {"op": "obtener", "id": "7"}
+#   {"op": "favorito", "id": "7"}  /  {"op": "no_favorito", "id": "7"}
+#   {"op": "eliminar", "id": "7"}
+#   {"op": "cambios", "desde": 120}              -> {"ok": true, "resultado": {"secuencia": 135, ...}}
+# Si hay un error la respuesta es {"ok": false, "error": "..."}. Si la petición
+# lleva "ref", la respuesta la devuelve igual (útil para enviar varias seguidas).
+#
+# Todos los clientes comparten un único GestorAgenda en memoria. Los cambios no
+# se escriben al atender cada petición: un único escritor los vuelca al diario
+# por lotes cada INTERVALO_VOLCADO segundos (una escritura y un fsync por lote).
+# La escritura y la compactación se hacen en otro hilo, sin parar a los clientes.
+#
+# Uso:
+#   python servidor_agenda.py servir --puerto 8765
+#   python servidor_agenda.py carga --lanzar --clientes 50 --peticiones 200
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import tempfile
+import time
+
+from almacenamiento_agenda import AlmacenamientoSQLite
+from contacto_agenda import Contacto
+from datos_prueba_agenda import escribir_agenda_json
+from gestor_agenda import UMBRAL_COMPACTACION, GestorAgenda
+
+
+HOST_POR_DEFECTO = "127.0.0.1"
+PUERTO_POR_DEFECTO = 8765
+INTERVALO_VOLCADO = 0.05  # Segundos que el escritor espera para juntar cambios en un lote
+LIMITE_BUSQUEDA = 50  # Resultados máximos de una búsqueda si la petición no indica otro límite
+
+# Mezcla de operaciones del generador de carga: operación -> peso
+MEZCLA_CARGA = {"obtener": 35, "buscar": 25, "añadir": 25, "favorito": 10, "eliminar": 5}
+TEXTOS_CARGA = ["ana", "lucia", "garcia", "lopez", "pe", "mar", "sofia", "diaz"]  # Búsquedas por nombre
+
+
+def avisar_rechazados(numeros):
+    """
+    Avisa de los cambios de un volcado que ha rechazado la base de datos (número None).
+
+    Al volcar en lotes ya se ha respondido al cliente: con SQLite, un ID que otro proceso
+    ha añadido entretanto se queda solo en la memoria de este servidor.
+    """
+    rechazados = sum(numero is None for numero in numeros)
+    if rechazados:
+        print(f"Aviso: la base de datos ha rechazado {rechazados} cambios (ID repetido o contacto ya eliminado).")
+
+
+class AlmacenamientoEnLotes:
+    """
+    Envuelve el almacenamiento de la agenda para que registrar un cambio solo lo
+    apunte en memoria; el escritor del servidor los vuelca juntos con 'volcar'.
+    """
+
+    # Con cambios aún sin volcar, la base de datos no está al día: el gestor busca en memoria
+    buscar_texto = None
+    obtener = None
+
+    def __init__(self, almacenamiento):
+        self.almacenamiento = almacenamiento
+        self.pendientes = []  # Cambios (operación, ID, diccionario o None, secuencia) aún no escritos
+        self.hay_cambios = asyncio.Event()
+        self.cambios_pendientes = 0  # El gestor no compacta por su cuenta: lo decide el escritor
+
+    def __getattr__(self, nombre):
+        # Lo que no se envuelve (secuencia, historial...) se lee del almacenamiento real
+        return getattr(self.almacenamiento, nombre)
+
+    def cargar(self):
+        return self.almacenamiento.cargar()
+
+    def registrar(self, operacion, id_contacto, contacto=None, secuencia=None):
+        # Guardamos el diccionario ahora: el objeto Contacto puede cambiar antes del volcado
+        datos = contacto.to_dict() if contacto is not None else None
+        self.pendientes.append((operacion, id_contacto, datos, secuencia))
+        self.hay_cambios.set()
+        # SQLite asigna el número definitivo al volcar; su 'cambios_desde' (que se lee del
+        # almacenamiento real) solo ve los cambios ya volcados, con números mayores que los anteriores
+        return secuencia
+
+    def volcar(self):
+        """
+        Escribe los cambios pendientes con una sola escritura forzada a disco. Devuelve cuántos eran.
+        """
+        lote, self.pendientes = self.pendientes, []
+        if lote:
+            avisar_rechazados(self.almacenamiento.registrar_varios(lote, sincronizar=True))
+        return len(lote)
+
+    def guardar(self, datos, secuencia=None):
+        # SQLite no reescribe la base de datos al guardar: los cambios pendientes van antes
+        self.volcar()
+        self.almacenamiento.guardar(datos, secuencia)
+
+    def cerrar(self):
+        self.volcar()
+        self.almacenamiento.cerrar()
+
+
+class ServidorAgenda:
+    """
+    Atiende peticiones JSON por línea sobre un GestorAgenda compartido.
+
+    Como asyncio ejecuta una sola tarea a la vez y cada petición se resuelve sin
+    esperas intermedias, las operaciones sobre la agenda nunca se mezclan y no hacen falta cerrojos.
+    """
+
+    def __init__(self, agenda, intervalo=INTERVALO_VOLCADO):
+        self.agenda = agenda
+        self.almacenamiento = AlmacenamientoEnLotes(agenda.almacenamiento)
+        agenda.almacenamiento = self.almacenamiento
+        self.intervalo = intervalo
+        self.peticiones = 0
+        self.volcados = 0  # Lotes escritos en disco
+        self.cambios_volcados = 0
+        self._escritor = None
+        self._escritura = None  # Escritura en curso en otro hilo (la última lanzada)
+        self._servidor = None
+
+    # ---------------------- PETICIONES ----------------------
+    def ejecutar(self, peticion):
+        """
+        Ejecuta una petición (diccionario) y devuelve su resultado.
+
+        Lanza KeyError, TypeError o ValueError si la petición no es válida.
+        """
+        operacion = peticion["op"]
+        if operacion == "añadir":
+            contacto = Contacto.from_dict(peticion["contacto"])  # Valida el correo
+            if contacto.id_contacto in self.agenda.contactos:
+                raise ValueError(f"Ya existe un contacto con el ID {contacto.id_contacto}")
+            if not self.agenda.añadir_contacto(contacto):
+                raise ValueError("No se pudo añadir el contacto")
+            return contacto.to_dict()
+        if operacion == "buscar":
+            limite = int(peticion.get("limite", LIMITE_BUSQUEDA))
+            return [c.to_dict() for c in self.agenda.buscar_contactos_por_texto(str(peticion.get("texto", "")), limite)]
+        if operacion == "cambios":
+            return self.agenda.cambios_desde(int(peticion.get("desde", 0)))
+        acciones = {
+            "obtener": self.agenda.buscar_contacto_por_id,
+            "favorito": self.agenda.marcar_favorito,
+            "no_favorito": self.agenda.desmarcar_favorito,
+            "eliminar": self.agenda.eliminar_contacto,
+        }
+        if operacion not in acciones:
+            raise ValueError(f"Operación desconocida: {operacion}")
+        resultado = acciones[operacion](peticion["id"])
+        if not resultado:
+            raise ValueError(f"No existe el contacto {peticion['id']}")
+        return resultado.to_dict() if operacion == "obtener" else True
+
+    def responder(self, linea):
+        """
+        Convierte una línea de petición en la línea de respuesta (bytes).
+        """
+        self.peticiones += 1
+        respuesta = {}
+        try:
+            peticion = json.loads(linea)
+            if not isinstance(peticion, dict):
+                raise ValueError("La petición debe ser un objeto JSON")
+            if "ref" in peticion:
+                respuesta["ref"] = peticion["ref"]
+            respuesta.update(ok=True, resultado=self.ejecutar(peticion))
+        except KeyError as e:
+            respuesta.update(ok=False, error=f"falta el campo {e}")
+        except (TypeError, ValueError) as e:  # json.JSONDecodeError es un ValueError
+            respuesta.update(ok=False, error=str(e))
+        return (json.dumps(respuesta, ensure_ascii=False) + "\n").encode("utf-8")
+
+    async def atender(self, lector, escritor):
+        """
+        Atiende a un cliente hasta que cierra la conexión.
+        """
+        try:
+            while linea := await lector.readline():
+                escritor.write(self.responder(linea))
+                await escritor.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass  # El cliente se ha ido o ha enviado una línea demasiado larga
+        finally:
+            escritor.close()
+
+    # ---------------------- PERSISTENCIA ----------------------
+    async def escribir_cambios(self):
+        """
+        Tarea del único escritor: espera a que haya cambios, deja pasar 'intervalo'
+        segundos para juntar más y los vuelca en un lote. Cuando el diario supera
+        UMBRAL_COMPACTACION cambios, compacta la agenda.
+
+        La escritura con fsync y la compactación (que escribe toda la agenda) se hacen
+        en otro hilo: mientras tanto el bucle sigue atendiendo peticiones. Solo este
+        escritor usa el almacenamiento real, así que nunca hay dos escrituras a la vez.
+        """
+        almacenamiento = self.almacenamiento.almacenamiento
+        while True:
+            await self.almacenamiento.hay_cambios.wait()
+            await asyncio.sleep(self.intervalo)
+            self.almacenamiento.hay_cambios.clear()
+            lote, self.almacenamiento.pendientes = self.almacenamiento.pendientes, []
+            if lote:
+                try:
+                    avisar_rechazados(await self._en_hilo(almacenamiento.registrar_varios, lote, True))
+                except Exception as e:
+                    print(f"No se pudieron guardar los cambios: {e}")
+                    self.almacenamiento.pendientes[:0] = lote  # Se reintentan en el siguiente volcado
+                    continue
+                self.volcados += 1
+                self.cambios_volcados += len(lote)
+            if almacenamiento.cambios_pendientes >= UMBRAL_COMPACTACION:
+                # La copia se toma en el hilo del bucle, así ninguna petición la cambia a medias.
+                # Los cambios que aún no se han volcado ya están en la copia y se escribirán
+                # también en el nuevo diario: aplicarlos dos veces al cargar da el mismo resultado.
+                datos = list(self.agenda.contactos.diccionarios())
+                try:
+                    await self._en_hilo(almacenamiento.guardar, datos, self.agenda.secuencia)
+                except Exception as e:
+                    print(f"No se pudo guardar la agenda: {e}")
+
+    async def _en_hilo(self, funcion, *args):
+        """
+        Ejecuta funcion(*args) en otro hilo y espera a que termine.
+
+        Si se cancela la tarea del escritor, la escritura en curso sigue hasta el
+        final; 'cerrar' la espera con '_escritura' antes del último volcado.
+        """
+        self._escritura = asyncio.ensure_future(asyncio.to_thread(funcion, *args))
+        return await asyncio.shield(self._escritura)
+
+    def volcar(self):
+        """
+        Vuelca los cambios pendientes y compacta si el diario ha crecido demasiado, en este hilo
+        (al cerrar, cuando ya no hay peticiones que atender).
+        """
+        cambios = self.almacenamiento.volcar()
+        if cambios:
+            self.volcados += 1
+            self.cambios_volcados += cambios
+        if self.almacenamiento.almacenamiento.cambios_pendientes >= UMBRAL_COMPACTACION:
+            self.agenda.guardar_contactos()
+
+    # ---------------------- ARRANQUE Y PARADA ----------------------
+    async def iniciar(self, host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO, unix=None):
+        """
+        Empieza a aceptar conexiones (TCP, o socket Unix si se indica 'unix') y lanza el escritor.
+        """
+        self.agenda.construir_indices()
+        if unix:
+            self._servidor = await asyncio.start_unix_server(self.atender, path=unix)
+        else:
+            self._servidor = await asyncio.start_server(self.atender, host, puerto)
+        self._escritor = asyncio.create_task(self.escribir_cambios())
+        return self._servidor
+
+    async def cerrar(self):
+        """
+        Deja de aceptar conexiones, vuelca los cambios pendientes y guarda la agenda.
+        """
+        if self._servidor is not None:
+            self._servidor.close()  # Sin esperar a 'wait_closed': los clientes conectados lo bloquearían
+        if self._escritor is not None:
+            self._escritor.cancel()
+        if self._escritura is not None:
+            await asyncio.wait([self._escritura])  # Termina la escritura en curso (sin relanzar sus errores)
+        self.volcar()
+        self.agenda.guardar_contactos()
+
+
+# ---------------------- GENERADOR DE CARGA ----------------------
+def percentil(ordenados, p):
+    """
+    Percentil p (0-100) de una lista ya ordenada.
+    """
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def peticion_aleatoria(aleatorio, cliente, numero, propios):
+    """
+    Genera una petición según MEZCLA_CARGA. 'propios' son los IDs que ha añadido este cliente.
+    """
+    operacion = aleatorio.choices(list(MEZCLA_CARGA), weights=list(MEZCLA_CARGA.values()))[0]
+    if operacion == "buscar":
+        return {"op": "buscar", "texto": aleatorio.choice(TEXTOS_CARGA), "limite": 20}
+    if operacion == "añadir" or not propios:
+        id_contacto = f"carga-{cliente}-{numero}"
+        propios.append(id_contacto)
+        return {"op": "añadir", "contacto": {
+            "id_contacto": id_contacto, "nombre": f"Cliente {cliente} contacto {numero}",
+            "telefono": f"7{aleatorio.randrange(10**8):08d}", "direccion": "",
+            "correo": f"c{cliente}.{numero}@ejemplo.com"}}
+    if operacion == "eliminar":
+        return {"op": "eliminar", "id": propios.pop(aleatorio.randrange(len(propios)))}
+    return {"op": operacion, "id": aleatorio.choice(propios)}
+
+
+async def cliente_carga(conectar, cliente, peticiones, latencias, errores):
+    """
+    Un cliente que envía sus peticiones de una en una y apunta la latencia de cada una.
+    """
+    lector, escritor = await conectar()
+    aleatorio = random.Random(cliente)
+    propios = []
+    try:
+        for numero in range(peticiones):
+            linea = (json.dumps(peticion_aleatoria(aleatorio, cliente, numero, propios)) + "\n").encode("utf-8")
+            inicio = time.perf_counter()
+            escritor.write(linea)
+            await escritor.drain()
+            respuesta = await lector.readline()
+            latencias.append(time.perf_counter() - inicio)
+            if not json.loads(respuesta)["ok"]:
+                errores.append(respuesta)
+    finally:
+        escritor.close()
+
+
+async def generar_carga(args):
+    """
+    Lanza los clientes de carga (y el servidor, con --lanzar) y muestra las latencias.
+    """
+    servidor = None
+    directorio = None
+    if args.lanzar:
+        directorio = tempfile.TemporaryDirectory()
+        archivo = os.path.join(directorio.name, "agenda.json")
+        escribir_agenda_json(archivo, args.contactos)
+        servidor = ServidorAgenda(GestorAgenda(archivo), args.intervalo)
+        await servidor.iniciar(args.host, 0)  # Puerto 0: el sistema elige uno libre
+        args.puerto = servidor._servidor.sockets[0].getsockname()[1]
+
+    if args.unix and servidor is None:
+        conectar = lambda: asyncio.open_unix_connection(args.unix)
+    else:
+        conectar = lambda: asyncio.open_connection(args.host, args.puerto)
+
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente_carga(conectar, cliente, args.peticiones, latencias, errores)
+                           for cliente in range(args.clientes)))
+    segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    print(f"{len(latencias)} peticiones de {args.clientes} clientes en {segundos:.2f} s "
+          f"({len(latencias) / segundos:.0f} peticiones/s), {len(errores)} con error")
+    print("Latencia: " + ", ".join(f"p{p} {percentil(latencias, p) * 1e3:.2f} ms" for p in (50, 90, 99))
+          + f", máx. {latencias[-1] * 1e3:.2f} ms")
+    if servidor is not None:
+        await servidor.cerrar()
+        print(f"Volcados a disco: {servidor.volcados} lotes con {servidor.cambios_volcados} cambios")
+        directorio.cleanup()
+
+
+async def servir(args):
+    """
+    Ejecuta el servidor hasta que se interrumpe (Ctrl+C o SIGTERM); al parar guarda la agenda.
+    """
+    if args.sqlite:
+        agenda = GestorAgenda(almacenamiento=AlmacenamientoSQLite(args.sqlite))
+    else:
+        agenda = GestorAgenda(args.archivo)
+    servidor = ServidorAgenda(agenda, args.intervalo)
+    sockets = await servidor.iniciar(args.host, args.puerto, args.unix)
+    print(f"Agenda de {len(agenda.contactos)} contactos escuchando en "
+          + (args.unix or ", ".join(str(s.getsockname()) for s in sockets.sockets)))
+    parada = asyncio.Event()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(senal, parada.set)
+        except NotImplementedError:
+            pass  # En Windows no hay manejadores de señales en asyncio: Ctrl+C cancela la tarea
+    try:
+        await parada.wait()
+    finally:
+        await servidor.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de la agenda (JSON por líneas) y generador de carga.")
+    parser.add_argument("--host", default=HOST_POR_DEFECTO)
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    parser.add_argument("--unix", metavar="RUTA", help="Usa un socket Unix en lugar de TCP.")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_VOLCADO,
+                        help="Segundos que se juntan cambios antes de volcarlos a disco.")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+
+    orden_servir = ordenes.add_parser("servir", help="Arranca el servidor.")
+    orden_servir.add_argument("--archivo", default="agenda.json", help="Archivo JSON de la agenda.")
+    orden_servir.add_argument("--sqlite", metavar="ARCHIVO_DB", help="Usa una base de datos SQLite.")
+
+    carga = ordenes.add_parser("carga", help="Generador de carga con percentiles de latencia.")
+    carga.add_argument("--clientes", type=int, default=50)
+    carga.add_argument("--peticiones", type=int, default=200, help="Peticiones por cliente.")
+    carga.add_argument("--lanzar", action="store_true",
+                       help="Arranca también un servidor con una agenda de prueba (solo TCP).")
+    carga.add_argument("--contactos", type=int, default=10000, help="Contactos de la agenda de prueba con --lanzar.")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(servir(args) if args.orden == "servir" else generar_carga(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()